@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks
+~~~~~~~~~~
+
+Benchmarks for the package's hot paths. Each `bench_*` module contains
+suites in the style of `asv <https://asv.readthedocs.io/>`_: classes with an
+optional `setup` method, optional `params` and `param_names`, and methods
+whose names start with `time_`. asv can run them directly. Without asv, use
+the bundled runner, which needs only the standard library::
+
+    python -m benchmarks.run --output results.json
+
+All inputs come from :mod:`benchmarks.data` and are generated from a fixed
+seed, so results are comparable across runs and releases.
+
+:license: MIT
+"""
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_database
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Benchmarks for code that reads from or writes to the database.
+
+:license: MIT
+"""
+
+from sanskrit import Context, setup
+from sanskrit.analyze import SimpleAnalyzer
+from sanskrit.query import SimpleQuery
+from sanskrit.schema import Base
+from sanskrit.tagger import Tagger
+from sanskrit.util import Progress
+
+from . import data
+
+
+# Words that are in the test data, so that analysis finds real forms.
+KNOWN_WORDS = ['gajas', 'gajena', 'gajAnAm', 'gacCati', 'gacCanti', 'saH',
+               'ca', 'gatas']
+
+#: The indexes that serve the paradigm queries in :mod:`sanskrit.query`.
+QUERY_INDEXES = ['ix_verb_root_mode_voice', 'ix_verb_root_person_number',
+                 'ix_nominal_stem_gender', 'ix_participlestem_root_id']
+
+
+class Setup(object):
+
+    """Build the database from scratch."""
+
+    timeout = 600
+
+    def time_run(self):
+        ctx = Context(data.config())
+        setup.run(ctx, progress=Progress())
+
+
+class Analysis(object):
+
+    """Analyze 100 words, about half of which are real."""
+
+    def setup(self):
+        ctx = data.built_context()
+        self.analyzer = SimpleAnalyzer(ctx)
+        self.words = KNOWN_WORDS * 6 + data.words(52)
+
+    def time_analyze(self):
+        analyze = self.analyzer.analyze
+        for word in self.words:
+            analyze(word)
+
+
+class Tagging(object):
+
+    """Tag 10 short segments."""
+
+    def setup(self):
+        ctx = data.built_context()
+        self.tagger = Tagger(ctx)
+        self.segments = [' '.join(KNOWN_WORDS[i:i + 3])
+                         for i in range(len(KNOWN_WORDS) - 2)]
+        self.segments += data.phrases(10 - len(self.segments), length=3)
+
+    def time_tag(self):
+        tag = self.tagger.tag
+        for segment in self.segments:
+            tag(segment)
+
+
+class Query(object):
+
+    """Look up paradigms with and without the query cache."""
+
+    params = [0, 1024]
+    param_names = ['cache_size']
+
+    def setup(self, cache_size):
+        ctx = data.built_context()
+        ctx.config['QUERY_CACHE_SIZE'] = cache_size
+        self.q = SimpleQuery(ctx)
+
+    def time_noun(self, cache_size):
+        self.q.noun('gaja', 'm')
+
+    def time_pronoun(self, cache_size):
+        self.q.pronoun('tad', 'm')
+
+    def time_verb(self, cache_size):
+        self.q.verb('gam', 'pres', 'para')
+
+    def time_verb_summary(self, cache_size):
+        self.q.verb_summary('gam')
+
+
+_unindexed_context = []
+
+
+def unindexed_context():
+    """Return a context like :func:`~benchmarks.data.built_context`, but
+    without :data:`QUERY_INDEXES`. The database is built just once per
+    process.
+    """
+    if not _unindexed_context:
+        ctx = Context(data.config())
+        setup.run(ctx, progress=Progress())
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in QUERY_INDEXES:
+                    index.drop(ctx.engine)
+        _unindexed_context.append(ctx)
+    return _unindexed_context[0]
+
+
+class QueryIndexes(object):
+
+    """Look up paradigms, without the query cache, with and without
+    :data:`QUERY_INDEXES`. The difference grows with the size of the data,
+    so run this against data from :mod:`benchmarks.dataset`.
+    """
+
+    params = ['indexed', 'unindexed']
+    param_names = ['indexes']
+
+    def setup(self, indexes):
+        if indexes == 'indexed':
+            ctx = data.built_context()
+        else:
+            ctx = unindexed_context()
+        ctx.config['QUERY_CACHE_SIZE'] = 0
+        self.q = SimpleQuery(ctx)
+
+    def time_noun(self, indexes):
+        self.q.noun('gaja', 'm')
+
+    def time_verb(self, indexes):
+        self.q.verb('gam', 'pres', 'para')
+
+    def time_verb_summary(self, indexes):
+        self.q.verb_summary('gam')
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_import
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Benchmarks for the time it takes to import the package. Each call starts a
+new interpreter, so compare the results with :class:`Interpreter`, which
+imports nothing.
+
+:license: MIT
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        x for x in (ROOT, env.get('PYTHONPATH')) if x)
+    subprocess.check_call([sys.executable, '-c', code], env=env)
+
+
+class Interpreter(object):
+
+    """Start an interpreter that does nothing."""
+
+    def time_startup(self):
+        _python('pass')
+
+
+class Import(object):
+
+    """Start an interpreter and import one module."""
+
+    params = ['sanskrit', 'sanskrit.sounds', 'sanskrit.transliterate.sanscript',
+              'sanskrit.context', 'sanskrit.tagger']
+    param_names = ('module',)
+
+    def time_import(self, module):
+        _python('import ' + module)
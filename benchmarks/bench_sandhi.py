@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_sandhi
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Benchmarks for :mod:`sanskrit.sandhi`.
+
+:license: MIT
+"""
+
+from sanskrit.sandhi import Joiner, Splitter
+
+from . import data
+
+
+class Joining(object):
+
+    """Join 1000 lists of three words."""
+
+    params = [False, True]
+    param_names = ['internal']
+
+    def setup(self, internal):
+        self.joiner = Joiner(data.SANDHI_RULES)
+        self.chunk_lists = data.chunk_lists(1000)
+
+    def time_join(self, internal):
+        join = self.joiner.join
+        for chunks in self.chunk_lists:
+            join(chunks, internal)
+
+
+class Splitting(object):
+
+    """Generate all splits of 1000 words."""
+
+    def setup(self):
+        self.splitter = Splitter(data.SANDHI_RULES)
+        self.words = data.words(1000, min_syllables=2)
+
+    def time_iter_splits(self):
+        iter_splits = self.splitter.iter_splits
+        for word in self.words:
+            for split in iter_splits(word):
+                pass
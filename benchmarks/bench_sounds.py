@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_sounds
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Benchmarks for :mod:`sanskrit.sounds`.
+
+:license: MIT
+"""
+
+from sanskrit import sounds
+
+from . import data
+
+
+class Meter(object):
+
+    """Scan 1000 phrases of eight words."""
+
+    def setup(self):
+        self.phrases = data.phrases(1000)
+
+    def time_meter(self):
+        meter = sounds.meter
+        for phrase in self.phrases:
+            meter(phrase)
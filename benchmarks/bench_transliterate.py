@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_transliterate
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Benchmarks for :mod:`sanskrit.transliterate`.
+
+:license: MIT
+"""
+
+from sanskrit.transliterate import betacode, sanscript
+
+from . import data
+
+
+class Sanscript(object):
+
+    """Transliterate 200 words between each pair of schemes."""
+
+    params = (sorted(sanscript.SCHEMES), sorted(sanscript.SCHEMES))
+    param_names = ('from', 'to')
+
+    def setup(self, _from, _to):
+        if _from == _to:
+            raise NotImplementedError
+        slp1 = ' '.join(data.words(200))
+        self.text = sanscript.transliterate(slp1, sanscript.SLP1, _from)
+
+    def time_transliterate(self, _from, _to):
+        sanscript.transliterate(self.text, _from, _to)
+
+
+class Betacode(object):
+
+    """Convert 200 Beta Code words to Greek."""
+
+    def setup(self):
+        self.text = ' '.join(data.betacode_words(200))
+
+    def time_transliterate(self):
+        betacode.transliterate(self.text)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.data
+~~~~~~~~~~~~~~~
+
+Synthetic, reproducible inputs for the benchmarks. Every generator takes a
+`seed`, so the same arguments always produce the same data.
+
+Words are built from random syllables and so are phonotactically plausible
+SLP1, though almost none of them are real Sanskrit.
+
+:license: MIT
+"""
+from __future__ import print_function
+import os
+import random
+
+from sanskrit import Context, setup
+from sanskrit.util import Progress
+
+#: The default seed for all generators.
+SEED = 1234
+
+#: The fixtures used by the test suite.
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              os.pardir, 'test', 'data')
+
+#: The data used to build databases for the benchmarks. By default, this
+#: is the test fixtures. To benchmark at a larger scale, generate data with
+#: :mod:`benchmarks.dataset` and set `SANSKRIT_BENCHMARK_DATA` to its path.
+DATA_PATH = os.environ.get('SANSKRIT_BENCHMARK_DATA', TEST_DATA_PATH)
+
+# Onsets and vowels, roughly weighted by how common they are.
+_ONSETS = ('k kh g c j w q t d n p b m y r l v S z s h '
+           'k g t d n p m y r v s kz tr pr Sr st sv dv'.split())
+_ONSETS = [x.replace('kh', 'K') for x in _ONSETS]
+_VOWELS = 'a a a a A A i i I u u U f e e o o E O'.split()
+_CODAS = [''] * 12 + 'M H H t n m s r k'.split()
+
+#: Common sandhi rules, as (first, second, result) triples. These are
+#: enough to give :class:`~sanskrit.sandhi.Splitter` and
+#: :class:`~sanskrit.tagger.Tagger` a realistic branching factor.
+SANDHI_RULES = [
+    ('a', 'a', 'A'), ('a', 'A', 'A'), ('A', 'a', 'A'), ('A', 'A', 'A'),
+    ('a', 'i', 'e'), ('a', 'I', 'e'), ('A', 'i', 'e'), ('A', 'I', 'e'),
+    ('a', 'u', 'o'), ('a', 'U', 'o'), ('A', 'u', 'o'), ('A', 'U', 'o'),
+    ('a', 'e', 'E'), ('a', 'E', 'E'), ('a', 'o', 'O'), ('a', 'O', 'O'),
+    ('a', 'f', 'ar'), ('i', 'i', 'I'), ('u', 'u', 'U'),
+    ('i', 'a', 'y a'), ('i', 'A', 'y A'), ('i', 'u', 'y u'),
+    ('I', 'a', 'y a'), ('u', 'a', 'v a'), ('u', 'i', 'v i'),
+    ('U', 'a', 'v a'), ('e', 'a', "e '"), ('o', 'a', "o '"),
+    ('E', 'a', 'Ay a'), ('O', 'a', 'Av a'),
+    ('aH', 'a', "o '"), ('aH', 'g', 'o g'), ('aH', 'd', 'o d'),
+    ('aH', 'b', 'o b'), ('aH', 'n', 'o n'), ('aH', 'm', 'o m'),
+    ('aH', 'y', 'o y'), ('aH', 'v', 'o v'), ('aH', 'i', 'a i'),
+    ('aH', 'c', 'aS c'), ('aH', 't', 'as t'), ('AH', 'a', 'A a'),
+    ('AH', 'g', 'A g'), ('iH', 'a', 'ir a'), ('iH', 'g', 'ir g'),
+    ('uH', 'a', 'ur a'), ('t', 'c', 'c c'), ('t', 'g', 'd g'),
+    ('t', 'n', 'n n'), ('t', 'S', 'c C'), ('m', 'k', 'M k'),
+    ('m', 't', 'M t'), ('m', 'p', 'M p'), ('m', 's', 'M s'),
+]
+
+# Beta Code letters and diacritics, for Greek input.
+_BETA_LETTERS = 'ABGDEZHQIKLMNCOPRSTUFXYW'
+_BETA_MARKS = [')', '(', '/', '\\', '=', ')/', '(/', ')=', '(=', '|']
+
+
+def word(rng, min_syllables=1, max_syllables=5):
+    """Return a random SLP1 word.
+
+    :param rng: a :class:`random.Random`
+    """
+    syllables = []
+    for i in range(rng.randint(min_syllables, max_syllables)):
+        onset = rng.choice(_ONSETS) if i or rng.random() < 0.8 else ''
+        syllables.append(onset + rng.choice(_VOWELS))
+    return ''.join(syllables) + rng.choice(_CODAS)
+
+
+def words(n, seed=SEED, **kw):
+    """Return a list of `n` random SLP1 words."""
+    rng = random.Random(seed)
+    return [word(rng, **kw) for i in range(n)]
+
+
+def phrases(n, length=8, seed=SEED):
+    """Return a list of `n` random SLP1 phrases of `length` words each."""
+    rng = random.Random(seed)
+    return [' '.join(word(rng) for j in range(length)) for i in range(n)]
+
+
+def chunk_lists(n, size=3, seed=SEED):
+    """Return a list of `n` lists of `size` random SLP1 words, for use
+    with :meth:`~sanskrit.sandhi.Joiner.join`."""
+    rng = random.Random(seed)
+    return [[word(rng) for j in range(size)] for i in range(n)]
+
+
+def _betacode_vowels():
+    """Return all vowels, with and without diacritics, that
+    :mod:`~sanskrit.transliterate.betacode` can convert."""
+    from sanskrit.transliterate import betacode
+    returned = []
+    for vowel in 'AEHIOUW':
+        for mark in [''] + _BETA_MARKS:
+            value, remainder = betacode.trie.findp(vowel + mark)
+            if value and not remainder:
+                returned.append(vowel + mark)
+    return returned
+
+
+def betacode_words(n, seed=SEED):
+    """Return a list of `n` random Greek words in Beta Code."""
+    rng = random.Random(seed)
+    vowels = _betacode_vowels()
+    consonants = [x for x in _BETA_LETTERS if x not in 'AEHIOUW']
+    returned = []
+    for i in range(n):
+        letters = []
+        for j in range(rng.randint(1, 4)):
+            letters.append(rng.choice(consonants))
+            letters.append(rng.choice(vowels))
+        returned.append(''.join(letters))
+    return returned
+
+
+def config(data_path=DATA_PATH, uri='sqlite://'):
+    """Return a config :class:`dict` for a database built from
+    `data_path`."""
+    return {'DATABASE_URI': uri, 'DATA_PATH': data_path}
+
+
+_contexts = {}
+
+
+def built_context(data_path=DATA_PATH):
+    """Return a :class:`~sanskrit.Context` whose in-memory database has
+    been built from `data_path`. The database is built just once per
+    process.
+    """
+    try:
+        return _contexts[data_path]
+    except KeyError:
+        pass
+    ctx = Context(config(data_path))
+    setup.run(ctx, progress=Progress())
+    _contexts[data_path] = ctx
+    return ctx
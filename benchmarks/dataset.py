@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.dataset
+~~~~~~~~~~~~~~~~~~
+
+Generates a synthetic data directory at production scale, for load testing
+:func:`sanskrit.setup.run`, the analyzer, and the query code. To write the
+default sizes (300k nominal stems, 1M verb forms, ...) to `data/`, run::
+
+    python -m benchmarks.dataset data
+
+Use ``--scale`` to shrink or grow every size at once, or set sizes one at a
+time with options like ``--nominal-stems``. To build a database from the
+output, point a config's `DATA_PATH` at it, or set the
+`SANSKRIT_BENCHMARK_DATA` environment variable before running the
+benchmarks.
+
+Enums, endings, sandhi rules, and pronouns are small, closed sets, so they
+are copied from a source data directory (by default, the test fixtures).
+The other files start with the source rows and are then padded with
+synthetic rows that use only the enum values and endings in the source, so
+every row is one that :mod:`sanskrit.setup` can load.
+
+Some config keys have no loader in :mod:`sanskrit.setup`, so their formats
+are unknown and no file is written for them (see :data:`SKIPPED`).
+
+:license: MIT
+"""
+from __future__ import print_function
+import argparse
+import collections
+import csv
+import os
+import random
+import shutil
+
+import six
+
+from sanskrit import Context, util
+
+from . import data
+
+#: The default number of synthetic rows of each kind.
+SIZES = collections.OrderedDict([
+    ('indeclinables', 5000),
+    ('roots', 2000),
+    ('prefixed_roots', 6000),
+    ('verbs', 1000000),
+    ('participle_stems', 40000),
+    ('verbal_indeclinables', 16000),
+    ('nominal_stems', 300000),
+])
+
+#: Config keys whose files are copied from the source directory as-is.
+COPIED = ['ENUMS', 'VERB_ENDINGS', 'INFLECTED_NOMINAL_ENDINGS',
+          'COMPOUNDED_NOMINAL_ENDINGS', 'PRONOUNS']
+
+#: Config keys that :mod:`sanskrit.setup` doesn't read. Irregular nouns and
+#: adjectives have loaders, but they are YAML and are disabled in
+#: :func:`sanskrit.setup.run`.
+SKIPPED = ['GERUNDS', 'INFINITIVES', 'IRREGULAR_ADJECTIVES',
+           'IRREGULAR_NOUNS', 'MODIFIED_ROOTS', 'VERB_STEMS']
+
+#: The upasargas, used as verb prefixes.
+PREFIXES = ['ati', 'aDi', 'anu', 'apa', 'api', 'aBi', 'ava', 'A', 'ud',
+            'upa', 'dus', 'ni', 'nis', 'parA', 'pari', 'pra', 'prati', 'vi',
+            'sam', 'su']
+
+# Thematic personal endings, by voice, person, and number.
+_VERB_ENDINGS = {
+    'para': {
+        ('3', 's'): 'ti', ('3', 'd'): 'tas', ('3', 'p'): 'nti',
+        ('2', 's'): 'si', ('2', 'd'): 'Tas', ('2', 'p'): 'Ta',
+        ('1', 's'): 'mi', ('1', 'd'): 'vas', ('1', 'p'): 'mas',
+    },
+    'atma': {
+        ('3', 's'): 'te', ('3', 'd'): 'ete', ('3', 'p'): 'nte',
+        ('2', 's'): 'se', ('2', 'd'): 'eTe', ('2', 'p'): 'Dve',
+        ('1', 's'): 'e', ('1', 'd'): 'vahe', ('1', 'p'): 'mahe',
+    },
+}
+
+# Participle suffixes, as (mode, voice, suffix).
+_PARTICIPLES = [
+    ('past', 'pass', 'ta'),
+    ('past', 'active', 'tavat'),
+    ('pres', 'para', 'at'),
+    ('pres', 'atma', 'amAna'),
+    ('fut', 'para', 'syat'),
+    ('fut', 'atma', 'syamAna'),
+]
+
+# Verbal indeclinable suffixes, as (pos, suffix).
+_VERBAL_INDECLINABLES = [('gerund', 'tvA'), ('infinitive', 'tum')]
+
+_SHORT_VOWELS = 'aaaiiuf'
+_FINALS = 'kgcjtdnpbmrlvSzsh'
+_PARTICIPLE_MODES = {'fut', 'past'}
+
+
+def _open_csv(path):
+    if six.PY3:
+        return open(path, 'w', newline='')
+    return open(path, 'wb')
+
+
+class _Writer(object):
+
+    """Writes one CSV file. Rows from the source file with the same name
+    are written first."""
+
+    def __init__(self, path, source_path, fieldnames):
+        self.path = path
+        self.f = _open_csv(path)
+        self.writer = csv.DictWriter(self.f, fieldnames)
+        self.writer.writeheader()
+        self.num_rows = 0
+        if os.path.exists(source_path):
+            for row in util.read_csv(source_path):
+                self.writerow(dict((k, row.get(k, '')) for k in fieldnames))
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.num_rows += 1
+
+    def close(self):
+        self.f.close()
+
+
+def _capacity_error(name, size, capacity):
+    return ValueError('Cannot generate {0} {1}; the roots allow at most {2}. '
+                      'Generate more roots.'.format(size, name, capacity))
+
+
+class Generator(object):
+
+    """Generates a full data directory.
+
+    :param out_dir: the output directory
+    :param source_dir: the data directory to copy enums and endings from
+    :param sizes: a :class:`dict` that overrides some of :data:`SIZES`
+    :param seed: the random seed
+    """
+
+    def __init__(self, out_dir, source_dir=data.TEST_DATA_PATH, sizes=None,
+                 seed=data.SEED):
+        self.out_dir = out_dir
+        self.source_dir = source_dir
+        self.sizes = SIZES.copy()
+        self.sizes.update(sizes or {})
+        self.rng = random.Random(seed)
+
+        self.paths = self._paths(out_dir)
+        self.source_paths = self._paths(source_dir)
+
+        # Enum values, by enum type
+        self.enums = collections.defaultdict(list)
+        for row in util.read_csv(self.source_paths['ENUMS']):
+            self.enums[row['enum_type']].append(row['abbreviation'])
+
+        # (name, hom, class) for every root, in creation order
+        self.roots = []
+
+    @staticmethod
+    def _paths(data_path):
+        config = Context({'DATA_PATH': data_path}, connect=False).config
+        return dict((k, v) for k, v in config.items() if k != 'DATA_PATH')
+
+    def _writer(self, key, fieldnames):
+        return _Writer(self.paths[key], self.source_paths[key], fieldnames)
+
+    def _unique(self, n, make, seen=None):
+        """Return `n` distinct values from calling `make`."""
+        seen = set() if seen is None else seen
+        returned = []
+        while len(returned) < n:
+            value = make()
+            if value not in seen:
+                seen.add(value)
+                returned.append(value)
+        return returned
+
+    def _root_name(self):
+        rng = self.rng
+        name = rng.choice(data._ONSETS) + rng.choice(_SHORT_VOWELS)
+        if rng.random() < 0.3:
+            name += rng.choice(data._ONSETS) + rng.choice(_SHORT_VOWELS)
+        return name + rng.choice(_FINALS)
+
+    def run(self):
+        """Write every file and return the number of rows in each.
+
+        :return: a :class:`dict` that maps config keys to row counts
+        """
+        if not os.path.isdir(self.out_dir):
+            os.makedirs(self.out_dir)
+
+        counts = {}
+        for key in COPIED:
+            shutil.copyfile(self.source_paths[key], self.paths[key])
+            counts[key] = sum(1 for row in util.read_csv(self.paths[key]))
+
+        for method in (self.write_sandhi_rules,
+                       self.write_indeclinables,
+                       self.write_verb_prefixes,
+                       self.write_roots,
+                       self.write_verbs,
+                       self.write_participle_stems,
+                       self.write_verbal_indeclinables,
+                       self.write_nominal_stems):
+            counts.update(method())
+        return counts
+
+    def write_sandhi_rules(self):
+        w = self._writer('SANDHI_RULES', ['first', 'second', 'result',
+                                          'type'])
+        seen = set()
+        with open(self.source_paths['SANDHI_RULES']) as f:
+            for row in csv.DictReader(f):
+                seen.add((row['first'], row['second']))
+        for first, second, result in data.SANDHI_RULES:
+            if (first, second) not in seen:
+                w.writerow({'first': first, 'second': second,
+                            'result': result, 'type': 'common'})
+        w.close()
+        return {'SANDHI_RULES': w.num_rows}
+
+    def write_indeclinables(self):
+        w = self._writer('INDECLINABLES', ['name'])
+        rng = self.rng
+        names = self._unique(self.sizes['indeclinables'],
+                             lambda: data.word(rng, 1, 3))
+        for name in names:
+            w.writerow({'name': name})
+        w.close()
+        return {'INDECLINABLES': w.num_rows}
+
+    def write_verb_prefixes(self):
+        w = self._writer('VERB_PREFIXES', ['name', 'prefix_type'])
+        seen = set(row['name'] for row in
+                   util.read_csv(self.source_paths['VERB_PREFIXES']))
+        for name in PREFIXES:
+            if name not in seen:
+                w.writerow({'name': name, 'prefix_type': 'upasarga'})
+        w.close()
+        return {'VERB_PREFIXES': w.num_rows}
+
+    def write_roots(self):
+        """Write unprefixed roots, prefixed roots, and prefix groups.
+        Roots with the same name get consecutive homonym numbers."""
+        rng = self.rng
+        classes = [x for x in self.enums['class'] if x.isdigit()]
+
+        w = self._writer('UNPREFIXED_ROOTS', ['root', 'hom', 'class',
+                                              'voice'])
+        homs = collections.Counter()
+        for row in util.read_csv(self.source_paths['UNPREFIXED_ROOTS']):
+            homs[row['root']] += 1
+            self.roots.append((row['root'], row['hom'], row['class']))
+        for i in range(self.sizes['roots']):
+            name = self._root_name()
+            homs[name] += 1
+            hom = str(homs[name])
+            vclass = rng.choice(classes)
+            w.writerow({'root': name, 'hom': hom, 'class': vclass,
+                        'voice': rng.choice(['para', 'atma', 'ubhaya'])})
+            self.roots.append((name, hom, vclass))
+        w.close()
+
+        unprefixed = list(self.roots)
+        w = self._writer('PREFIXED_ROOTS', ['prefixed_root', 'prefixes',
+                                            'unprefixed_root', 'hom'])
+        groups = set()
+        for row in util.read_csv(self.source_paths['PREFIXED_ROOTS']):
+            groups.add(row['prefixes'])
+            self.roots.append((row['prefixed_root'], row['hom'], ''))
+
+        seen = set()
+        for i in range(self.sizes['prefixed_roots']):
+            while True:
+                basis, hom, vclass = rng.choice(unprefixed)
+                prefixes = rng.sample(PREFIXES, rng.choice([1, 1, 1, 2]))
+                name = ''.join(prefixes) + basis
+                if (name, hom) not in seen:
+                    seen.add((name, hom))
+                    break
+            prefixes = '-'.join(prefixes)
+            groups.add(prefixes)
+            w.writerow({'prefixed_root': name, 'prefixes': prefixes,
+                        'unprefixed_root': basis, 'hom': hom})
+            self.roots.append((name, hom, vclass))
+        w.close()
+        num_prefixed_roots = w.num_rows
+
+        w = self._writer('PREFIX_GROUPS', ['group', 'prefixes'])
+        for prefixes in sorted(groups):
+            w.writerow({'group': prefixes.replace('-', ''),
+                        'prefixes': prefixes})
+        w.close()
+
+        return {'UNPREFIXED_ROOTS': len(unprefixed),
+                'PREFIXED_ROOTS': num_prefixed_roots,
+                'PREFIX_GROUPS': w.num_rows}
+
+    def write_verbs(self):
+        """Write inflected verbs. Roots are visited round-robin, and each
+        visit adds the next (mode, voice, person, number) combination."""
+        modes = [x for x in self.enums['mode']
+                 if x not in _PARTICIPLE_MODES]
+        combos = [(mode, voice, person, number)
+                  for mode in modes
+                  for voice in sorted(_VERB_ENDINGS)
+                  for person in self.enums['person']
+                  for number in self.enums['number'] if number != '?']
+
+        # Prefer the source's endings where they exist.
+        endings = dict((v, dict(e)) for v, e in _VERB_ENDINGS.items())
+        for row in util.read_csv(self.source_paths['VERB_ENDINGS']):
+            if row['voice'] in endings:
+                key = (row['person'], row['number'])
+                endings[row['voice']][key] = row['ending']
+
+        size = self.sizes['verbs']
+        roots = self.roots
+        if size > len(roots) * len(combos):
+            raise _capacity_error('verbs', size, len(roots) * len(combos))
+
+        w = self._writer('VERBS', ['form', 'root', 'class', 'person',
+                                   'number', 'mode', 'voice',
+                                   'modification', 'hom'])
+        for i in range(size):
+            name, hom, vclass = roots[i % len(roots)]
+            mode, voice, person, number = combos[i // len(roots)]
+            form = name + 'a' + endings[voice][(person, number)]
+            w.writerow({'form': form, 'root': name, 'class': vclass,
+                        'person': person, 'number': number, 'mode': mode,
+                        'voice': voice, 'modification': '', 'hom': hom})
+        w.close()
+        return {'VERBS': w.num_rows}
+
+    def write_participle_stems(self):
+        size = self.sizes['participle_stems']
+        roots = self.roots
+        if size > len(roots) * len(_PARTICIPLES):
+            raise _capacity_error('participle stems', size,
+                                  len(roots) * len(_PARTICIPLES))
+
+        w = self._writer('PARTICIPLE_STEMS', ['stem', 'root', 'hom', 'class',
+                                              'mode', 'voice',
+                                              'modification'])
+        for i in range(size):
+            name, hom, vclass = roots[i % len(roots)]
+            mode, voice, suffix = _PARTICIPLES[i // len(roots)]
+            w.writerow({'stem': name + suffix, 'root': name, 'hom': hom,
+                        'class': '', 'mode': mode, 'voice': voice,
+                        'modification': ''})
+        w.close()
+        return {'PARTICIPLE_STEMS': w.num_rows}
+
+    def write_verbal_indeclinables(self):
+        size = self.sizes['verbal_indeclinables']
+        roots = self.roots
+        if size > len(roots) * len(_VERBAL_INDECLINABLES):
+            raise _capacity_error('verbal indeclinables', size,
+                                  len(roots) * len(_VERBAL_INDECLINABLES))
+
+        w = self._writer('VERBAL_INDECLINABLES', ['form', 'root', 'pos',
+                                                  'modification', 'hom'])
+        for i in range(size):
+            name, hom, vclass = roots[i % len(roots)]
+            pos, suffix = _VERBAL_INDECLINABLES[i // len(roots)]
+            w.writerow({'form': name + suffix, 'root': name, 'pos': pos,
+                        'modification': '', 'hom': hom})
+        w.close()
+        return {'VERBAL_INDECLINABLES': w.num_rows}
+
+    def write_nominal_stems(self):
+        """Write nominal stems. Each stem uses a stem type and gender group
+        that the source's inflected endings can decline."""
+        rng = self.rng
+        stem_types = sorted(set(
+            (row['stem_type'], row['stem_genders'])
+            for row in util.read_csv(
+                self.source_paths['INFLECTED_NOMINAL_ENDINGS'])))
+
+        w = self._writer('NOMINAL_STEMS', ['stem', 'stem_genders'])
+        seen = set()
+        for row in util.read_csv(self.source_paths['NOMINAL_STEMS']):
+            seen.add(row['stem'])
+
+        def make():
+            stem_type, genders = rng.choice(stem_types)
+            base = data.word(rng, 1, 3).rstrip('MH')
+            return base + rng.choice(_FINALS) + stem_type, genders
+
+        stems = self._unique(self.sizes['nominal_stems'], make)
+        for stem, genders in stems:
+            if stem not in seen:
+                w.writerow({'stem': stem, 'stem_genders': genders})
+        w.close()
+        return {'NOMINAL_STEMS': w.num_rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic data directory.')
+    parser.add_argument('output', help='the output directory')
+    parser.add_argument('--source', default=data.TEST_DATA_PATH,
+                        help='the data directory to copy enums and endings '
+                             'from (default: the test fixtures)')
+    parser.add_argument('--seed', type=int, default=data.SEED)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiply every default size by this factor')
+    for key, size in SIZES.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=int,
+                            help='number of {0} (default: {1})'.format(
+                                key.replace('_', ' '), size))
+    args = parser.parse_args(argv)
+
+    sizes = {}
+    for key, size in SIZES.items():
+        value = getattr(args, key)
+        sizes[key] = value if value is not None else int(size * args.scale)
+
+    generator = Generator(args.output, args.source, sizes, args.seed)
+    counts = generator.run()
+    for key in sorted(counts):
+        print('{0:<28} {1:>9} rows'.format(key, counts[key]))
+    for key in SKIPPED:
+        print('{0:<28} {1:>9}'.format(key, 'skipped'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.run
+~~~~~~~~~~~~~~
+
+A small runner for the benchmark suites that needs only the standard
+library. Results are written as JSON::
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --filter 'Joining|Meter'
+
+The output contains one record per benchmark and parameter combination,
+with the time per call in seconds. Suites follow asv conventions, so a
+benchmark is skipped if its `setup` raises :class:`NotImplementedError`.
+
+:license: MIT
+"""
+from __future__ import print_function
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import re
+import subprocess
+import sys
+import timeit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _get_commit():
+    """Return the current git commit, or ``None`` if it's unknown."""
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                             cwd=BENCHMARK_DIR,
+                                             stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def iter_benchmarks():
+    """Yield (name, class, method name) for each benchmark."""
+    for _, module_name, _ in pkgutil.iter_modules([BENCHMARK_DIR]):
+        if not module_name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.' + module_name)
+        classes = inspect.getmembers(module, inspect.isclass)
+        for class_name, cls in classes:
+            if cls.__module__ != module.__name__:
+                continue
+            for key in sorted(dir(cls)):
+                if key.startswith('time_'):
+                    name = '.'.join((module_name, class_name, key))
+                    yield name, cls, key
+
+
+def _iter_params(cls):
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    # As in asv, a flat list is shorthand for a single parameter.
+    if not params or not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return itertools.product(*params)
+
+
+def time_call(func, repeat, min_time):
+    """Time `func`, calling it enough times per round to take at least
+    `min_time` seconds.
+
+    :return: a dict with the number of calls per round, the number of
+             rounds, and the minimum and median time per call
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time or number >= 1e6:
+            break
+        number *= 10
+
+    times = sorted(t / number for t in timer.repeat(repeat, number))
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': times[0],
+        'median': times[len(times) // 2],
+    }
+
+
+def run(pattern=None, repeat=5, min_time=0.1, verbose=True):
+    """Run all benchmarks whose names match `pattern`.
+
+    :return: a list of result records
+    """
+    regex = re.compile(pattern) if pattern else None
+    results = []
+    for name, cls, method_name in iter_benchmarks():
+        if regex and not regex.search(name):
+            continue
+
+        for params in _iter_params(cls):
+            record = {'benchmark': name, 'params': list(params)}
+            suite = cls()
+            try:
+                if hasattr(suite, 'setup'):
+                    suite.setup(*params)
+            except NotImplementedError:
+                continue
+
+            method = getattr(suite, method_name)
+            record.update(time_call(lambda: method(*params), repeat,
+                                    min_time))
+            if hasattr(suite, 'teardown'):
+                suite.teardown(*params)
+
+            results.append(record)
+            if verbose:
+                print('{0}{1}: {2:.3g} s'.format(
+                    name, list(params) if params else '', record['min']),
+                    file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmarks.')
+    parser.add_argument('--output', default='-',
+                        help="output path, or '-' for stdout")
+    parser.add_argument('--filter', help='only run benchmarks whose names '
+                                         'match this regular expression')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='the number of timing rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='the minimum duration of a round, in seconds')
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't report progress on stderr")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, repeat=args.repeat, min_time=args.min_time,
+                  verbose=not args.quiet)
+    output = {
+        'commit': _get_commit(),
+        'date': datetime.datetime.utcnow().isoformat() + 'Z',
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'unit': 'seconds',
+        'results': results,
+    }
+
+    if args.output == '-':
+        json.dump(output, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,36 @@ sanskrit
 
 A general-purpose library for Sanskrit.
 
+Submodules and the names below are loaded on first use, so importing a
+light module such as :mod:`sanskrit.sounds` or
+:mod:`sanskrit.transliterate.sanscript` doesn't load SQLAlchemy or the
+database schema.
+
 :license: MIT and BSD
 """
 
-from .context import Context
-from .transliterate import betacode, sanscript
+import logging
+import sys
+
+from .util import lazy
+
+# Libraries shouldn't configure logging. Without a handler, Python 2
+# complains about the logger and Python 3 prints warnings to stderr.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+__all__ = ['Context', 'betacode', 'sanscript']
+
+_submodules = [
+    'analyze', 'chandas', 'context', 'export', 'generate', 'models', 'query',
+    'sandhi', 'schema', 'setup', 'shell', 'sounds', 'tagger', 'transliterate',
+    'util',
+]
+# The service uses ``async def``, and it isn't installed before Python 3.5.
+if sys.version_info >= (3, 5):
+    _submodules.append('service')
+
+lazy.install(__name__, {
+    'Context': ('.context', 'Context'),
+    'betacode': ('.transliterate.betacode', None),
+    'sanscript': ('.transliterate.sanscript', None),
+}, submodules=_submodules)
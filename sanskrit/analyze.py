@@ -13,6 +13,7 @@
 from collections import defaultdict, namedtuple
 
 from . import sounds, util
+from .util import metrics
 from .schema import *
 
 
@@ -51,32 +52,30 @@ class SimpleAnalyzer(Analyzer):
         self.session = ctx.session
 
         self.nominal_endings = util.HashTrie()
-        for e in self.session.query(NominalEnding):
-            stem_type = e.stem_type
-            is_cons = (stem_type == NominalEnding.CONSONANT_STEM_TYPE)
-            if e.stem_type == "_": 
-                e.stem_type = ""
-                is_cons = True
-
-            data = {
-                'name': e.name,
-                'stem_type': e.stem_type,
-                'length': len(e.name),
-                'gender_id': e.gender_id,
-                'case_id': e.case_id,
-                'number_id': e.number_id,
-                'compounded': e.compounded,
-                'is_consonant_stem': is_cons,
-            }
-            self.nominal_endings[e.name[::-1]] = Ending(**data)
-            if 'n' in e.name:
-                # TODO: do this more rigorously
-                reversed_name = e.name.replace('n', 'R')
-                data['name'] = reversed_name
-                self.nominal_endings[reversed_name[::-1]] = Ending(**data)
-
-
-        self.session.remove()
+        with ctx.private_session() as session:
+            for e in session.query(NominalEnding):
+                stem_type = e.stem_type
+                is_cons = (stem_type == NominalEnding.CONSONANT_STEM_TYPE)
+                if e.stem_type == "_": 
+                    e.stem_type = ""
+                    is_cons = True
+
+                data = {
+                    'name': e.name,
+                    'stem_type': e.stem_type,
+                    'length': len(e.name),
+                    'gender_id': e.gender_id,
+                    'case_id': e.case_id,
+                    'number_id': e.number_id,
+                    'compounded': e.compounded,
+                    'is_consonant_stem': is_cons,
+                }
+                self.nominal_endings[e.name[::-1]] = Ending(**data)
+                if 'n' in e.name:
+                    # TODO: do this more rigorously
+                    reversed_name = e.name.replace('n', 'R')
+                    data['name'] = reversed_name
+                    self.nominal_endings[reversed_name[::-1]] = Ending(**data)
 
     def _analyze_as_form(self, word):
         """
@@ -85,7 +84,10 @@ class SimpleAnalyzer(Analyzer):
         :param word: the word to analyze
         """
         session = self.session
-        results = session.query(Form).filter(Form.name == word).all()
+        registry = metrics.get_registry()
+        with registry.timer('analyzer.form_sql'):
+            results = session.query(Form).filter(Form.name == word).all()
+        registry.incr('analyzer.form_results', len(results))
         return results
 
     def _analyze_as_stem(self, word):
@@ -103,15 +105,18 @@ class SimpleAnalyzer(Analyzer):
         # stems might not exist.
         stem_endings_map = defaultdict(set)
         endings = self.nominal_endings[word[::-1]]
+        sound_class = sounds.CLASS_MAP.get
         for e in endings:
             truncated_stem = word[:-e.length] or word
             if e.is_consonant_stem:
                 # Stem must exist and end in a consonant.
                 if not truncated_stem:
                     continue
-                if truncated_stem[-1] in sounds.VOWELS:
+                mask = sound_class(truncated_stem[-1], 0)
+                if mask & sounds.CLASS_VOWEL:
                     continue
-                if truncated_stem in sounds.CONSONANTS:
+                if len(truncated_stem) == 1 and \
+                        mask & sounds.CLASS_CONSONANT:
                     continue
                 stem = truncated_stem
             else:
@@ -123,8 +128,12 @@ class SimpleAnalyzer(Analyzer):
             return []
 
         # Check which of these stems are viable
-        stems = session.query(Stem) \
-                       .filter(Stem.name.in_(stem_endings_map.keys()))
+        registry = metrics.get_registry()
+        registry.incr('analyzer.stem_candidates', len(stem_endings_map))
+        with registry.timer('analyzer.stem_sql'):
+            stems = session.query(Stem) \
+                           .filter(Stem.name.in_(stem_endings_map.keys())) \
+                           .all()
 
         # Reattach endings to viable stems
         for stem in stems:
@@ -152,15 +161,20 @@ class SimpleAnalyzer(Analyzer):
                 }
                 returned.append(Nominal(**datum))
 
+        registry.incr('analyzer.stem_results', len(returned))
         return returned
 
     def analyze(self, word):
         """Return all possible solutions for the given word. Any ORM
-        objects used in these solutions will be in a detached state.
+        objects used in these solutions belong to the calling thread's
+        session, which is left open so that they can still load their
+        attributes. Call ``ctx.session.remove()`` when you're done with
+        them.
 
         :param word: the word to analyze. This should be a complete
                      word, or what Panini would call a *pada*.
         """
-        returned = self._analyze_as_form(word)
-        returned.extend(self._analyze_as_stem(word))
+        with metrics.timer('analyzer.analyze'):
+            returned = self._analyze_as_form(word)
+            returned.extend(self._analyze_as_stem(word))
         return returned
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+    sanskrit.chandas
+    ~~~~~~~~~~~~~~~~
+
+    Classification of Sanskrit metres. For example::
+
+        classifier = Classifier()
+        pada = 'kaScitkAntAvirahaguruRA svADikArapramattaH'
+        assert classifier.classify(pada) == 'mandAkrAntA'
+
+    Each pāda is scanned with :func:`sanskrit.sounds.meter` and reduced to
+    a *signature*, an integer whose `i`-th bit is set if the `i`-th syllable
+    is heavy. Metres with fixed patterns are stored in a hash index keyed on
+    syllable count and signature, so most pādas are classified with a
+    single lookup. The anuṣṭubh (śloka), whose syllables are mostly free, is
+    recognized by checking its few fixed positions instead.
+
+    As in the tradition, the last syllable of a pāda may be heavy or light
+    in every metre.
+
+    All functions assume SLP1.
+
+    :license: MIT
+"""
+
+from . import sounds
+
+
+#: The eight gaṇas (syllable triplets), along with `l` for a single light
+#: syllable and `g` for a single heavy one. `'_'` marks a heavy syllable
+#: and `'.'` marks a light syllable.
+GANAS = {
+    'y': '.__',
+    'm': '___',
+    't': '__.',
+    'r': '_._',
+    'j': '._.',
+    'B': '_..',
+    'n': '...',
+    's': '.._',
+    'l': '.',
+    'g': '_',
+}
+
+#: Name of the anuṣṭubh metre, which isn't stored in :data:`METRES`.
+ANUSTUBH = 'anuzwuB'
+
+#: Metres with a fixed pattern, as (name, gaṇa sequence) pairs.
+METRES = [
+    # 11 syllables (triṣṭubh). Alternating lines of indravajrā and
+    # upendravajrā form the upajāti.
+    ('indravajrA', 'ttjgg'),
+    ('upendravajrA', 'jtjgg'),
+    ('rATodDatA', 'rnrlg'),
+    ('svAgatA', 'rnBgg'),
+    ('SAlinI', 'mttgg'),
+    # 12 syllables (jagatī)
+    ('vaMSasTa', 'jtjr'),
+    ('indravaMSA', 'ttjr'),
+    ('drutavilambita', 'nBBr'),
+    ('BujaNgaprayAta', 'yyyy'),
+    ('towaka', 'ssss'),
+    ('pramitAkzarA', 'sjss'),
+    # 13 syllables
+    ('praharziRI', 'mnjrg'),
+    ('rucirA', 'jBsjg'),
+    ('maYjuBAziRI', 'sjsjg'),
+    # 14 to 21 syllables
+    ('vasantatilakA', 'tBjjgg'),
+    ('mAlinI', 'nnmyy'),
+    ('mandAkrAntA', 'mBnttgg'),
+    ('SiKariRI', 'ymnsBlg'),
+    ('pfTvI', 'jsjsylg'),
+    ('hariRI', 'nsmrslg'),
+    ('SArdUlavikrIqita', 'msjsttg'),
+    ('sragDarA', 'mrBnyyy'),
+]
+
+
+def ganas_to_pattern(ganas):
+    """Expand a gaṇa sequence into a pattern of `'_'` and `'.'`::
+
+        assert ganas_to_pattern('ttjgg') == '__.__.._.__'
+
+    :param ganas: a string of gaṇa names (see :data:`GANAS`)
+    """
+    return ''.join(GANAS[x] for x in ganas)
+
+
+def signature(scan):
+    """Pack a scanned pāda into an integer whose `i`-th bit is set iff the
+    `i`-th syllable is heavy.
+
+    :param scan: a sequence whose items are truthy for heavy syllables
+    """
+    returned = 0
+    for i, heavy in enumerate(scan):
+        if heavy:
+            returned |= 1 << i
+    return returned
+
+
+def is_anustubh_pada(scan):
+    """Return whether `scan` is a valid pāda of a *pathyā* anuṣṭubh. The
+    fifth syllable must be light, the sixth must be heavy, and the second
+    and third can't both be light. The seventh syllable is heavy in odd
+    pādas and light in even ones, so it is not checked here.
+
+    :param scan: a sequence whose items are truthy for heavy syllables
+    """
+    return (len(scan) == 8 and not scan[4] and scan[5] and
+            (scan[1] or scan[2]))
+
+
+class Classifier(object):
+
+    """Classifies pādas by their metre.
+
+    :param metres: a list of (name, gaṇa sequence) pairs. By default, use
+                   :data:`METRES`.
+    """
+
+    def __init__(self, metres=None):
+        #: Maps (number of syllables, signature) to a metre name.
+        self.index = {}
+        for name, ganas in (metres or METRES):
+            pattern = ganas_to_pattern(ganas)
+            scan = [x == '_' for x in pattern]
+            num_syllables = len(scan)
+            # The final syllable is free.
+            for last in (True, False):
+                scan[-1] = last
+                key = (num_syllables, signature(scan))
+                self.index.setdefault(key, name)
+
+    def classify_scan(self, scan):
+        """Return the name of the metre that matches `scan`, or ``None`` if
+        no metre matches.
+
+        A 16-syllable scan is also tried as a full line of anuṣṭubh,
+        since ślokas are usually written two pādas to a line.
+
+        :param scan: a sequence whose items are truthy for heavy syllables
+        """
+        num_syllables = len(scan)
+        name = self.index.get((num_syllables, signature(scan)))
+        if name is not None:
+            return name
+
+        # Fallback for the anuṣṭubh
+        if num_syllables == 8 and is_anustubh_pada(scan):
+            return ANUSTUBH
+        if (num_syllables == 16 and is_anustubh_pada(scan[:8]) and
+                is_anustubh_pada(scan[8:])):
+            return ANUSTUBH
+        return None
+
+    def classify(self, pada):
+        """Return the name of the metre of `pada`, or ``None`` if no metre
+        matches.
+
+        :param pada: a pāda or, for anuṣṭubh, a half-verse
+        """
+        return self.classify_scan(sounds.meter(pada, heavy=True,
+                                               light=False))
+
+    def classify_many(self, lines):
+        """Classify each of `lines`. If NumPy is available, lines are
+        scanned in a single batch with :func:`sanskrit.sounds.meter_many`.
+
+        :param lines: a list of pādas
+        :return: a list with one metre name (or ``None``) per line
+        """
+        lines = list(lines)
+        try:
+            scans = sounds.meter_many(lines)
+        except ImportError:
+            scans = [sounds.meter(x, heavy=True, light=False) for x in lines]
+        return [self.classify_scan(x) for x in scans]
+
+    def classify_file(self, path):
+        """Classify each non-empty line of the file at `path`.
+
+        :param path: the path to a text file in SLP1
+        :return: a list of (line, metre name) pairs
+        """
+        with open(path) as f:
+            lines = [x.strip() for x in f]
+        lines = [x for x in lines if x]
+        return list(zip(lines, self.classify_many(lines)))
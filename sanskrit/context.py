@@ -8,16 +8,108 @@
 
     :license: MIT
 """
-from __future__ import print_function
 from past.builtins import execfile
 import six
+from six.moves.urllib.request import pathname2url
+import contextlib
+import functools
 import imp
+import json
+import logging
 import os
+import sqlite3
+import threading
+import uuid
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, literal, select, union_all
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import DisconnectionError, SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 
-from .schema import Base, EnumBase, GenderGroup
+from .schema import Base, DatabaseInfo, EnumBase, GenderGroupAssociation
+
+try:
+    from types import MappingProxyType
+except ImportError:
+    # Python 2 has no read-only view, so use a copy instead.
+    MappingProxyType = dict
+
+log = logging.getLogger(__name__)
+
+# Enumerated data shared by every context in the process, keyed by
+# (database URI, build ID). A build ID changes whenever the database is
+# rebuilt, so entries never go stale.
+_ENUM_CACHE = {}
+
+# Statements that make a connection read-only, by database backend.
+_READ_ONLY_STATEMENTS = {
+    'sqlite': 'PRAGMA query_only = ON',
+    'postgresql': 'SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY',
+    'mysql': 'SET SESSION TRANSACTION READ ONLY',
+}
+
+
+def fetch_enum_data(session):
+    """Fetch the enumerated data in the database as a JSON-compatible
+    :class:`dict`. :mod:`sanskrit.setup` stores this data in the database
+    so that contexts can load it in one step.
+
+    :param session: the session to query with
+    :return: a :class:`dict` with two keys. ``'enums'`` maps each enum
+             table to a list of ``[id, name, abbr]`` rows, and
+             ``'gender_groups'`` maps each gender group ID, as a string,
+             to a list of its gender IDs.
+    """
+    tables = [select([literal(cls.__tablename__).label('kind'),
+                      cls.id, cls.name, cls.abbr])
+              for cls in EnumBase.__subclasses__()]
+    enums = {}
+    for kind, id, name, abbr in session.execute(union_all(*tables)):
+        enums.setdefault(kind, []).append([id, name, abbr])
+
+    groups = dict((str(id), []) for id, _, _ in enums.get('gender_group', ()))
+    assocs = session.query(GenderGroupAssociation.group_id,
+                           GenderGroupAssociation.gender_id)
+    for group_id, gender_id in assocs.order_by(GenderGroupAssociation.id):
+        groups.setdefault(str(group_id), []).append(gender_id)
+
+    return {'enums': enums, 'gender_groups': groups}
+
+
+def _make_enums(data):
+    """Build read-only versions of :attr:`Context.enum_id`,
+    :attr:`Context.enum_abbr`, and :attr:`Context.gender_set` from the
+    output of :func:`fetch_enum_data`.
+    """
+    all_enum_id = {}
+    all_enum_abbr = {}
+    for kind, rows in data['enums'].items():
+        enum_id = {}
+        enum_abbr = {}
+        for id, name, abbr in rows:
+            enum_id[name] = enum_id[abbr] = id
+            enum_abbr[id] = enum_abbr[name] = abbr
+        all_enum_id[kind] = MappingProxyType(enum_id)
+        all_enum_abbr[kind] = MappingProxyType(enum_abbr)
+
+    gender_set = dict((int(id), frozenset(members))
+                      for id, members in data['gender_groups'].items())
+    return (MappingProxyType(all_enum_id), MappingProxyType(all_enum_abbr),
+            MappingProxyType(gender_set))
+
+
+def _ping(dbapi_connection, connection_record, connection_proxy):
+    """Check that a pooled connection still works before it's used. If it
+    doesn't, the pool discards it and tries another.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    except Exception:
+        raise DisconnectionError()
+    finally:
+        cursor.close()
 
 
 class Context(object):
@@ -45,6 +137,53 @@ class Context(object):
 
         context.config['FOO'] = 'baz'
 
+    A context and the objects built from it, such as
+    :class:`~sanskrit.analyze.SimpleAnalyzer`,
+    :class:`~sanskrit.query.SimpleQuery`, and
+    :class:`~sanskrit.tagger.Tagger`, can be shared by many threads:
+
+    - :attr:`session` is a :class:`~sqlalchemy.orm.scoping.scoped_session`,
+      so each thread gets its own session and connection.
+    - Methods that return plain data, such as constructors and paradigm
+      queries, read through sessions of their own, which they close
+      before they return. They never touch the calling thread's
+      :attr:`session`.
+    - Methods that return ORM objects, such as
+      :meth:`~sanskrit.analyze.SimpleAnalyzer.analyze` and
+      :meth:`~sanskrit.tagger.Tagger.tag`, leave the session open so that
+      those objects can still load their attributes. Call
+      ``ctx.session.remove()`` when the thread is done with them, such as
+      at the end of a web request.
+
+    These config values control the database connection:
+
+    - ``DATABASE_URI``: the database to connect to. Each context that
+      uses an in-memory SQLite database gets its own database. On Python
+      2, such a context can only be used by one thread at a time.
+    - ``DATABASE_POOL_SIZE``: the number of connections to keep open. This
+      should be at least the number of threads that use the context. If
+      unset, use SQLAlchemy's default.
+    - ``DATABASE_MAX_OVERFLOW``: the number of connections to open beyond
+      ``DATABASE_POOL_SIZE`` when the pool is exhausted
+    - ``DATABASE_POOL_PRE_PING``: if true, test each connection before
+      using it and replace it if it's stale. This is useful when a
+      database server closes idle connections.
+    - ``DATABASE_STATEMENT_CACHE_SIZE``: the number of prepared statements
+      each connection keeps. This applies to SQLite only.
+    - ``DATABASE_READ_ONLY``: if true, refuse all writes. This is supported
+      for SQLite, PostgreSQL, and MySQL. On Python 3, SQLite files are
+      also opened in read-only mode.
+
+    and for SQLite only:
+
+    - ``SQLITE_WAL``: if true, use write-ahead logging, which lets readers
+      and a writer work at the same time. This setting is stored in the
+      file, so read-only contexts ignore it; set it when building the
+      database instead.
+    - ``SQLITE_MMAP_SIZE``: the number of bytes of the file to memory-map
+    - ``SQLITE_CACHE_SIZE``: the size of each connection's page cache, in
+      pages or, if negative, in KiB
+
     :param config: an object to read from. If this is a string, treat
                    `config` as a module path and load values from that
                    module. Otherwise, treat `config` as a dictionary.
@@ -60,9 +199,20 @@ class Context(object):
         #: the :attr:`session`.
         self.engine = None
 
-        #: A :class:`~sqlalchemy.orm.session.Session` class.
+        #: A :class:`~sqlalchemy.orm.session.sessionmaker` for sessions
+        #: that are independent of :attr:`session`.
+        self.session_factory = None
+
+        #: A :class:`~sqlalchemy.orm.scoping.scoped_session` that gives
+        #: each thread its own session.
         self.session = None
 
+        self._enum_lock = threading.Lock()
+
+        # Keeps a shared-cache in-memory database alive. See
+        # `_engine_options`.
+        self._memory_connection = None
+
         if isinstance(config, (six.text_type, six.string_types)):
             filepath = config
             config = imp.new_module('config')
@@ -117,12 +267,147 @@ class Context(object):
         from sanskrit import setup
         setup.run(self)
 
+    def _engine_options(self, url):
+        """Return keyword arguments for
+        :func:`~sqlalchemy.create_engine`."""
+        config = self.config
+        options = {}
+        pool_options = {}
+        connect_args = {}
+        for key, option in (('DATABASE_POOL_SIZE', 'pool_size'),
+                            ('DATABASE_MAX_OVERFLOW', 'max_overflow')):
+            if config.get(key) is not None:
+                pool_options[option] = config[key]
+
+        if url.get_backend_name() == 'sqlite':
+            # A pooled connection is used by one thread at a time, but not
+            # always the same thread, so sqlite3's same-thread check only
+            # gets in the way.
+            connect_args['check_same_thread'] = False
+            cache_size = config.get('DATABASE_STATEMENT_CACHE_SIZE')
+            if cache_size is not None:
+                connect_args['cached_statements'] = cache_size
+
+            if url.database in (None, '', ':memory:'):
+                if six.PY3:
+                    # Each plain connection to an in-memory database gets
+                    # its own, empty database. Instead, give each
+                    # connection its own handle to one named database in
+                    # shared-cache mode, which lasts as long as one
+                    # connection to it is open.
+                    name = 'file:sanskrit-{0}?mode=memory&cache=shared'.format(
+                        uuid.uuid4().hex)
+                    creator = functools.partial(sqlite3.connect, name,
+                                                uri=True, **connect_args)
+                    self._memory_connection = creator()
+                    options['creator'] = creator
+                    options['poolclass'] = QueuePool
+                else:
+                    # Python 2 can't open a shared-cache database, so every
+                    # thread shares one connection. Only one thread may
+                    # use the context at a time.
+                    options['poolclass'] = StaticPool
+                    pool_options = {}
+            else:
+                if pool_options:
+                    # SQLite files use a NullPool by default, which can't
+                    # be sized.
+                    options['poolclass'] = QueuePool
+                if config.get('DATABASE_READ_ONLY') and six.PY3:
+                    # Open the file itself read-only, so that SQLite
+                    # doesn't need write access to it.
+                    path = pathname2url(os.path.abspath(url.database))
+                    options['creator'] = functools.partial(
+                        sqlite3.connect, 'file:{0}?mode=ro'.format(path),
+                        uri=True, **connect_args)
+
+        options.update(pool_options)
+        if connect_args:
+            options['connect_args'] = connect_args
+        return options
+
+    def _connect_statements(self, url):
+        """Return the statements to run on each new connection."""
+        config = self.config
+        backend = url.get_backend_name()
+        statements = []
+
+        if backend == 'sqlite':
+            # The journal mode is stored in the file, and a read-only
+            # connection can't change it.
+            read_only = config.get('DATABASE_READ_ONLY')
+            if config.get('SQLITE_WAL') and not read_only:
+                statements.append('PRAGMA journal_mode = WAL')
+            for key, pragma in (('SQLITE_MMAP_SIZE', 'mmap_size'),
+                                ('SQLITE_CACHE_SIZE', 'cache_size')):
+                if config.get(key) is not None:
+                    statements.append('PRAGMA {0} = {1:d}'.format(
+                        pragma, config[key]))
+
+        if config.get('DATABASE_READ_ONLY'):
+            try:
+                statements.append(_READ_ONLY_STATEMENTS[backend])
+            except KeyError:
+                raise ValueError('DATABASE_READ_ONLY is not supported for '
+                                 '{0} databases.'.format(backend))
+        return statements
+
     def connect(self):
-        """Connect to the database."""
-        self.engine = create_engine(self.config['DATABASE_URI'])
-        self.session = scoped_session(sessionmaker(autocommit=False,
-                                                   autoflush=False,
-                                                   bind=self.engine))
+        """Connect to the database. If the context is already connected,
+        :meth:`close` the old connection first.
+        """
+        if self.engine is not None:
+            self.close()
+        url = make_url(self.config['DATABASE_URI'])
+        statements = self._connect_statements(url)
+        self.engine = create_engine(url, **self._engine_options(url))
+
+        if statements:
+            @event.listens_for(self.engine, 'connect')
+            def configure(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.close()
+
+        if self.config.get('DATABASE_POOL_PRE_PING'):
+            event.listen(self.engine, 'checkout', _ping)
+
+        self.session_factory = sessionmaker(autocommit=False,
+                                            autoflush=False,
+                                            bind=self.engine)
+        self.session = scoped_session(self.session_factory)
+
+    @contextlib.contextmanager
+    def private_session(self):
+        """Yield a new session that is independent of the calling
+        thread's :attr:`session`, and close it afterward. Library code uses
+        this for internal reads so that it never changes the state of the
+        caller's session::
+
+            with ctx.private_session() as session:
+                count = session.query(Root).count()
+        """
+        session = self.session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def close(self):
+        """Release the context's database resources. This removes the
+        calling thread's :attr:`session`, closes every pooled connection,
+        and closes the connection that keeps an in-memory database alive,
+        which deletes that database. Call :meth:`connect` to use the
+        context again.
+        """
+        if self.session is not None:
+            self.session.remove()
+        if self.engine is not None:
+            self.engine.dispose()
+        if self._memory_connection is not None:
+            self._memory_connection.close()
+            self._memory_connection = None
 
     def create_all(self):
         """Create tables for every model in `sanskrit.schema`."""
@@ -130,34 +415,69 @@ class Context(object):
         extant = {
             t.name for t in metadata.tables.values() if t.exists(self.engine)}
         metadata.create_all(self.engine)
-        for name in metadata.sorted_tables:
-            if name not in extant:
-                print('  [ c ] {0}'.format(name))
+        for table in metadata.sorted_tables:
+            if table.name not in extant:
+                log.info('Created table %s', table.name)
 
     def drop_all(self):
         """Drop all tables defined in `sanskrit.schema`."""
         Base.metadata.drop_all(self.engine)
 
+    def _database_info(self, *keys):
+        """Return a :class:`dict` with the database info for `keys`. If
+        the database has no info table, return an empty :class:`dict`.
+        """
+        with self.private_session() as session:
+            try:
+                rows = session.query(DatabaseInfo) \
+                              .filter(DatabaseInfo.key.in_(keys))
+                return dict((row.key, row.value) for row in rows)
+            except SQLAlchemyError:
+                # Databases created by older versions have no info table.
+                return {}
+
+    @property
+    def build_id(self):
+        """The ID of the build that created the database, or ``None`` if
+        the database doesn't have one. The ID changes whenever the
+        database is rebuilt.
+        """
+        return self._database_info(DatabaseInfo.BUILD_ID).get(
+            DatabaseInfo.BUILD_ID)
+
     def _build_enums(self):
-        """Fetch and store enumerated data."""
-        self._enum_id = {}
-        self._enum_abbr = {}
-        self._gender_set = {}
-
-        session = self.session
-        for cls in EnumBase.__subclasses__():
-            key = cls.__tablename__
-            self._enum_id[key] = enum_id = {}
-            self._enum_abbr[key] = enum_abbr = {}
-            for item in session.query(cls).all():
-                enum_id[item.name] = enum_id[item.abbr] = item.id
-                enum_abbr[item.id] = enum_abbr[item.name] = item.abbr
-
-        for group in session.query(GenderGroup):
-            member_ids = set([x.id for x in group.members])
-            self._gender_set[group.id] = member_ids
-
-        session.remove()
+        """Fetch and store enumerated data. This is safe to call from many
+        threads at once: the data is fetched just once, and it's published
+        only when it's complete.
+
+        The data is read-only and is shared by all contexts in the process
+        that use the same database build. It's read from the copy that
+        :mod:`sanskrit.setup` stores in the database or, for databases
+        built by older versions, from the enum tables themselves.
+        """
+        with self._enum_lock:
+            if hasattr(self, '_gender_set'):
+                return
+
+            info = self._database_info(DatabaseInfo.BUILD_ID,
+                                       DatabaseInfo.ENUMS)
+            build_id = info.get(DatabaseInfo.BUILD_ID)
+            key = (self.config['DATABASE_URI'], build_id)
+            enums = _ENUM_CACHE.get(key) if build_id else None
+
+            if enums is None:
+                if DatabaseInfo.ENUMS in info:
+                    data = json.loads(info[DatabaseInfo.ENUMS])
+                else:
+                    with self.private_session() as session:
+                        data = fetch_enum_data(session)
+                enums = _make_enums(data)
+                if build_id:
+                    # Another context might store the same data at the
+                    # same time, which is harmless.
+                    enums = _ENUM_CACHE.setdefault(key, enums)
+
+            self._enum_id, self._enum_abbr, self._gender_set = enums
 
     @property
     def enum_id(self):
@@ -179,6 +499,7 @@ class Context(object):
 
     @property
     def gender_set(self):
+        """Maps a gender group ID to the set of its gender IDs."""
         try:
             return self._gender_set
         except AttributeError:
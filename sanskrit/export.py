@@ -0,0 +1,120 @@
+"""
+    sanskrit.export
+    ~~~~~~~~~~~~~~~
+
+    Bulk export of generated forms. To write the full paradigm of every
+    nominal stem in the database, run::
+
+        python -m sanskrit.export config.py paradigms.csv
+
+    Output is written as CSV (one row per form) or as JSON lines (one
+    object per paradigm), depending on the file extension or the
+    ``--format`` option. Use ``-`` to write to stdout.
+
+    :license: MIT
+"""
+from __future__ import print_function
+import argparse
+import csv
+import io
+import json
+import sys
+
+import six
+
+from . import sounds
+from .context import Context
+from .generate import NominalGenerator
+from .schema import NominalStem
+
+
+def _simplify(name):
+    """Apply consonant reduction, as :class:`~sanskrit.query.SimpleQuery`
+    does."""
+    return name[:-1] + sounds.simplify(name[-1])
+
+
+def iter_nominal_paradigms(ctx, batch_size=1000):
+    """Generate the paradigm of every nominal stem in all of its genders.
+    Forms are simplified with consonant reduction.
+
+    :param ctx: some :class:`~sanskrit.Context`
+    :param batch_size: the number of stems to fetch per round trip
+    :return: a generator of 3-tuples, each of which contains the stem
+             name, the gender abbreviation, and the paradigm
+    """
+    generator = NominalGenerator(ctx)
+    with ctx.private_session() as session:
+        stems = session.query(NominalStem.name, NominalStem.genders_id) \
+                       .order_by(NominalStem.id) \
+                       .yield_per(batch_size)
+
+        for stem_name, gender, paradigm in generator.paradigms(stems):
+            for parse, name in paradigm.items():
+                paradigm[parse] = _simplify(name)
+            yield (stem_name, gender, paradigm)
+
+
+def write_csv(paradigms, f):
+    """Write `paradigms` as CSV, with one row per form."""
+    writer = csv.writer(f)
+    writer.writerow(['stem', 'gender', 'case', 'number', 'form'])
+    for stem_name, gender, paradigm in paradigms:
+        for (case, number), name in sorted(paradigm.items()):
+            writer.writerow([stem_name, gender, case, number, name])
+
+
+def write_jsonl(paradigms, f):
+    """Write `paradigms` as JSON lines, with one object per paradigm.
+    Forms are keyed by case and number, e.g. ``'1s'``.
+    """
+    for stem_name, gender, paradigm in paradigms:
+        forms = dict((case + number, name)
+                     for (case, number), name in paradigm.items())
+        datum = {'stem': stem_name, 'gender': gender, 'forms': forms}
+        f.write(json.dumps(datum, sort_keys=True))
+        f.write('\n')
+
+
+WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+}
+
+
+def _open_output(path):
+    """Open `path` for any of the :data:`WRITERS`. The :mod:`csv` module
+    writes its own line endings, so it needs a binary file on Python 2 and
+    a file with ``newline=''`` on Python 3.
+    """
+    if six.PY2:
+        return open(path, 'wb')
+    return io.open(path, 'w', encoding='utf-8', newline='')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Export the paradigms of all nominal stems.')
+    parser.add_argument('config', help='path to a config module')
+    parser.add_argument('output', help="output path, or '-' for stdout")
+    parser.add_argument('--format', choices=sorted(WRITERS),
+                        help='output format. By default, this is inferred '
+                             'from the output path.')
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = 'jsonl' if args.output.endswith('.jsonl') else 'csv'
+    write = WRITERS[fmt]
+
+    ctx = Context(args.config)
+    paradigms = iter_nominal_paradigms(ctx)
+    if args.output == '-':
+        write(paradigms, sys.stdout)
+    else:
+        with _open_output(args.output) as f:
+            write(paradigms, f)
+
+
+if __name__ == '__main__':
+    main()
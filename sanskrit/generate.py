@@ -20,6 +20,11 @@ from . import util
 from .schema import NominalEnding
 
 
+#: The (case, number) slots of a nominal paradigm, in the order used by
+#: the ending tables in :class:`NominalGenerator`.
+NOMINAL_SLOTS = [(case, number) for case in '12345678' for number in 'sdp']
+
+
 class Generator(object):
 
     """Template for a generator."""
@@ -37,45 +42,139 @@ class NominalGenerator(Generator):
     """
     A generator for nominal forms.
 
+    On construction, the endings for each stem type are compiled into a
+    flat table indexed by gender, case, and number, and each stem's
+    resolved stem type is cached after its first use. Generating a
+    paradigm is then just a matter of joining the stem to a slice of that
+    table.
+
     :param ctx: some :class:`~sanskrit.Context`.
     """
 
+    #: The maximum number of resolved stem types to cache.
+    STEM_TYPE_CACHE_SIZE = 100000
+
     def __init__(self, ctx):
         self.ctx = ctx
-        session = ctx.session
 
         self.nominal_stem_trie = util.HashTrie()
         self.nominal_endings = {}
         seen = set()
-        for e in session.query(NominalEnding):
-            stem_type = e.stem_type
-            if stem_type not in seen:
-                seen.add(stem_type)
-                self.nominal_stem_trie[stem_type[::-1]] = stem_type
-                self.nominal_endings[stem_type] = {}
-
-            key = (e.gender_id, e.case_id, e.number_id)
-            self.nominal_endings[stem_type][key] = e.name
-        session.remove()
+        with ctx.private_session() as session:
+            for e in session.query(NominalEnding):
+                stem_type = e.stem_type
+                if stem_type not in seen:
+                    seen.add(stem_type)
+                    self.nominal_stem_trie[stem_type[::-1]] = stem_type
+                    self.nominal_endings[stem_type] = {}
+
+                key = (e.gender_id, e.case_id, e.number_id)
+                self.nominal_endings[stem_type][key] = e.name
+
+        self._compile_endings()
+        self._stem_types = {}
+
+    def _compile_endings(self):
+        """Compile :attr:`nominal_endings` into flat tables.
+
+        Each stem type maps to a tuple with one entry per (gender, case,
+        number) slot. Slot ``g * len(NOMINAL_SLOTS) + i`` holds the ending
+        for gender index ``g`` and ``NOMINAL_SLOTS[i]``, or ``None`` if
+        the stem type has no such ending.
+        """
+        enum_id = self.ctx.enum_id
+        gender_ids = sorted(set(enum_id['gender'].values()))
+
+        #: Maps a gender ID to its position in the ending tables.
+        self.gender_index = dict((id, i) for i, id in enumerate(gender_ids))
+        #: Maps a gender name or abbreviation to its position in the
+        #: ending tables.
+        self._gender_key_index = dict(
+            (key, self.gender_index[id])
+            for key, id in enum_id['gender'].items())
+
+        slot_ids = [(enum_id['case'][case], enum_id['number'][number])
+                    for case, number in NOMINAL_SLOTS]
+
+        #: Maps a stem type to its flat ending table.
+        self.ending_tables = {}
+        for stem_type, endings in self.nominal_endings.items():
+            self.ending_tables[stem_type] = tuple(
+                endings.get((gender_id, case_id, number_id))
+                for gender_id in gender_ids
+                for case_id, number_id in slot_ids)
+
+    def _resolve_stem_type(self, stem_name):
+        """Return the longest stem type that matches `stem_name`. If no stem
+        type matches, raise :exc:`ValueError`.
+        """
+        stem_types = self.nominal_stem_trie[stem_name[::-1]]
+        return max(stem_types, key=len)
+
+    def _stem_type(self, stem_name):
+        """Like :meth:`_resolve_stem_type`, but cached."""
+        cache = self._stem_types
+        try:
+            return cache[stem_name]
+        except KeyError:
+            stem_type = self._resolve_stem_type(stem_name)
+            if len(cache) >= self.STEM_TYPE_CACHE_SIZE:
+                cache.clear()
+            cache[stem_name] = stem_type
+            return stem_type
+
+    def _endings(self, stem_type, gender_index):
+        """Return the slice of an ending table that applies to the given
+        gender.
+        """
+        size = len(NOMINAL_SLOTS)
+        start = gender_index * size
+        return self.ending_tables[stem_type][start:start + size]
 
     def paradigm(self, stem_name, gender):
         """Generate a full paradigm using normal Sanskrit rules. The
         function treats irregular stems as regular.
         """
-
-        stem_types = self.nominal_stem_trie[stem_name[::-1]]
-        stem_type = max(stem_types, key=len)
+        stem_type = self._stem_type(stem_name)
         truncated = stem_name[:-len(stem_type)]
-        endings = self.nominal_endings[stem_type]
-
-        returned = {}
-        enum = self.ctx.enum_id
-        gender_id = enum['gender'][gender]
-        for case in '12345678':
-            case_id = enum['case'][case]
-            for number in 'sdp':
-                number_id = enum['number'][number]
-                key = (gender_id, case_id, number_id)
-                returned[(case, number)] = truncated + endings[key]
-
-        return returned
+        endings = self._endings(stem_type, self._gender_key_index[gender])
+        if None in endings:
+            raise KeyError((stem_type, gender))
+
+        return dict(zip(NOMINAL_SLOTS, [truncated + e for e in endings]))
+
+    def paradigms(self, stems):
+        """Generate full paradigms for many stems at once. Each stem is
+        inflected in all of its genders. Like :meth:`paradigm`, this
+        function treats irregular stems as regular.
+
+        Stem types are resolved once per stem and are not added to the
+        stem type cache, so this is the fastest way to inflect a large
+        number of distinct stems. Stems whose stem type is unknown are
+        skipped, as are genders for which the stem type has no endings.
+
+        :param stems: an iterable of objects with `name` and `genders_id`
+                      attributes, such as
+                      :class:`~sanskrit.schema.NominalStem` rows
+        :return: a generator of 3-tuples, each of which contains the stem
+                 name, the gender abbreviation, and the paradigm
+        """
+        gender_abbr = self.ctx.enum_abbr['gender']
+        gender_set = self.ctx.gender_set
+        gender_index = self.gender_index
+
+        for stem in stems:
+            stem_name = stem.name
+            try:
+                stem_type = self._resolve_stem_type(stem_name)
+            except ValueError:
+                continue
+            truncated = stem_name[:-len(stem_type)]
+
+            for gender_id in sorted(gender_set.get(stem.genders_id, ())):
+                endings = self._endings(stem_type, gender_index[gender_id])
+                paradigm = dict((slot, truncated + e)
+                                for slot, e in zip(NOMINAL_SLOTS, endings)
+                                if e is not None)
+                if paradigm:
+                    yield (stem_name, gender_abbr[gender_id], paradigm)
@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 """
     sanskrit.models
     ~~~~~~~~~~~~~~~
@@ -11,11 +12,104 @@ from builtins import next, zip, range
 import collections
 import itertools
 import math
+import multiprocessing
+import struct
+
+from .util import import_numpy
 
 
 #: Marks the beginning or end of a sequence.
 SEQUENCE_BOUNDARY = '__SEQ_BOUNDARY__'
 
+#: Identifies files written by :meth:`SequenceModel.save`.
+MODEL_FILE_MAGIC = b'SQMODEL1'
+
+
+# Serialization
+# -------------
+# Models are saved in a compact binary format that is shared by all model
+# classes. All integers are little-endian. After :data:`MODEL_FILE_MAGIC`,
+# the file contains:
+#
+# - the number of events, then each event as UTF-8 with a length prefix
+# - the number of prior counts, then (event index, count) pairs
+# - the number of joint counts, then (event index, event index, count)
+#   triples
+
+_U32 = struct.Struct('<I')
+_PRIOR_ITEM = struct.Struct('<IQ')
+_JOINT_ITEM = struct.Struct('<IIQ')
+
+
+def _write_counts(f, prior, joint):
+    """Write `prior` and `joint` to the binary file `f`.
+
+    :param prior: a dict that maps events to counts
+    :param joint: a dict that maps pairs of events to counts
+    """
+    index = {}
+    events = []
+    pairs = itertools.chain.from_iterable(joint)
+    for x in itertools.chain(prior, pairs):
+        if x not in index:
+            index[x] = len(events)
+            events.append(x)
+
+    f.write(MODEL_FILE_MAGIC)
+    f.write(_U32.pack(len(events)))
+    for x in events:
+        data = x.encode('utf-8')
+        f.write(_U32.pack(len(data)))
+        f.write(data)
+
+    f.write(_U32.pack(len(prior)))
+    f.write(b''.join(_PRIOR_ITEM.pack(index[x], count)
+                     for x, count in prior.items()))
+    f.write(_U32.pack(len(joint)))
+    f.write(b''.join(_JOINT_ITEM.pack(index[x], index[y], count)
+                     for (x, y), count in joint.items()))
+
+
+def _read_exactly(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError('Unexpected end of model file')
+    return data
+
+
+def _iter_unpack(item, data):
+    # Like `item.iter_unpack(data)`, which Python 2 lacks.
+    unpack_from = item.unpack_from
+    for offset in range(0, len(data), item.size):
+        yield unpack_from(data, offset)
+
+
+def _read_counts(f):
+    """Read counts written by :func:`_write_counts`.
+
+    :return: a 2-tuple of the prior and joint counts, as dicts
+    """
+    if _read_exactly(f, len(MODEL_FILE_MAGIC)) != MODEL_FILE_MAGIC:
+        raise ValueError('Not a sequence model file')
+
+    def read_u32():
+        return _U32.unpack(_read_exactly(f, _U32.size))[0]
+
+    events = []
+    for i in range(read_u32()):
+        events.append(_read_exactly(f, read_u32()).decode('utf-8'))
+
+    size = read_u32()
+    data = _read_exactly(f, size * _PRIOR_ITEM.size)
+    prior = dict((events[i], count)
+                 for i, count in _iter_unpack(_PRIOR_ITEM, data))
+
+    size = read_u32()
+    data = _read_exactly(f, size * _JOINT_ITEM.size)
+    joint = dict(((events[i], events[j]), count)
+                 for i, j, count in _iter_unpack(_JOINT_ITEM, data))
+    return prior, joint
+
 
 class SequenceModel(object):
 
@@ -56,6 +150,481 @@ class SequenceModel(object):
         assert denominator > 0
         return math.log(numerator / denominator)
 
+    def counts(self):
+        """Return this model's counts.
+
+        :return: a 2-tuple of the prior and joint counts. The first is a
+                 dict that maps events to counts, and the second is a dict
+                 that maps pairs of events to counts.
+        """
+        return dict(self.prior), dict(self.joint)
+
+    def add_counts(self, prior, joint):
+        """Add counts to this model. This is the inverse of
+        :meth:`counts`.
+
+        :param prior: a dict that maps events to counts
+        :param joint: a dict that maps pairs of events to counts
+        """
+        self.prior.update(prior)
+        self.joint.update(joint)
+
+    def merge(self, other):
+        """Add the counts of `other` to this model. Merging models that
+        were trained on separate parts of a corpus gives the same counts as
+        training one model on the whole corpus.
+
+        :param other: some sequence model
+        :return: this model
+        """
+        self.add_counts(*other.counts())
+        return self
+
+    def save(self, path):
+        """Save this model's counts to `path`. Models of any class can
+        load the result.
+
+        :param path: the output path
+        """
+        prior, joint = self.counts()
+        with open(path, 'wb') as f:
+            _write_counts(f, prior, joint)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved with :meth:`save`.
+
+        :param path: the input path
+        """
+        with open(path, 'rb') as f:
+            prior, joint = _read_counts(f)
+        model = cls()
+        model.add_counts(prior, joint)
+        return model
+
+
+class DenseSequenceModel(object):
+
+    """A bigram model that stores its counts in a dense NumPy array.
+    Events are *interned*: each distinct event is assigned a small integer
+    index, and counts are stored in a V×V matrix, where V is the number of
+    distinct events seen so far.
+
+    This class has the same methods as :class:`SequenceModel`, and the two
+    can merge and load each other's counts. It differs in three ways:
+
+    - Counts are arrays indexed by event index, in :attr:`prior_counts`
+      and :attr:`joint_counts`, rather than :class:`~collections.Counter`
+      objects keyed by event.
+    - Smoothing adds `delta` for each of the V events seen so far, where
+      :class:`SequenceModel` adds a fixed :attr:`num_prior_events`.
+    - It can score many posterior events in one vectorized call with
+      :meth:`log_cond_prob_many`.
+
+    This class requires NumPy.
+    """
+
+    def __init__(self):
+        np = import_numpy()
+        self._np = np
+        #: Maps each event to its index.
+        self.index = {}
+        #: The event at each index.
+        self.events = []
+        self._prior = np.zeros(0, dtype=np.int64)
+        self._joint = np.zeros((0, 0), dtype=np.int64)
+        self.intern(SEQUENCE_BOUNDARY)
+
+    @property
+    def num_prior_events(self):
+        """The number of distinct events seen so far. This is the number
+        of possible outcomes used for smoothing.
+        """
+        return len(self.events)
+
+    @property
+    def prior_counts(self):
+        """Counts of each event as the first item of a bigram, indexed by
+        event index."""
+        return self._prior[:len(self.events)]
+
+    @property
+    def joint_counts(self):
+        """Counts of each bigram, indexed by the event indices of its
+        first and second items."""
+        size = len(self.events)
+        return self._joint[:size, :size]
+
+    def intern(self, event):
+        """Return the index of `event`, assigning a new index if needed.
+
+        :param event: some hashable event
+        """
+        try:
+            return self.index[event]
+        except KeyError:
+            pass
+
+        i = len(self.events)
+        capacity = len(self._prior)
+        if i == capacity:
+            # Grow geometrically so that adding V events is O(V^2) overall.
+            np = self._np
+            new_capacity = max(16, 2 * capacity)
+            prior = np.zeros(new_capacity, dtype=np.int64)
+            prior[:capacity] = self._prior
+            joint = np.zeros((new_capacity, new_capacity), dtype=np.int64)
+            joint[:capacity, :capacity] = self._joint
+            self._prior = prior
+            self._joint = joint
+
+        self.index[event] = i
+        self.events.append(event)
+        return i
+
+    def insert(self, seq):
+        """
+        :param seq: a list of events
+        """
+        intern = self.intern
+        ids = [0]
+        ids.extend(intern(x) for x in seq)
+        ids.append(0)
+        xs = ids[:-1]
+        ys = ids[1:]
+        np = self._np
+        np.add.at(self._joint, (xs, ys), 1)
+        np.add.at(self._prior, xs, 1)
+
+    def _prior_index(self, xs):
+        """Return the index of `xs[-1]`, or ``None`` if it's unknown."""
+        return self.index.get(xs[-1]) if len(xs) else None
+
+    def log_cond_prob(self, xs, y, delta=1):
+        """Return log(P(y | xs)) with add-`delta` smoothing.
+
+        P(y | xs) is approximated as P(y | xs[-1]).
+
+        :param y: the posterior event
+        :param xs: all prior events
+        """
+        x_i = self._prior_index(xs)
+        y_i = self.index.get(y)
+        if x_i is None:
+            count = total = 0
+        else:
+            count = 0 if y_i is None else self._joint[x_i, y_i]
+            total = self._prior[x_i]
+        numerator = count + delta
+        denominator = total + delta * self.num_prior_events
+        assert denominator > 0
+        return math.log(numerator / denominator)
+
+    def log_cond_prob_many(self, xs, ys, delta=1):
+        """Return log(P(y | xs)) for each `y` in `ys`. This is a batch
+        version of :meth:`log_cond_prob`.
+
+        :param xs: all prior events
+        :param ys: a list of posterior events
+        :return: an array with one log-probability per item of `ys`
+        """
+        np = self._np
+        x_i = self._prior_index(xs)
+        counts = np.zeros(len(ys), dtype=np.float64)
+        total = 0
+        if x_i is not None:
+            get = self.index.get
+            y_is = np.fromiter((get(y, -1) for y in ys), dtype=np.int64,
+                               count=len(ys))
+            known = y_is >= 0
+            counts[known] = self._joint[x_i, y_is[known]]
+            total = self._prior[x_i]
+        denominator = total + delta * self.num_prior_events
+        assert denominator > 0
+        return np.log(counts + delta) - math.log(denominator)
+
+    def counts(self):
+        """Return this model's counts, as in :meth:`SequenceModel.counts`.
+        """
+        np = self._np
+        events = self.events
+        prior = dict((events[i], int(self._prior[i]))
+                     for i in np.flatnonzero(self.prior_counts))
+        joint = self.joint_counts
+        xs, ys = np.nonzero(joint)
+        joint = dict(((events[x], events[y]), int(count))
+                     for x, y, count in zip(xs, ys, joint[xs, ys]))
+        return prior, joint
+
+    def add_counts(self, prior, joint):
+        """Add counts to this model, as in
+        :meth:`SequenceModel.add_counts`.
+        """
+        np = self._np
+        intern = self.intern
+        if prior:
+            xs = [intern(x) for x in prior]
+            np.add.at(self._prior, xs, list(prior.values()))
+        if joint:
+            xs = [intern(x) for x, y in joint]
+            ys = [intern(y) for x, y in joint]
+            np.add.at(self._joint, (xs, ys), list(joint.values()))
+
+    def merge(self, other):
+        """Add the counts of `other` to this model, as in
+        :meth:`SequenceModel.merge`.
+
+        :param other: some sequence model
+        :return: this model
+        """
+        if not isinstance(other, DenseSequenceModel):
+            self.add_counts(*other.counts())
+            return self
+
+        # Map the other model's indices to ours and add whole arrays.
+        np = self._np
+        ids = np.array([self.intern(x) for x in other.events],
+                       dtype=np.intp)
+        self._prior[ids] += other.prior_counts
+        self._joint[np.ix_(ids, ids)] += other.joint_counts
+        return self
+
+    def save(self, path):
+        """Save this model's counts to `path`, as in
+        :meth:`SequenceModel.save`.
+
+        :param path: the output path
+        """
+        prior, joint = self.counts()
+        with open(path, 'wb') as f:
+            _write_counts(f, prior, joint)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved with :meth:`save`.
+
+        :param path: the input path
+        """
+        with open(path, 'rb') as f:
+            prior, joint = _read_counts(f)
+        model = cls()
+        model.add_counts(prior, joint)
+        return model
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_np']
+        # Drop unused capacity.
+        state['_prior'] = self.prior_counts.copy()
+        state['_joint'] = self.joint_counts.copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._np = import_numpy()
+
+
+class NGramModel(object):
+
+    """An n-gram model over sequences of events, with *stupid backoff*
+    (Brants et al., 2007). If an n-gram was never seen, its score is the
+    score of the next shorter n-gram times a constant `backoff` factor.
+    Unigram scores use add-`delta` smoothing, so unseen events still get a
+    finite score.
+
+    Scores are read from a table of log scores that is built once after
+    training, so each call to :meth:`log_cond_prob` costs at most one
+    dict lookup per order. Stupid backoff scores aren't normalized, but
+    they work well for ranking.
+
+    To save memory, n-grams (other than unigrams) seen fewer than
+    `min_count` times are left out of the table. In that case, scores
+    back off to shorter n-grams. Call :meth:`prune` to drop their counts
+    as well.
+
+    :param order: the size of the largest n-gram. 2 gives a bigram model,
+                  3 gives a trigram model, and so on.
+    :param min_count: the smallest count that an n-gram needs to be kept
+    :param backoff: the factor applied each time we back off to a
+                    shorter n-gram
+    :param delta: the smoothing constant for unigrams
+    """
+
+    def __init__(self, order=3, min_count=1, backoff=0.4, delta=1):
+        if order < 1:
+            raise ValueError('order must be at least 1')
+        self.order = order
+        self.min_count = min_count
+        self.backoff = backoff
+        self.delta = delta
+
+        #: Maps n-grams of all sizes up to :attr:`order` to their counts.
+        self.ngrams = collections.Counter()
+        #: Maps each context (an n-gram without its last event) to the
+        #: total count of the n-grams that extend it. The empty context
+        #: holds the total number of events.
+        self.contexts = collections.Counter()
+        self._scores = None
+
+    def insert(self, seq):
+        """
+        :param seq: a list of events
+        """
+        order = self.order
+        ngrams = self.ngrams
+        contexts = self.contexts
+
+        padded = [SEQUENCE_BOUNDARY] * (order - 1)
+        padded.extend(seq)
+        padded.append(SEQUENCE_BOUNDARY)
+        for end in range(order, len(padded) + 1):
+            for start in range(end - order, end):
+                ngram = tuple(padded[start:end])
+                ngrams[ngram] += 1
+                contexts[ngram[:-1]] += 1
+        self._scores = None
+
+    def merge(self, other):
+        """Add the counts of `other` to this model.
+
+        :param other: an :class:`NGramModel` with the same order
+        :return: this model
+        """
+        if other.order != self.order:
+            raise ValueError('Cannot merge models of order {0} and {1}'
+                             .format(self.order, other.order))
+        self.ngrams.update(other.ngrams)
+        self.contexts.update(other.contexts)
+        self._scores = None
+        return self
+
+    def prune(self):
+        """Drop the counts of n-grams seen fewer than :attr:`min_count`
+        times. Unigrams and context totals are kept, so scores are the
+        same as before pruning.
+        """
+        min_count = self.min_count
+        for ngram, count in list(self.ngrams.items()):
+            if count < min_count and len(ngram) > 1:
+                del self.ngrams[ngram]
+
+    def compile(self):
+        """Build the table of log scores. This is done automatically on
+        the first call to :meth:`log_cond_prob` after training.
+        """
+        log = math.log
+        delta = self.delta
+        min_count = self.min_count
+        contexts = self.contexts
+
+        # Reserve one extra slot for unseen events.
+        num_events = sum(1 for x in self.ngrams if len(x) == 1) + 1
+        total = contexts[()] + delta * num_events
+        assert total > 0
+        log_total = log(total)
+
+        scores = {}
+        for ngram, count in self.ngrams.items():
+            if len(ngram) == 1:
+                scores[ngram] = log(count + delta) - log_total
+            elif count >= min_count:
+                scores[ngram] = log(count / contexts[ngram[:-1]])
+
+        self._scores = scores
+        self._log_backoff = log(self.backoff)
+        self._unknown_score = (log(delta) - log_total if delta
+                               else float('-inf'))
+        return scores
+
+    def log_cond_prob(self, xs, y, delta=1):
+        """Return the log score of `y` given the prior events `xs`.
+
+        Only the last ``order - 1`` events of `xs` are used. If `xs` is
+        shorter than that, it's treated as the start of a sequence.
+
+        :param y: the posterior event
+        :param xs: all prior events
+        :param delta: ignored. It's accepted so that this model can replace
+                      a :class:`SequenceModel`, but the unigram smoothing
+                      constant is the :attr:`delta` the model was created
+                      with, since scores are computed ahead of time.
+        """
+        scores = self._scores
+        if scores is None:
+            scores = self.compile()
+
+        n = self.order - 1
+        context = tuple(xs[-n:]) if n else ()
+        if len(context) < n:
+            context = (SEQUENCE_BOUNDARY,) * (n - len(context)) + context
+        ngram = context + (y,)
+
+        # Back off from the longest n-gram to bigrams...
+        penalty = 0.0
+        for i in range(n):
+            score = scores.get(ngram[i:])
+            if score is not None:
+                return penalty + score
+            penalty += self._log_backoff
+
+        # ...and then to unigrams.
+        return penalty + scores.get((y,), self._unknown_score)
+
+
+def _train_shard(args):
+    model_class, model_kwargs, seqs = args
+    model = model_class(**model_kwargs)
+    for seq in seqs:
+        model.insert(seq)
+    return model
+
+
+def train(seqs, model_class=SequenceModel, processes=None, shard_size=10000,
+          model_kwargs=None):
+    """Train a model over `seqs` with a pool of worker processes. Each
+    worker trains a model over a shard of `seqs`, and the partial models
+    are combined with :meth:`SequenceModel.merge`::
+
+        model = train(seqs, NGramModel, model_kwargs={'order': 4})
+
+    :param seqs: an iterable of event lists
+    :param model_class: the class of the model to train
+    :param processes: the number of worker processes. By default, use
+                      one per CPU. If 1, train in the current process.
+    :param shard_size: the number of sequences per shard
+    :param model_kwargs: keyword arguments for `model_class`, such as the
+                         `order` of an :class:`NGramModel`
+    :return: a trained model
+    """
+    model_kwargs = model_kwargs or {}
+    model = model_class(**model_kwargs)
+    if processes == 1:
+        for seq in seqs:
+            model.insert(seq)
+        return model
+
+    processes = processes or multiprocessing.cpu_count()
+    seqs = iter(seqs)
+    shards = iter(lambda: list(itertools.islice(seqs, shard_size)), [])
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        # Keep at most two shards per process in flight, so that `seqs` is
+        # read as the workers need it instead of all at once. Partial models
+        # are merged in order, so results are deterministic.
+        pending = collections.deque()
+        for shard in shards:
+            if len(pending) >= 2 * processes:
+                model.merge(pending.popleft().get())
+            pending.append(pool.apply_async(
+                _train_shard, ((model_class, model_kwargs, shard),)))
+        while pending:
+            model.merge(pending.popleft().get())
+    finally:
+        pool.close()
+        pool.join()
+    return model
+
 
 class FeatureModel(object):
 
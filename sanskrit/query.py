@@ -9,41 +9,188 @@
 """
 
 from collections import defaultdict
+import copy
+import functools
+import inspect
 import six
-from . import sounds
+from sqlalchemy import func, literal, null, union_all
+from sqlalchemy.orm import scoped_session
+from . import sounds, util
+from .util import metrics
 from .generate import NominalGenerator
 from .schema import *
 
 
+# Row types in the combined query used by `SimpleQuery.verb_summary`
+_ROOT_ROW, _VERB_ROW, _PARTICIPLE_ROW = range(3)
+
+# Marks a cache miss
+_MISSING = object()
+
+
+def _call_key(method):
+    """Return a function that maps the arguments of a call to `method` to
+    a hashable key. Equivalent calls get the same key, whether arguments
+    are passed by position or by keyword, and whether defaults are passed
+    or left out.
+
+    :param method: a method whose first parameter is ``self``
+    """
+    name = method.__name__
+    if six.PY2:
+        spec = inspect.getargspec(method)
+        num_named = len(spec.args) - 1
+        num_var = len([x for x in (spec.varargs, spec.keywords) if x])
+        names = spec.args[1:] + [x for x in (spec.varargs, spec.keywords)
+                                 if x]
+
+        def bind(self, args, kw):
+            callargs = inspect.getcallargs(method, self, *args, **kw)
+            return [callargs[x] for x in names]
+    else:
+        signature = inspect.signature(method)
+        kinds = [x.kind for x in signature.parameters.values()][1:]
+        var_kinds = (inspect.Parameter.VAR_POSITIONAL,
+                     inspect.Parameter.VAR_KEYWORD)
+        num_var = len([x for x in kinds if x in var_kinds])
+        num_named = len(kinds) - num_var
+
+        def bind(self, args, kw):
+            bound = signature.bind(self, *args, **kw)
+            bound.apply_defaults()
+            return list(bound.arguments.values())[1:]
+
+    # If every named parameter is passed by position, any *args and **kw
+    # are empty. This is the usual call, so skip the binding.
+    empty = ((),) * num_var
+
+    def key(self, args, kw):
+        if not kw and len(args) == num_named:
+            return (name,) + args + empty
+        values = bind(self, args, kw)
+        return (name,) + tuple(tuple(sorted(x.items()))
+                               if isinstance(x, dict) else x
+                               for x in values)
+
+    return key
+
+
+def _cached(method):
+    """Store the results of `method` in the query's paradigm cache. Callers
+    always receive a copy of the cached value, so they are free to modify
+    it. Cache hits and misses are reported to :mod:`~sanskrit.util.metrics`,
+    along with the time spent on each miss.
+
+    Since paradigms are plain data, the query's session for this thread is
+    released after each call to `method`.
+    """
+    metric = 'query.' + method.__name__
+    call_key = _call_key(method)
+
+    def fetch(self, args, kw):
+        try:
+            return method(self, *args, **kw)
+        finally:
+            self.session.remove()
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kw):
+        registry = metrics.get_registry()
+        cache = self.cache
+        if cache is None:
+            with registry.timer(metric):
+                return fetch(self, args, kw)
+
+        key = call_key(self, args, kw)
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            registry.incr(metric + '.misses')
+            with registry.timer(metric):
+                value = fetch(self, args, kw)
+            cache.set(key, value)
+        else:
+            registry.incr(metric + '.hits')
+        return copy.deepcopy(value)
+
+    return wrapper
+
+
 class SimpleQuery(object):
 
-    """A simple API for database access."""
+    """A simple API for database access.
+
+    Paradigms are cached, since the underlying data doesn't change between
+    database builds. By default, the cache is stored in memory and holds
+    the results of ``QUERY_CACHE_SIZE`` calls (1024 if unset). If
+    ``QUERY_CACHE_PATH`` is set, the cache is instead stored in an SQLite
+    file at that path and survives restarts. Set ``QUERY_CACHE_SIZE`` to 0
+    to disable caching.
+
+    A query can be shared by many threads. Each query method runs in a
+    session of the query's own, which it releases before returning, so the
+    caller's ``ctx.session`` is never touched.
 
-    def __init__(self, ctx):
+    :param ctx: some :class:`~sanskrit.Context`.
+    :param cache: the cache to use. If ``None``, create a cache from the
+                  config values above.
+    """
+
+    def __init__(self, ctx, cache=None):
         self.ctx = ctx
-        self.session = ctx.session
+        #: The query's own thread-local sessions, which are independent of
+        #: ``ctx.session``.
+        self.session = scoped_session(ctx.session_factory)
         self.nominal = NominalGenerator(ctx)
 
-        # Store IDs of irregular stems
-        irreg = self.session.query(StemIrregularity) \
-                    .filter(StemIrregularity.fully_described == True)
+        build_id = ctx.build_id
+        if cache is None:
+            cache = self._make_cache(ctx, build_id)
+        if cache is not None:
+            cache.bind(build_id)
 
-        self.irregular_stems = set([x.id for x in irreg])
-        self.session.remove()
+        #: Cache for query results, or ``None`` if caching is disabled.
+        self.cache = cache
+
+        # Store IDs of irregular stems
+        with ctx.private_session() as session:
+            irreg = session.query(StemIrregularity) \
+                           .filter(StemIrregularity.fully_described == True)
+            self.irregular_stems = set([x.id for x in irreg])
+
+    @staticmethod
+    def _make_cache(ctx, build_id):
+        """Create a paradigm cache from the config values in `ctx`."""
+        size = ctx.config.get('QUERY_CACHE_SIZE', 1024)
+        if not size:
+            return None
+
+        path = ctx.config.get('QUERY_CACHE_PATH')
+        if path:
+            return util.SQLiteCache(path, maxsize=size, build_id=build_id)
+        else:
+            return util.LRUCache(maxsize=size, build_id=build_id)
+
+    def refresh_cache(self):
+        """Empty the paradigm cache if the database was rebuilt after the
+        cache was filled.
+        """
+        if self.cache is not None:
+            self.cache.bind(self.ctx.build_id)
 
     def _fetch_nominal_paradigm(self, stem_id, gender_id):
         """Fetch a nominal paradigm from the database."""
         enum_abbr = self.ctx.enum_abbr
 
-        results = self.session.query(Nominal)\
+        results = self.session.query(Nominal.name, Nominal.case_id,
+                                     Nominal.number_id)\
                               .filter(Nominal.stem_id == stem_id)\
                               .filter(Nominal.gender_id == gender_id)
 
+        ea_case = enum_abbr['case']
+        ea_number = enum_abbr['number']
         returned = {}
-        for nominal in results:
-            case = enum_abbr['case'][nominal.case_id]
-            number = enum_abbr['number'][nominal.number_id]
-            returned[(case, number)] = nominal.name
+        for name, case_id, number_id in results:
+            returned[(ea_case[case_id], ea_number[number_id])] = name
 
         return returned
 
@@ -57,9 +204,11 @@ class SimpleQuery(object):
 
     def _simplify(self, forms):
         """Simplify the given forms by applying consonant reduction."""
+        simplify = sounds.simplify
         for parse, name in six.iteritems(forms):
-            forms[parse] = sounds.Term(name).simplify()
+            forms[parse] = name[:-1] + simplify(name[-1])
 
+    @_cached
     def noun(self, stem_name, gender):
         """Query for nouns.
 
@@ -79,6 +228,7 @@ class SimpleQuery(object):
         self._simplify(returned)
         return returned
 
+    @_cached
     def pronoun(self, stem_name, gender):
         """Query for pronouns.
 
@@ -95,6 +245,7 @@ class SimpleQuery(object):
         self._simplify(returned)
         return returned
 
+    @_cached
     def verb(self, root_name, mode, voice, vclass=None, **kw):
         """Query for inflected verbs.
 
@@ -109,25 +260,24 @@ class SimpleQuery(object):
         enum_abbr = self.ctx.enum_abbr
         session = self.session
 
-        roots = session.query(Root).filter(Root.name == root_name)
-        roots_id = [r.id for r in roots]
         mode_id = enum_id['mode'][mode]
         voice_id = enum_id['voice'][voice]
+        ea_person = enum_abbr['person']
+        ea_number = enum_abbr['number']
 
         returned = {}
-        results = session.query(Verb)\
-                         .filter(Verb.root_id.in_(roots_id))\
+        results = session.query(Verb.name, Verb.person_id, Verb.number_id)\
+                         .join(Root, Verb.root_id == Root.id)\
+                         .filter(Root.name == root_name)\
                          .filter(Verb.mode_id == mode_id)\
                          .filter(Verb.voice_id == voice_id)
-        for verb in results:
-            person = enum_abbr['person'][verb.person_id]
-            number = enum_abbr['number'][verb.number_id]
-            returned[(person, number)] = verb.name
+        for name, person_id, number_id in results:
+            returned[(ea_person[person_id], ea_number[number_id])] = name
 
-        session.close()
         self._simplify(returned)
         return returned
 
+    @_cached
     def verb_summary(self, root_name, vclass=None):
         """Query for a summary of a verb's behavior.
 
@@ -156,32 +306,43 @@ class SimpleQuery(object):
         ea_mode = ctx.enum_abbr['mode']
         ea_voice = ctx.enum_abbr['voice']
 
-        # Root
-        root = session.query(Root).filter(Root.name == root_name).first()
-        if root is None:
-            return {}
-        root_id = root.id
-
-        # Verbs
-        results = session.query(Verb).filter(Verb.root_id == root_id) \
+        # The root, its verbs, and its participles are fetched with a
+        # single UNION ALL. The root row is always present, but its ID is
+        # NULL if the root doesn't exist.
+        root_id = session.query(func.min(Root.id)) \
+                         .filter(Root.name == root_name) \
+                         .as_scalar()
+
+        q_root = session.query(literal(_ROOT_ROW), null(), null(), null(),
+                               root_id)
+        q_verbs = session.query(literal(_VERB_ROW), Verb.name, Verb.mode_id,
+                                Verb.voice_id, Verb.root_id) \
+                         .filter(Verb.root_id == root_id) \
                          .filter(Verb.person_id == ei_person['3']) \
-                         .filter(Verb.number_id == ei_number['s'])\
-
-        for r in results:
-            mode = ea_mode[r.mode_id]
-            voice = ea_voice[r.voice_id]
-            verbs[(mode, voice)].append(r.name)
-
-        # Participles
-        results = session.query(ParticipleStem) \
-                         .filter(ParticipleStem.root_id == root_id)
-
-        for r in results:
-            mode = ea_mode[r.mode_id]
-            voice = ea_voice[r.voice_id]
-            participles[(mode, voice)].append(r.name)
+                         .filter(Verb.number_id == ei_number['s'])
+        q_participles = session.query(literal(_PARTICIPLE_ROW),
+                                      ParticipleStem.name,
+                                      ParticipleStem.mode_id,
+                                      ParticipleStem.voice_id,
+                                      ParticipleStem.root_id) \
+                               .filter(ParticipleStem.root_id == root_id)
+
+        rows = session.execute(union_all(q_root.statement, q_verbs.statement,
+                                         q_participles.statement))
+
+        root_id = None
+        for row_type, name, mode_id, voice_id, row_root_id in rows:
+            if row_type == _ROOT_ROW:
+                root_id = row_root_id
+            elif row_type == _VERB_ROW:
+                verbs[(ea_mode[mode_id], ea_voice[voice_id])].append(name)
+            else:
+                key = (ea_mode[mode_id], ea_voice[voice_id])
+                participles[key].append(name)
+
+        if root_id is None:
+            return {}
 
-        session.close()
         return {
             'root_id': root_id,
             'verbs': verbs,
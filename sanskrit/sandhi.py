@@ -14,7 +14,27 @@ from builtins import range
 from builtins import object
 import six
 from . import sounds
-from .util import HashTrie
+from .util import HashTrie, metrics
+
+
+# Internal retroflexion
+# ---------------------
+# Sound classes used by `Joiner.internal_retroflex`.
+
+#: Causes "s" retroflexion.
+_S_TRIGGER = frozenset('iIuUfFeEoOkr')
+
+#: Causes "n" retroflexion.
+_N_TRIGGER = frozenset('fFrz')
+
+#: Allowed between an `_N_TRIGGER` and the retroflexed "n".
+_N_BETWEEN = sounds.VOWELS.union('kKgGNpPbBmhvyM')
+
+#: Must appear after the retroflexed "n".
+_N_AFTER = sounds.VOWELS.union('myvn')
+
+#: Defines "t" retroflexion after a retroflexed "s".
+_T_RETROFLEXION = dict(zip('tT', 'wW'))
 
 
 class Exempt(six.text_type):
@@ -41,16 +61,23 @@ class Joiner(SandhiObject):
     """Joins multiple Sanskrit terms by applying sandhi rules."""
 
     def __init__(self, rules=None):
+        #: Maps (first, second) to the result.
         self.data = {}
+        #: Maps `second` to a :class:`dict` that maps `first` to the
+        #: result. This lets :meth:`join` find all candidate rules for a
+        #: boundary with a single lookup on the next chunk's first letter.
+        self.index = {}
         if rules:
             self.add_rules(rules)
 
     def add_rules(self, rules):
-        """Add rules for joining words.
+        """Add rules for joining words. Rules added earlier are kept unless
+        a new rule has the same `first` and `second`, in which case the new
+        rule replaces the old one.
 
         Example usage::
 
-            joiner.add_rules[('a', 'i', 'e'), ('a', 'a', 'A'])
+            joiner.add_rules([('a', 'i', 'e'), ('a', 'a', 'A')])
 
         :param rules: a list of 3-tuples, each of which contains:
 
@@ -59,9 +86,9 @@ class Joiner(SandhiObject):
         - the result
 
         """
-        self.data = {}
         for first, second, result in rules:
             self.data[(first, second)] = result
+            self.index.setdefault(second, {})[first] = result
 
     @staticmethod
     def internal_retroflex(term):
@@ -69,16 +96,15 @@ class Joiner(SandhiObject):
 
         :param term: the string to process
         """
-        # causes "s" retroflexion
-        s_trigger = set('iIuUfFeEoOkr')
-        # causes "n" retroflexion
-        n_trigger = set('fFrz')
-        # Allowed after n_trigger
-        n_between = sounds.VOWELS.union('kKgGNpPbBmhvyM')
-        # Must appear after the retroflexed "n"
-        n_after = sounds.VOWELS.union('myvn')
-        # Defines t retroflexion
-        retroflexion_dict = dict(zip('tT', 'wW'))
+        # Only "n" and "s" can change, and "t" changes only after "s".
+        if 'n' not in term and 's' not in term:
+            return six.text_type(term)
+
+        s_trigger = _S_TRIGGER
+        n_trigger = _N_TRIGGER
+        n_between = _N_BETWEEN
+        n_after = _N_AFTER
+        t_get = _T_RETROFLEXION.get
 
         letters = list(term)
 
@@ -90,7 +116,7 @@ class Joiner(SandhiObject):
             # "t" retroflexion after "s" retroflexion
             if had_s:
                 had_s = False
-                letters[i] = retroflexion_dict.get(L, L)
+                letters[i] = t_get(L, L)
 
             # "s" retroflexion
             if apply_s and L == 's':
@@ -112,6 +138,18 @@ class Joiner(SandhiObject):
 
         return ''.join(letters)
 
+    @staticmethod
+    def internal_retroflex_many(terms):
+        """Apply :meth:`internal_retroflex` to each of `terms`.
+
+        :param terms: an iterable of strings
+        :return: a list of processed strings
+        """
+        retroflex = Joiner.internal_retroflex
+        text_type = six.text_type
+        return [retroflex(term) if ('n' in term or 's' in term)
+                else text_type(term) for term in terms]
+
     def join(self, chunks, internal=False):
         """Join the given chunks according to the object's rules::
 
@@ -136,6 +174,7 @@ class Joiner(SandhiObject):
                          `' '`.
         """
         separator = '' if internal else ' '
+        index = self.index
 
         it = iter(chunks)
         returned = next(it)
@@ -145,18 +184,21 @@ class Joiner(SandhiObject):
             if isinstance(returned, Exempt):
                 returned += separator + chunk
             else:
-                # `i` controls the number of letters to grab from the end of
-                # the first word. For most rules, one letter is sufficient.
-                # But visarga sandhi needs slightly more context.
-                for i in (2, 1, 0):
-                    if not i:
-                        returned += separator + chunk
-                        break
-                    key = (returned[-i:], chunk[0])
-                    result = self.data.get(key, None)
-                    if result:
-                        returned = returned[:-i] + result + chunk[1:]
-                        break
+                # Grab letters from the end of the first word. For most
+                # rules, one letter is sufficient. But visarga sandhi needs
+                # slightly more context, so try two letters first.
+                by_first = index.get(chunk[0])
+                result = None
+                if by_first:
+                    i = 2
+                    result = by_first.get(returned[-2:])
+                    if not result:
+                        i = 1
+                        result = by_first.get(returned[-1:])
+                if result:
+                    returned = returned[:-i] + result + chunk[1:]
+                else:
+                    returned += separator + chunk
             if isinstance(chunk, Exempt):
                 returned = Exempt(returned)
 
@@ -165,6 +207,18 @@ class Joiner(SandhiObject):
         else:
             return returned
 
+    def join_many(self, chunk_lists, internal=False):
+        """Join each list of chunks in `chunk_lists`. This is a batch
+        version of :meth:`join`.
+
+        :param chunk_lists: an iterable of lists of strings
+        :param internal: if true, join words using the empty string instead
+                         of `' '`.
+        :return: a list of joined strings
+        """
+        join = self.join
+        return [join(chunks, internal) for chunks in chunk_lists]
+
 
 class Splitter(object):
 
@@ -201,7 +255,24 @@ class Splitter(object):
         guarantees on when certain rules are applied. That is, output is
         loosely ordered but nondeterministic.
         """
+        registry = metrics.get_registry()
+        if registry.enabled:
+            return self._count_splits(self._iter_splits(chunk), registry)
+        return self._iter_splits(chunk)
 
+    @staticmethod
+    def _count_splits(splits, registry):
+        """Yield from `splits` and report how many splits were made."""
+        num_splits = 0
+        try:
+            for split in splits:
+                num_splits += 1
+                yield split
+        finally:
+            registry.incr('splitter.calls')
+            registry.incr('splitter.splits', num_splits)
+
+    def _iter_splits(self, chunk):
         chunk_len = len(chunk)
 
         for i in range(chunk_len):
@@ -8,7 +8,7 @@
 
 import re
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base, declared_attr
 from sqlalchemy.ext.orderinglist import ordering_list
@@ -417,7 +417,7 @@ class ParticipleStem(Stem):
 
     id = Column(ForeignKey(Stem.id), primary_key=True)
 
-    root_id = Column(ForeignKey(Root.id))
+    root_id = Column(ForeignKey(Root.id), index=True)
     mode_id = Column(ForeignKey(Mode.id))
     voice_id = Column(ForeignKey(Voice.id))
 
@@ -483,6 +483,15 @@ class Verb(Form):
     __tablename__ = 'verb'
     __mapper_args__ = {'polymorphic_identity': Tag.VERB}
 
+    # Composite indexes for the access paths in `sanskrit.query`: full
+    # paradigms (root, mode, voice) and verb summaries (root, person,
+    # number).
+    __table_args__ = (
+        Index('ix_verb_root_mode_voice', 'root_id', 'mode_id', 'voice_id'),
+        Index('ix_verb_root_person_number', 'root_id', 'person_id',
+              'number_id'),
+    )
+
     id = Column(ForeignKey(Form.id), primary_key=True)
 
     root_id = Column(ForeignKey(Root.id))
@@ -547,6 +556,12 @@ class AbstractNominal(Form):
     """A complete nominal form. This corresponds to Panini's **subanta**."""
 
     __tablename__ = 'nominal'
+
+    # Stored paradigms are always fetched by stem and gender.
+    __table_args__ = (
+        Index('ix_nominal_stem_gender', 'stem_id', 'gender_id'),
+    )
+
     id = Column(ForeignKey(Form.id), primary_key=True)
     stem_id = Column(ForeignKey(Stem.id))
     gender_id = Column(ForeignKey(Gender.id))
@@ -665,3 +680,27 @@ class SandhiRule(SimpleBase):
     def __repr__(self):
         values = (self.id, self.first, self.second, self.result)
         return 'SandhiRule(%r, %r, %r, %r)' % values
+
+
+# Database information
+# ====================
+
+class DatabaseInfo(Base):
+
+    """Key-value information about the database itself."""
+
+    __tablename__ = 'database_info'
+
+    #: Key for a unique ID that changes whenever the database is rebuilt.
+    #: Caches of database data use this ID to detect stale data.
+    BUILD_ID = 'build_id'
+
+    #: Key for the enumerated data as JSON, as returned by
+    #: :func:`~sanskrit.context.fetch_enum_data`.
+    ENUMS = 'enums'
+
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+    def __repr__(self):
+        return 'DatabaseInfo(%r, %r)' % (self.key, self.value)
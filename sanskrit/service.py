@@ -0,0 +1,506 @@
+"""
+sanskrit.service
+~~~~~~~~~~~~~~~~
+
+A small HTTP service for the tagger, the analyzer, transliteration, and
+paradigm queries. It uses only the standard library and needs Python 3.5 or
+newer. To run it::
+
+    python -m sanskrit.service config.py --port 8000
+
+Requests are handled in an event loop. The actual work runs in a pool of
+worker processes, each of which builds its :class:`~sanskrit.context.Context`,
+:class:`~sanskrit.tagger.Tagger`, and :class:`~sanskrit.query.SimpleQuery`
+once, when the service starts, and reuses them for every request.
+
+Every endpoint except ``/health`` takes a ``POST`` with a JSON object:
+
+=================== =====================================================
+Endpoint            Parameters
+=================== =====================================================
+``/tag``            ``segment``, and optionally ``max_expansions`` and
+                    ``timeout`` (in seconds)
+``/analyze``        ``word``
+``/transliterate``  ``text``, ``from``, ``to``
+``/paradigm``       ``kind`` (``noun``, ``pronoun``, or ``verb``), plus the
+                    arguments of the matching :class:`SimpleQuery` method
+=================== =====================================================
+
+and returns ``{"result": ...}`` or, with status 400, ``{"error": ...}``. To
+send several requests at once, wrap them in a list::
+
+    {"batch": [{"word": "gajas"}, {"word": "gacCati"}]}
+
+The response is then ``{"results": [...]}``, with one ``result`` or
+``error`` object per request.
+
+Requests that arrive close together are also grouped into batches before
+they're sent to the workers. If more than `max_queue` requests are waiting,
+new requests are refused with status 503. If a worker process dies, the
+requests it was handling also get status 503, and the service replaces the
+pool. ``GET /health`` reports the service's status and queue depth.
+
+Since the workers are separate processes, the database can't be in memory.
+
+:license: MIT
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+
+from sanskrit import Context
+from sanskrit.query import SimpleQuery
+from sanskrit.tagger import TaggedItem, Tagger
+from sanskrit.transliterate import sanscript
+
+log = logging.getLogger(__name__)
+
+#: The endpoints that run in the worker pool.
+ENDPOINTS = ('tag', 'analyze', 'transliterate', 'paradigm')
+
+#: The paradigm kinds that ``/paradigm`` supports.
+PARADIGM_KINDS = ('noun', 'pronoun', 'verb')
+
+#: The largest request body the service accepts, in bytes.
+MAX_BODY_SIZE = 1 << 20
+
+_IN_MEMORY_URIS = ('sqlite://', 'sqlite:///:memory:')
+
+
+# Worker processes
+# ----------------
+
+class Worker(object):
+
+    """The state of a worker process. Building a :class:`Tagger` loads all
+    sandhi rules and endings, so each process builds one just once.
+
+    :param config: the config :class:`dict` to create a context from
+    """
+
+    def __init__(self, config):
+        self.ctx = Context(config)
+        self.tagger = Tagger(self.ctx)
+        self.analyzer = self.tagger.analyzer
+        self.query = SimpleQuery(self.ctx)
+
+    def _form(self, item):
+        name, pos, lemma, parse = item.human_readable_form(self.ctx)
+        return {
+            'chunk_index': item.chunk_index,
+            'name': name,
+            'pos': pos,
+            'lemma': lemma,
+            'parse': parse,
+        }
+
+    def tag(self, segment, max_expansions=None, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        result = self.tagger.tag(segment, max_expansions=max_expansions,
+                                 deadline=deadline)
+        return {'exact': result.exact,
+                'items': [self._form(x) for x in result]}
+
+    def analyze(self, word):
+        return [self._form(TaggedItem(None, None, x))
+                for x in self.analyzer.analyze(word)]
+
+    def transliterate(self, text, **kw):
+        return sanscript.transliterate(text, kw.pop('from'), kw.pop('to'),
+                                       **kw)
+
+    def paradigm(self, kind, **kw):
+        if kind not in PARADIGM_KINDS:
+            raise ValueError('Unknown paradigm kind: {0}'.format(kind))
+        forms = getattr(self.query, kind)(**kw)
+        return [{'parse': list(key), 'form': forms[key]}
+                for key in sorted(forms)]
+
+
+_worker = None
+
+
+def _init_worker(config):
+    """Create this process's :class:`Worker`, if it doesn't exist yet."""
+    global _worker
+    if _worker is None:
+        _worker = Worker(config)
+    return _worker
+
+
+def _warm(config):
+    """A warm-up task. On Python 3.7 and newer, the pool's initializer
+    builds each process's worker before the process runs any task, so
+    waiting on this task waits for a ready process. Older versions have no
+    initializer, so this builds the worker in whichever process runs it.
+    """
+    _init_worker(config)
+    return os.getpid()
+
+
+def _run_batch(config, endpoint, requests):
+    """Handle a batch of requests for `endpoint` in a worker process.
+
+    :return: a list with one ``result`` or ``error`` object per request
+    """
+    worker = _init_worker(config)
+    handler = getattr(worker, endpoint)
+    results = []
+    for params in requests:
+        try:
+            results.append({'result': handler(**params)})
+        except Exception as e:
+            results.append({'error': '{0}: {1}'.format(type(e).__name__, e)})
+    worker.ctx.session.remove()
+    return results
+
+
+# Event loop
+# ----------
+
+def _running_loop():
+    """Return the event loop that is running the current coroutine."""
+    if sys.version_info >= (3, 7):
+        return asyncio.get_running_loop()
+    # Before Python 3.7, `get_event_loop` returns the running loop when
+    # called from a coroutine.
+    return asyncio.get_event_loop()
+
+
+class HTTPError(Exception):
+
+    """An error to report to the client with the given status."""
+
+    def __init__(self, status, message=None):
+        Exception.__init__(self, message or status.phrase)
+        self.status = status
+        self.message = message or status.phrase
+
+
+class _Batcher(object):
+
+    """Groups requests for one endpoint and sends them to the pool."""
+
+    def __init__(self, service, endpoint):
+        self.service = service
+        self.endpoint = endpoint
+        self.items = []
+        self.handle = None
+
+    def add(self, params):
+        """Queue `params` and return a future for its result."""
+        service = self.service
+        future = service.loop.create_future()
+        self.items.append((params, future))
+        if len(self.items) >= service.batch_size:
+            self.flush()
+        elif self.handle is None:
+            self.handle = service.loop.call_later(service.batch_delay,
+                                                  self.flush)
+        return future
+
+    def flush(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        items, self.items = self.items, []
+        if items:
+            asyncio.ensure_future(self._run(items), loop=self.service.loop)
+
+    async def _run(self, items):
+        service = self.service
+        executor = service.executor
+        broken = False
+        try:
+            results = await service.loop.run_in_executor(
+                executor, _run_batch, service.config, self.endpoint,
+                [params for params, _ in items])
+        except BrokenProcessPool:
+            # A worker process died, so the batch may or may not have run.
+            # Ask the clients to retry, and replace the pool.
+            log.exception('The pool broke while running /%s', self.endpoint)
+            broken = True
+        except Exception as e:
+            log.exception('Batch for /%s failed', self.endpoint)
+            error = {'error': '{0}: {1}'.format(type(e).__name__, e)}
+            results = [error] * len(items)
+        finally:
+            service.pending -= len(items)
+
+        if broken:
+            error = HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                              'A worker process stopped. Please try again.')
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+            await service.restart_pool(executor)
+            return
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class Service(object):
+
+    """The HTTP service.
+
+    :param config: the config to create contexts from, in any form that
+                   :class:`~sanskrit.context.Context` accepts
+    :param workers: the number of worker processes. If ``None``, use one
+                    per CPU.
+    :param max_queue: the maximum number of requests that can be waiting
+                      or running at once
+    :param batch_size: the maximum number of requests to send to a worker
+                       at once
+    :param batch_delay: how long to wait for more requests before sending
+                        a batch, in seconds
+    """
+
+    def __init__(self, config, workers=None, max_queue=1000, batch_size=16,
+                 batch_delay=0.002):
+        #: The config :class:`dict` that workers create their contexts from.
+        self.config = Context(config, connect=False).config
+        if self.config.get('DATABASE_URI') in _IN_MEMORY_URIS:
+            raise ValueError('Worker processes can\'t share an in-memory '
+                             'database.')
+
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+
+        #: The number of requests that are waiting or running.
+        self.pending = 0
+        self.loop = None
+        self.executor = None
+        self.server = None
+        self.batchers = {}
+
+    async def start(self, host='127.0.0.1', port=8000):
+        """Start the worker pool, build every worker, and start listening.
+
+        :return: the :class:`asyncio.Server`
+        """
+        self.loop = _running_loop()
+        self.batchers = dict((name, _Batcher(self, name))
+                             for name in ENDPOINTS)
+        await self._start_pool()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def _start_pool(self):
+        """Create the worker pool and build every worker."""
+        kw = {}
+        if sys.version_info >= (3, 7):
+            kw = {'initializer': _init_worker, 'initargs': (self.config,)}
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers,
+                                                               **kw)
+        executor = self.executor
+
+        # Submit one task per process and wait for all of them, so that
+        # every process has started before the first request arrives.
+        await asyncio.gather(*[
+            self.loop.run_in_executor(executor, _warm, self.config)
+            for i in range(self.workers)])
+
+    async def restart_pool(self, broken):
+        """Replace the worker pool `broken`, which can't run tasks because
+        one of its processes died. If the pool was already replaced, do
+        nothing.
+
+        :param broken: the broken :class:`ProcessPoolExecutor`
+        """
+        if self.executor is not broken:
+            return
+        # A broken pool has already stopped its processes. Don't call
+        # `shutdown`, which can block forever on a queue lock that the dead
+        # process held.
+        log.warning('Starting a new worker pool.')
+        await self._start_pool()
+
+    async def close(self):
+        """Stop listening and shut down the worker pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def run(self, host='127.0.0.1', port=8000):
+        """Run the service in a new event loop until interrupted."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(self.start(host, port))
+            for sock in server.sockets:
+                log.info('Listening on %s', sock.getsockname())
+            try:
+                loop.run_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                loop.run_until_complete(self.close())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def health(self):
+        """Return the service's status."""
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'pending': self.pending,
+            'max_queue': self.max_queue,
+        }
+
+    async def submit(self, endpoint, requests):
+        """Run `requests` on `endpoint` in the worker pool.
+
+        :param requests: a list of parameter :class:`dict` objects
+        :return: a list with one ``result`` or ``error`` object per request
+        """
+        if self.pending + len(requests) > self.max_queue:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                            'Too many pending requests.')
+        for params in requests:
+            if not isinstance(params, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST,
+                                'Each request must be a JSON object.')
+
+        self.pending += len(requests)
+        batcher = self.batchers[endpoint]
+        futures = [batcher.add(params) for params in requests]
+        # Wait for every future, even if one fails, so that no exception is
+        # left unretrieved.
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    async def dispatch(self, method, path, body):
+        """Handle a request.
+
+        :return: a 2-tuple of an :class:`~http.HTTPStatus` and the response
+                 data
+        """
+        name = path.split('?', 1)[0].strip('/')
+        if name == 'health':
+            if method != 'GET':
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            return HTTPStatus.OK, self.health()
+        if name not in ENDPOINTS:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != 'POST':
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        try:
+            data = json.loads(body.decode('utf-8'))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid JSON.')
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            'The request must be a JSON object.')
+
+        if 'batch' in data:
+            if not isinstance(data['batch'], list):
+                raise HTTPError(HTTPStatus.BAD_REQUEST,
+                                "'batch' must be a list.")
+            results = await self.submit(name, data['batch'])
+            return HTTPStatus.OK, {'results': results}
+
+        result, = await self.submit(name, [data])
+        if 'error' in result:
+            return HTTPStatus.BAD_REQUEST, result
+        return HTTPStatus.OK, result
+
+    async def _read_request(self, reader):
+        """Read a request from `reader`.
+
+        :return: a 3-tuple of the method, path, and body
+        """
+        request_line = await reader.readline()
+        try:
+            method, path, _ = request_line.decode('latin-1').split(None, 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST)
+
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            if key.strip().lower() == 'content-length':
+                try:
+                    length = int(value)
+                except ValueError:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST)
+
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length > 0 else b''
+        return method.upper(), path, body
+
+    async def _handle(self, reader, writer):
+        try:
+            method, path, body = await self._read_request(reader)
+            status, data = await self.dispatch(method, path, body)
+        except HTTPError as e:
+            status, data = e.status, {'error': e.message}
+        except asyncio.IncompleteReadError:
+            writer.close()
+            return
+        except Exception:
+            log.exception('Error while handling a request')
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            data = {'error': status.phrase}
+
+        payload = json.dumps(data).encode('utf-8')
+        headers = [
+            'HTTP/1.1 {0} {1}'.format(status.value, status.phrase),
+            'Content-Type: application/json',
+            'Content-Length: {0}'.format(len(payload)),
+            'Connection: close',
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers.append('Retry-After: 1')
+        writer.write('\r\n'.join(headers).encode('latin-1') + b'\r\n\r\n')
+        writer.write(payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the HTTP service.')
+    parser.add_argument('config', help='the path to a config module')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='the number of worker processes')
+    parser.add_argument('--max-queue', type=int, default=1000,
+                        help='the maximum number of pending requests')
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help='the maximum number of requests per batch')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    service = Service(args.config, workers=args.workers,
+                      max_queue=args.max_queue, batch_size=args.batch_size)
+    service.run(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
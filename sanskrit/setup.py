@@ -3,12 +3,21 @@ sanskrit.setup
 ~~~~~~~~~~~~~~
 
 Setup code for various Sanskrit data.
+
+Progress is reported through :class:`~sanskrit.util.progress.Progress`.
+Each loader reports on the table it populates, including its row count,
+elapsed time, and rows per second.
 """
-from __future__ import print_function
 
+import json
+import logging
 import sys
+import uuid
 
 from sanskrit import util
+from sanskrit.context import Context, fetch_enum_data
+from sanskrit.util import metrics
+from sanskrit.util.progress import Progress, LoggingSink
 from sanskrit.schema import *
 
 import sqlalchemy.schema
@@ -17,21 +26,36 @@ import sqlalchemy.schema
 ENUM = {}
 
 
+def _task(progress, name, *paths):
+    """Start a progress task for `name`, whose rows come from the CSV files
+    in `paths`. If `progress` is ``None``, the task is silent.
+    """
+    progress = progress or Progress()
+    total = None
+    if progress.enabled and paths:
+        total = sum(util.count_rows(path) for path in paths)
+    return progress.task(name, total=total)
+
+
 # Miscellaneous
 # -------------
 
-def add_tags(ctx):
+@metrics.timed('setup.add_tags')
+def add_tags(ctx, progress=None):
     """Populate the `Tag` table."""
     session = ctx.session
-    for key in dir(Tag):
-        if key.isupper():
-            id = getattr(Tag, key)
-            session.add(Tag(id=id, name=key.lower()))
-    session.commit()
+    with _task(progress, 'tags') as task:
+        for key in dir(Tag):
+            if key.isupper():
+                id = getattr(Tag, key)
+                session.add(Tag(id=id, name=key.lower()))
+                task.update()
+        session.commit()
     session.close()
 
 
-def add_enums(ctx):
+@metrics.timed('setup.add_enums')
+def add_enums(ctx, progress=None):
     """Add enumerated data to the database. Among others, this includes:
 
     - persons
@@ -45,194 +69,210 @@ def add_enums(ctx):
     """
 
     session = ctx.session
-    type_to_class = {
-        'case': Case,
-        'class': VClass,
-        'gender': Gender,
-        'gender_group': GenderGroup,
-        'modification': Modification,
-        'mode': Mode,
-        'number': Number,
-        'person': Person,
-        'sandhi_rule_type': SandhiType,
-        'voice': Voice,
-    }
-
-    # First pass: ordinary enums
-    for row in util.read_csv(ctx.config['ENUMS']):
-        if row['enum_type'] == 'gender_group':
-            continue
-
-        cls = type_to_class.get(row['enum_type'], None)
-        # TODO: always non-None?
-        if cls is None:
-            continue
-
-        enum_abbr = cls.__tablename__
-        if enum_abbr not in ENUM:
-            util.tick(cls.__name__)
-        ENUM.setdefault(enum_abbr, {})
-
-        abbreviation = row['abbreviation']
-        e = cls(name=row['human_readable_value'], abbr=abbreviation)
-        session.add(e)
-        session.flush()
-        ENUM[enum_abbr][abbreviation] = e.id
-    session.commit()
-
-    # Second pass: gender groups
-    for row in util.read_csv(ctx.config['ENUMS']):
-        if row['enum_type'] != 'gender_group':
-            continue
-
-        cls = type_to_class.get(row['enum_type'], None)
-        enum_abbr = cls.__tablename__
-        if enum_abbr not in ENUM:
-            util.tick(cls.__name__)
-        ENUM.setdefault(enum_abbr, {})
-
-        abbreviation = row['abbreviation']
-        e = cls(name=row['human_readable_value'], abbr=abbreviation)
-        session.add(e)
-        session.flush()
-
-        if set(abbreviation).issubset('mfn'):
-            e.members = [ENUM['gender'][x] for x in abbreviation]
-
-        ENUM[enum_abbr][abbreviation] = e.id
-
-    session.commit()
+    with _task(progress, 'enums', ctx.config['ENUMS']) as task:
+        type_to_class = {
+            'case': Case,
+            'class': VClass,
+            'gender': Gender,
+            'gender_group': GenderGroup,
+            'modification': Modification,
+            'mode': Mode,
+            'number': Number,
+            'person': Person,
+            'sandhi_rule_type': SandhiType,
+            'voice': Voice,
+        }
+
+        # First pass: ordinary enums
+        for row in util.read_csv(ctx.config['ENUMS']):
+            if row['enum_type'] == 'gender_group':
+                continue
+
+            cls = type_to_class.get(row['enum_type'], None)
+            # TODO: always non-None?
+            if cls is None:
+                continue
+
+            enum_abbr = cls.__tablename__
+            ENUM.setdefault(enum_abbr, {})
+
+            abbreviation = row['abbreviation']
+            e = cls(name=row['human_readable_value'], abbr=abbreviation)
+            session.add(e)
+            session.flush()
+            ENUM[enum_abbr][abbreviation] = e.id
+            task.update()
+        session.commit()
+
+        # Second pass: gender groups
+        for row in util.read_csv(ctx.config['ENUMS']):
+            if row['enum_type'] != 'gender_group':
+                continue
+
+            cls = type_to_class.get(row['enum_type'], None)
+            enum_abbr = cls.__tablename__
+            ENUM.setdefault(enum_abbr, {})
+
+            abbreviation = row['abbreviation']
+            e = cls(name=row['human_readable_value'], abbr=abbreviation)
+            session.add(e)
+            session.flush()
+
+            if set(abbreviation).issubset('mfn'):
+                e.members = [ENUM['gender'][x] for x in abbreviation]
+
+            ENUM[enum_abbr][abbreviation] = e.id
+            task.update()
+
+        session.commit()
     session.close()
 
 
-def add_sandhi_rules(ctx):
+@metrics.timed('setup.add_sandhi_rules')
+def add_sandhi_rules(ctx, progress=None):
     """Add sandhi rules to the database."""
     session = ctx.session
     stype = ENUM['sandhi_type']
-
-    for row in util.read_csv(ctx.config['SANDHI_RULES']):
-        session.add(SandhiRule(first=row['first'], second=row['second'],
-                               result=row['result'],
-                               rule_type=stype[row['type']]))
-    session.commit()
+    path = ctx.config['SANDHI_RULES']
+
+    with _task(progress, 'sandhi_rules', path) as task:
+        for row in util.read_csv(path):
+            session.add(SandhiRule(first=row['first'], second=row['second'],
+                                   result=row['result'],
+                                   rule_type=stype[row['type']]))
+            task.update()
+        session.commit()
     session.close()
 
 
-def add_indeclinables(ctx):
+@metrics.timed('setup.add_indeclinables')
+def add_indeclinables(ctx, progress=None):
     """Add indeclinables to the database."""
     session = ctx.session
-    tick = util.tick_every(300)
+    path = ctx.config['INDECLINABLES']
 
-    for row in util.read_csv(ctx.config['INDECLINABLES']):
-        session.add(Indeclinable(name=row['name']))
-        tick(row['name'])
-
-    session.commit()
+    with _task(progress, 'indeclinables', path) as task:
+        for row in util.read_csv(path):
+            session.add(Indeclinable(name=row['name']))
+            task.update()
+        session.commit()
     session.close()
 
 
-def add_verb_prefixes(ctx):
+@metrics.timed('setup.add_verb_prefixes')
+def add_verb_prefixes(ctx, progress=None):
     """Add verb prefixes to the database."""
     session = ctx.session
     prefix_map = {}
+    path = ctx.config['VERB_PREFIXES']
 
-    for row in util.read_csv(ctx.config['VERB_PREFIXES']):
-        # TODO: use prefix type?
-        prefix = VerbPrefix(name=row['name'])
-        session.add(prefix)
-        session.flush()
-        prefix_map[row['name']] = prefix.id
-
-    session.commit()
+    with _task(progress, 'verb_prefixes', path) as task:
+        for row in util.read_csv(path):
+            # TODO: use prefix type?
+            prefix = VerbPrefix(name=row['name'])
+            session.add(prefix)
+            session.flush()
+            prefix_map[row['name']] = prefix.id
+            task.update()
+        session.commit()
     session.close()
     return prefix_map
 
 
-def add_verb_endings(ctx):
+@metrics.timed('setup.add_verb_endings')
+def add_verb_endings(ctx, progress=None):
     """Add verb endings to the database."""
     session = ctx.session
     person = ENUM['person']
     number = ENUM['number']
     mode = ENUM['mode']
     voice = ENUM['voice']
-
-    for row in util.read_csv(ctx.config['VERB_ENDINGS']):
-        session.add(VerbEnding(name=row['ending'],
-                               category=row['category'],
-                               person_id=person[row['person']],
-                               number_id=number[row['number']],
-                               mode_id=mode[row['mode']],
-                               voice_id=voice[row['voice']]))
-    session.commit()
+    path = ctx.config['VERB_ENDINGS']
+
+    with _task(progress, 'verb_endings', path) as task:
+        for row in util.read_csv(path):
+            session.add(VerbEnding(name=row['ending'],
+                                   category=row['category'],
+                                   person_id=person[row['person']],
+                                   number_id=number[row['number']],
+                                   mode_id=mode[row['mode']],
+                                   voice_id=voice[row['voice']]))
+            task.update()
+        session.commit()
     session.close()
 
 
-def add_roots(ctx, prefix_map):
+@metrics.timed('setup.add_roots')
+def add_roots(ctx, prefix_map, progress=None):
     """Populates :class:`Root` and its subclasses."""
 
     # TODO: modified roots
     session = ctx.session
     e_vclass = ENUM['vclass']
     e_voice = ENUM['voice']
+    path = ctx.config['UNPREFIXED_ROOTS']
 
     root_map = {}  # (name, hom) -> id
 
     # First pass: Root
-    tick = util.tick_every(100)
-    for row in util.read_csv(ctx.config['UNPREFIXED_ROOTS']):
-        name, hom = row['root'], row['hom']
+    with _task(progress, 'roots', path) as task:
+        for row in util.read_csv(path):
+            name, hom = row['root'], row['hom']
+            task.update()
 
-        # A root can have multiple paradigms (= multiple appearances)
-        if (name, hom) in root_map:
-            continue
+            # A root can have multiple paradigms (= multiple appearances)
+            if (name, hom) in root_map:
+                continue
 
-        root = Root(name=name)
-        session.add(root)
-        session.flush()
-        root_map[(name, hom)] = root.id
-
-        tick(name)
+            root = Root(name=name)
+            session.add(root)
+            session.flush()
+            root_map[(name, hom)] = root.id
 
     # Second pass: Paradigm
-    for row in util.read_csv(ctx.config['UNPREFIXED_ROOTS']):
-        name, hom = row['root'], row['hom']
-        vclass, voice = row['class'], row['voice']
+    with _task(progress, 'paradigms', path) as task:
+        for row in util.read_csv(path):
+            name, hom = row['root'], row['hom']
+            vclass, voice = row['class'], row['voice']
 
-        assert (name, hom) in root_map
-        root_id = root_map[(name, hom)]
-        paradigm = Paradigm(root_id=root_id, vclass_id=e_vclass[vclass],
-                            voice_id=e_voice[voice])
-        session.add(paradigm)
+            assert (name, hom) in root_map
+            root_id = root_map[(name, hom)]
+            paradigm = Paradigm(root_id=root_id, vclass_id=e_vclass[vclass],
+                                voice_id=e_voice[voice])
+            session.add(paradigm)
+            task.update()
 
-    session.commit()
+        session.commit()
 
     # Prefixed roots
-    for i, row in enumerate(util.read_csv(ctx.config['PREFIXED_ROOTS'])):
-        name = row['prefixed_root']
-        basis = row['unprefixed_root']
-        hom = row['hom']
-        prefixes = row['prefixes'].split('-')
-
-        assert (basis, hom) in root_map
-        basis_id = root_map[(basis, hom)]
-        for prefix in prefixes:
-            # TODO
-            pass
-
-        prefixed_root = PrefixedRoot(name=name, basis_id=basis_id)
-        session.add(prefixed_root)
-        session.flush()
-        root_map[(name, hom)] = prefixed_root.id
-
-        tick(name)
-
-    session.commit()
+    path = ctx.config['PREFIXED_ROOTS']
+    with _task(progress, 'prefixed_roots', path) as task:
+        for row in util.read_csv(path):
+            name = row['prefixed_root']
+            basis = row['unprefixed_root']
+            hom = row['hom']
+            prefixes = row['prefixes'].split('-')
+
+            assert (basis, hom) in root_map
+            basis_id = root_map[(basis, hom)]
+            for prefix in prefixes:
+                # TODO
+                pass
+
+            prefixed_root = PrefixedRoot(name=name, basis_id=basis_id)
+            session.add(prefixed_root)
+            session.flush()
+            root_map[(name, hom)] = prefixed_root.id
+            task.update()
+
+        session.commit()
     session.close()
 
     return root_map
 
 
-def add_verbs(ctx, root_map):
+@metrics.timed('setup.add_verbs')
+def add_verbs(ctx, root_map, progress=None):
     """Add inflected verbs to the database."""
 
     session = ctx.session
@@ -243,68 +283,73 @@ def add_verbs(ctx, root_map):
     voice = ENUM['voice']
     skipped = set()
     i = 0
-
-    for row in util.read_csv(ctx.config['VERBS']):
-        root = row['root']
-        hom = row['hom']
-
-        try:
-            root_id = root_map[(root, hom)]
-        except KeyError:
-            skipped.add((root, hom))
-            continue
-
-        data = {
-            'name': row['form'],
-            'root_id': root_id,
-            'vclass_id': vclass[row['class']] if row['class'] else None,
-            'person_id': person[row['person']],
-            'number_id': number[row['number']],
-            'mode_id': mode[row['mode']],
-            'voice_id': voice[row['voice']]
-        }
-        session.add(Verb(**data))
-
-        i += 1
-        if i % 1000 == 0:
-            util.tick(row['form'])
-            session.commit()
-
-    session.commit()
+    path = ctx.config['VERBS']
+    with _task(progress, 'verbs', path) as task:
+        for row in util.read_csv(path):
+            task.update()
+            root = row['root']
+            hom = row['hom']
+
+            try:
+                root_id = root_map[(root, hom)]
+            except KeyError:
+                skipped.add((root, hom))
+                continue
+
+            data = {
+                'name': row['form'],
+                'root_id': root_id,
+                'vclass_id': vclass[row['class']] if row['class'] else None,
+                'person_id': person[row['person']],
+                'number_id': number[row['number']],
+                'mode_id': mode[row['mode']],
+                'voice_id': voice[row['voice']]
+            }
+            session.add(Verb(**data))
+
+            i += 1
+            if i % 1000 == 0:
+                session.commit()
+
+        session.commit()
+        task.message('Skipped {0} roots.'.format(len(skipped)))
     session.close()
-    print('Skipped', len(skipped), 'roots.')
 
 
-def add_verbal_indeclinables(ctx, root_map):
+@metrics.timed('setup.add_verbal_indeclinables')
+def add_verbal_indeclinables(ctx, root_map, progress=None):
     session = ctx.session
     root_map = root_map or {}
     skipped = set()
-
-    for row in util.read_csv(ctx.config['VERBAL_INDECLINABLES']):
-        root, hom, pos = row['root'], row['hom'], row['pos']
-
-        try:
-            root_id = root_map[(root, hom)]
-        except KeyError:
-            skipped.add((root, hom))
-            continue
-
-        # TODO: modifications!
-        datum = {
-            'name': row['form'],
-            'root_id': root_id
-        }
-        if pos == 'gerund':
-            session.add(Gerund(**datum))
-        elif pos == 'infinitive':
-            session.add(Infinitive(**datum))
-        else:
-            assert False
-
-    session.commit()
-
-
-def add_participle_stems(ctx, root_map):
+    path = ctx.config['VERBAL_INDECLINABLES']
+    with _task(progress, 'verbal_indeclinables', path) as task:
+        for row in util.read_csv(path):
+            task.update()
+            root, hom, pos = row['root'], row['hom'], row['pos']
+
+            try:
+                root_id = root_map[(root, hom)]
+            except KeyError:
+                skipped.add((root, hom))
+                continue
+
+            # TODO: modifications!
+            datum = {
+                'name': row['form'],
+                'root_id': root_id
+            }
+            if pos == 'gerund':
+                session.add(Gerund(**datum))
+            elif pos == 'infinitive':
+                session.add(Infinitive(**datum))
+            else:
+                assert False
+
+        session.commit()
+
+
+@metrics.timed('setup.add_participle_stems')
+def add_participle_stems(ctx, root_map, progress=None):
     """Populates `ParticipleStem`."""
 
     session = ctx.session
@@ -313,68 +358,73 @@ def add_participle_stems(ctx, root_map):
     voice = ENUM['voice']
     skipped = set()
     i = 0
-
-    for row in util.read_csv(ctx.config['PARTICIPLE_STEMS']):
-        root = row['root']
-        hom = row['hom']
-
-        try:
-            root_id = root_map[(root, hom)]
-        except KeyError:
-            skipped.add((root, hom))
-            continue
-
-        data = {
-            'name': row['stem'],
-            'root_id': root_id,
-            'mode_id': mode[row['mode']],
-            'voice_id': voice[row['voice']]
-        }
-
-        session.add(ParticipleStem(**data))
-
-        i += 1
-        if i % 100 == 0:
-            util.tick(row['stem'])
-            session.commit()
-
-    session.commit()
+    path = ctx.config['PARTICIPLE_STEMS']
+    with _task(progress, 'participle_stems', path) as task:
+        for row in util.read_csv(path):
+            task.update()
+            root = row['root']
+            hom = row['hom']
+
+            try:
+                root_id = root_map[(root, hom)]
+            except KeyError:
+                skipped.add((root, hom))
+                continue
+
+            data = {
+                'name': row['stem'],
+                'root_id': root_id,
+                'mode_id': mode[row['mode']],
+                'voice_id': voice[row['voice']]
+            }
+
+            session.add(ParticipleStem(**data))
+
+            i += 1
+            if i % 100 == 0:
+                session.commit()
+
+        session.commit()
+        task.message('Skipped {0} roots.'.format(len(skipped)))
     session.close()
-    print('Skipped', len(skipped), 'roots.')
 
 
-def add_nominal_endings(ctx):
+@metrics.timed('setup.add_nominal_endings')
+def add_nominal_endings(ctx, progress=None):
     """Populates `NominalEnding`."""
     session = ctx.session
     gender = ENUM['gender']
     case = ENUM['case']
     number = ENUM['number']
-
-    for row in util.read_csv(ctx.config['COMPOUNDED_NOMINAL_ENDINGS']):
-        ending = NominalEnding(name=row['ending'],
-                               stem_type=row['stem_type'],
-                               gender_id=gender[row['form_gender']],
-                               case_id=None, number_id=None, compounded=True)
-        session.add(ending)
-
-    seen = set()
-    for row in util.read_csv(ctx.config['INFLECTED_NOMINAL_ENDINGS']):
-        ending = NominalEnding(name=row['ending'],
-                               stem_type=row['stem_type'],
-                               gender_id=gender[row['form_gender']],
-                               case_id=case[row['case']],
-                               number_id=number[row['number']], compounded=False)
-        session.add(ending)
-
-        if row['stem_type'] not in seen:
-            util.tick(row['stem_type'])
-            seen.add(row['stem_type'])
-
-    session.commit()
+    compounded_path = ctx.config['COMPOUNDED_NOMINAL_ENDINGS']
+    inflected_path = ctx.config['INFLECTED_NOMINAL_ENDINGS']
+    paths = (compounded_path, inflected_path)
+    with _task(progress, 'nominal_endings', *paths) as task:
+        for row in util.read_csv(compounded_path):
+            ending = NominalEnding(name=row['ending'],
+                                   stem_type=row['stem_type'],
+                                   gender_id=gender[row['form_gender']],
+                                   case_id=None, number_id=None,
+                                   compounded=True)
+            session.add(ending)
+            task.update()
+
+        for row in util.read_csv(inflected_path):
+            ending = NominalEnding(name=row['ending'],
+                                   stem_type=row['stem_type'],
+                                   gender_id=gender[row['form_gender']],
+                                   case_id=case[row['case']],
+                                   number_id=number[row['number']],
+                                   compounded=False)
+            session.add(ending)
+            task.update()
+
+        session.commit()
     session.close()
 
 
-def add_nominal_stems(ctx):
+@metrics.timed('setup.add_nominal_stems')
+def add_nominal_stems(ctx, progress=None):
     """Add regular noun stems to the database."""
     # Since there are so many nominal stems, the SQLAlchemy calls here
     # are a little more low-level.
@@ -385,28 +435,31 @@ def add_nominal_stems(ctx):
 
     buf = []
     i = 0
-    tick = util.tick_every(5000)
-    for row in util.read_csv(ctx.config['NOMINAL_STEMS']):
-        genders_id = gender_group[row['stem_genders']]
-
-        buf.append({
-            'name': row['stem'],
-            'pos_id': Tag.NOMINAL,
-            'genders_id': genders_id,
-        })
-
-        tick(row['stem'])
-        i += 1
-        if i % 500 == 0:
+    path = ctx.config['NOMINAL_STEMS']
+    with _task(progress, 'nominal_stems', path) as task:
+        for row in util.read_csv(path):
+            genders_id = gender_group[row['stem_genders']]
+
+            buf.append({
+                'name': row['stem'],
+                'pos_id': Tag.NOMINAL,
+                'genders_id': genders_id,
+            })
+
+            i += 1
+            if i % 500 == 0:
+                conn.execute(ins, buf)
+                task.update(len(buf))
+                buf = []
+
+        # Add any remainder.
+        if buf:
             conn.execute(ins, buf)
-            buf = []
+            task.update(len(buf))
 
-    # Add any remainder.
-    if buf:
-        conn.execute(ins, buf)
 
-
-def add_irregular_nouns(ctx):
+@metrics.timed('setup.add_irregular_nouns')
+def add_irregular_nouns(ctx, progress=None):
     """Add irregular nouns to the database."""
 
     session = ctx.session
@@ -414,74 +467,77 @@ def add_irregular_nouns(ctx):
     gender = ENUM['gender']
     case = ENUM['case']
     number = ENUM['number']
+    with _task(progress, 'irregular_nouns') as task:
+        with open(ctx.config['IRREGULAR_NOUNS']) as f:
+            for noun in yaml.load_all(f):
+                genders_id = gender_group[noun['genders']]
+                stem = NounStem(name=noun['name'], genders_id=genders_id)
+                session.add(stem)
+                session.flush()
 
-    with open(ctx.config['IRREGULAR_NOUNS']) as f:
-        for noun in yaml.load_all(f):
-            genders_id = gender_group[noun['genders']]
-            stem = NounStem(name=noun['name'], genders_id=genders_id)
-            session.add(stem)
-            session.flush()
-
-            # Mark the stem as irregular
-            complete = noun['complete']
-            irreg = StemIrregularity(stem=stem, fully_described=complete)
-            session.add(irreg)
-            session.flush()
+                # Mark the stem as irregular
+                complete = noun['complete']
+                irreg = StemIrregularity(stem=stem, fully_described=complete)
+                session.add(irreg)
+                session.flush()
 
-            util.tick(stem.name)
+                task.update()
 
-            for form in noun['forms']:
-                name = form['name']
-                gender_id = gender[form['gender']]
-                case_id = case[form['case']]
-                number_id = number[form['number']]
+                for form in noun['forms']:
+                    name = form['name']
+                    gender_id = gender[form['gender']]
+                    case_id = case[form['case']]
+                    number_id = number[form['number']]
 
-                result = Noun(stem=stem, name=name, gender_id=gender_id,
-                              case_id=case_id, number_id=number_id)
-                session.add(result)
-                session.flush()
+                    result = Noun(stem=stem, name=name, gender_id=gender_id,
+                                  case_id=case_id, number_id=number_id)
+                    session.add(result)
+                    session.flush()
 
-    session.commit()
+        session.commit()
     session.close()
 
 
-def add_irregular_adjectives(ctx):
+@metrics.timed('setup.add_irregular_adjectives')
+def add_irregular_adjectives(ctx, progress=None):
     """Add regular irregular adjectives to the database."""
 
     session = ctx.session
     gender = ENUM['gender']
     case = ENUM['case']
     number = ENUM['number']
+    with _task(progress, 'irregular_adjectives') as task:
+        with open(ctx.config['IRREGULAR_ADJECTIVES']) as f:
+            for adj in yaml.load_all(f):
+                stem = AdjectiveStem(name=adj['name'])
+                session.add(stem)
+                session.flush()
 
-    with open(ctx.config['IRREGULAR_ADJECTIVES']) as f:
-        for adj in yaml.load_all(f):
-            stem = AdjectiveStem(name=adj['name'])
-            session.add(stem)
-            session.flush()
-
-            # Mark the stem as irregular
-            complete = adj['complete']
-            irreg = StemIrregularity(stem=stem, fully_described=complete)
-            session.add(irreg)
-            session.flush()
+                # Mark the stem as irregular
+                complete = adj['complete']
+                irreg = StemIrregularity(stem=stem, fully_described=complete)
+                session.add(irreg)
+                session.flush()
 
-            util.tick(stem.name)
+                task.update()
 
-            for form in adj['forms']:
-                name = form['name']
-                gender_id = gender[form['gender']]
-                case_id = case[form['case']]
-                number_id = number[form['number']]
+                for form in adj['forms']:
+                    name = form['name']
+                    gender_id = gender[form['gender']]
+                    case_id = case[form['case']]
+                    number_id = number[form['number']]
 
-                result = Adjective(stem=stem, name=name, gender_id=gender_id,
-                                   case_id=case_id, number_id=number_id)
-                session.add(result)
+                    result = Adjective(stem=stem, name=name,
+                                       gender_id=gender_id, case_id=case_id,
+                                       number_id=number_id)
+                    session.add(result)
 
-    session.commit()
+        session.commit()
     session.close()
 
 
-def add_pronouns(ctx):
+@metrics.timed('setup.add_pronouns')
+def add_pronouns(ctx, progress=None):
     """Populates `PronounStem` and `Pronoun`."""
 
     session = ctx.session
@@ -491,60 +547,90 @@ def add_pronouns(ctx):
     number = ENUM['number']
 
     seen_stems = {}  # (stem, genders_id) -> id
-    for row in util.read_csv(ctx.config['PRONOUNS']):
-        stem = row['stem']
-        genders_id = gender_group[row['stem_genders']]
+    path = ctx.config['PRONOUNS']
+    with _task(progress, 'pronouns', path) as task:
+        for row in util.read_csv(path):
+            task.update()
+            stem = row['stem']
+            genders_id = gender_group[row['stem_genders']]
+
+            if (stem, genders_id) not in seen_stems:
+                pronoun_stem = PronounStem(name=stem, genders_id=genders_id)
+                session.add(pronoun_stem)
+                session.flush()
+                seen_stems[(stem, genders_id)] = pronoun_stem.id
 
-        if (stem, genders_id) not in seen_stems:
-            pronoun_stem = PronounStem(name=stem, genders_id=genders_id)
-            session.add(pronoun_stem)
+            stem_id = seen_stems[(stem, genders_id)]
+            session.add(Nominal(stem_id=stem_id, name=row['form'],
+                                gender_id=gender[row['form_gender']],
+                                case_id=case[row['case']],
+                                number_id=number[row['number']]))
             session.flush()
-            seen_stems[(stem, genders_id)] = pronoun_stem.id
-            util.tick(stem)
 
-        stem_id = seen_stems[(stem, genders_id)]
-        session.add(Nominal(stem_id=stem_id, name=row['form'],
-                            gender_id=gender[row['form_gender']],
-                            case_id=case[row['case']],
-                            number_id=number[row['number']]))
-        session.flush()
+        session.commit()
+    session.close()
+
 
-    session.commit()
+@metrics.timed('setup.add_database_info')
+def add_database_info(ctx, progress=None):
+    """Record information about the build, including a new build ID and a
+    copy of the enumerated data that contexts can load in one query.
+    """
+    session = ctx.session
+    with _task(progress, 'database_info') as task:
+        session.add(DatabaseInfo(key=DatabaseInfo.BUILD_ID,
+                                 value=uuid.uuid4().hex))
+        enums = json.dumps(fetch_enum_data(session), sort_keys=True,
+                           separators=(',', ':'))
+        session.add(DatabaseInfo(key=DatabaseInfo.ENUMS, value=enums))
+        task.update(2)
+        session.commit()
     session.close()
 
 
-def run(ctx):
-    """Create and populate tables in the database."""
+def run(ctx, progress=None):
+    """Create and populate tables in the database.
+
+    :param progress: a :class:`~sanskrit.util.progress.Progress` for
+                     reporting on the build. If ``None``, report to the
+                     ``sanskrit.util.progress`` logger at the ``INFO``
+                     level.
+    """
+    if progress is None:
+        progress = Progress(LoggingSink())
+
     ctx.drop_all()
     ctx.create_all()
 
-    util.heading('Metadata and sandhi')
-    add_tags(ctx)
-    add_enums(ctx)
-    add_sandhi_rules(ctx)
-
-    util.heading('Indeclinables (non-verbal)')
-    add_indeclinables(ctx)
-
-    util.heading('Verbal data')
-    prefix_map = add_verb_prefixes(ctx)
-    root_map = add_roots(ctx, prefix_map=prefix_map)
-    add_verb_endings(ctx)
-    add_verbs(ctx, root_map)
-    add_participle_stems(ctx, root_map)
-    add_verbal_indeclinables(ctx, root_map)
+    progress.section('Metadata and sandhi')
+    add_tags(ctx, progress)
+    add_enums(ctx, progress)
+    add_sandhi_rules(ctx, progress)
+
+    progress.section('Indeclinables (non-verbal)')
+    add_indeclinables(ctx, progress)
+
+    progress.section('Verbal data')
+    prefix_map = add_verb_prefixes(ctx, progress)
+    root_map = add_roots(ctx, prefix_map=prefix_map, progress=progress)
+    add_verb_endings(ctx, progress)
+    add_verbs(ctx, root_map, progress)
+    add_participle_stems(ctx, root_map, progress)
+    add_verbal_indeclinables(ctx, root_map, progress)
     del prefix_map
 
-    util.heading('Nominal data')
-    add_nominal_stems(ctx)
-    add_nominal_endings(ctx)
-    add_pronouns(ctx)
-    # add_irregular_nouns(ctx)
-    # add_irregular_adjectives(ctx)
+    progress.section('Nominal data')
+    add_nominal_stems(ctx, progress)
+    add_nominal_endings(ctx, progress)
+    add_pronouns(ctx, progress)
+    # add_irregular_nouns(ctx, progress)
+    # add_irregular_adjectives(ctx, progress)
 
-    print('Done.')
+    add_database_info(ctx, progress)
+    progress.close()
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     ctx = Context(sys.argv[1])
     run(ctx)
@@ -12,9 +12,12 @@
     :license: MIT
 """
 
-#: All legal sounds, including anusvara, ardhachandra, and Vedic `'L'`.
-from builtins import map
 from builtins import zip
+import six
+
+from .util.functions import import_numpy
+
+#: All legal sounds, including anusvara, ardhachandra, and Vedic `'L'`.
 ALL_SOUNDS = frozenset("aAiIuUfFxXeEoOMHkKgGNcCjJYwWqQRtTdDnpPbBmyrlLvSzsh'~")
 
 #: All legal tokens, including sounds, punctuation (`'|'`), and whitespace.
@@ -45,6 +48,72 @@ CONSONANTS = STOPS.union(NASALS).union(SEMIVOWELS).union(SAVARGA)
 VALID_FINALS = frozenset('aAiIuUfeEoOkwtpNnmsr')
 
 
+# Sound classes
+# -------------
+# Each sound class has its own bit. :data:`CLASS_TABLE` maps every ASCII code
+# point to the union of its classes, so a single lookup answers several
+# class questions at once::
+#
+#     mask = CLASS_MAP['a']
+#     assert mask & CLASS_VOWEL and mask & CLASS_SHORT_VOWEL
+
+CLASS_VOWEL = 1 << 0
+CLASS_SHORT_VOWEL = 1 << 1
+CLASS_CONSONANT = 1 << 2
+CLASS_STOP = 1 << 3
+CLASS_NASAL = 1 << 4
+CLASS_SEMIVOWEL = 1 << 5
+CLASS_SAVARGA = 1 << 6
+CLASS_VALID_FINAL = 1 << 7
+CLASS_SOUND = 1 << 8
+CLASS_TOKEN = 1 << 9
+#: Anusvara and visarga.
+CLASS_MH = 1 << 10
+
+
+def _make_class_table():
+    """Build :data:`CLASS_TABLE`."""
+    table = [0] * 128
+    for bit, letters in (
+            (CLASS_VOWEL, VOWELS),
+            (CLASS_SHORT_VOWEL, SHORT_VOWELS),
+            (CLASS_CONSONANT, CONSONANTS),
+            (CLASS_STOP, STOPS),
+            (CLASS_NASAL, NASALS),
+            (CLASS_SEMIVOWEL, SEMIVOWELS),
+            (CLASS_SAVARGA, SAVARGA),
+            (CLASS_VALID_FINAL, VALID_FINALS),
+            (CLASS_SOUND, ALL_SOUNDS),
+            (CLASS_TOKEN, ALL_TOKENS),
+            (CLASS_MH, 'MH')):
+        for L in letters:
+            table[ord(L)] |= bit
+    return tuple(table)
+
+
+#: Maps each ASCII code point to a bitmask of its sound classes.
+CLASS_TABLE = _make_class_table()
+del _make_class_table
+
+#: Maps each token in :data:`ALL_TOKENS` to its bitmask. In pure Python,
+#: lookups by character are faster than lookups by code point.
+CLASS_MAP = dict((L, CLASS_TABLE[ord(L)]) for L in ALL_TOKENS)
+
+#: Like :data:`CLASS_MAP`, but for sounds only.
+_SOUND_CLASS_MAP = dict((L, CLASS_TABLE[ord(L)]) for L in ALL_SOUNDS)
+
+
+def sound_class(L):
+    """Return the bitmask of sound classes for `L`, or 0 if `L` isn't a
+    Sanskrit token::
+
+        assert sound_class('k') & CLASS_STOP
+
+    :param L: the letter to classify
+    """
+    return CLASS_MAP.get(L, 0)
+
+
 # General functions
 # -----------------
 
@@ -58,48 +127,104 @@ def clean(phrase, valid):
     return ''.join([L for L in phrase if L in valid])
 
 
-def key_fn(s):
-    """Sorting function for Sanskrit words in SLP1."""
+class _TranslationTable(dict):
+
+    """A :meth:`str.translate` table that deletes unmapped characters."""
+
+    def __missing__(self, key):
+        return None
+
+
+def _make_sort_tables():
+    """Build the translation tables used by :func:`key_fn` and
+    :func:`packed_key`. Vedic `'L'` sorts with `'l'`. Values are text so
+    that the tables also work with Python 2's :meth:`unicode.translate`.
+    """
     sa = "aAiIuUfFxXeEoOMHkKgGNcCjJYwWqQRtTdDnpPbBmyrlvSzsh '~"
     en = "123ABCDEFGHIJKLMNOPQRSTUVWabcdefghijklmnopqrstuvwxyz"
-    mapper = dict(zip(sa, en))
-    mapped = map(mapper.__getitem__, [x for x in s if x in ALL_SOUNDS])
-    return ''.join(mapped)
+    key_table = _TranslationTable()
+    packed_table = _TranslationTable()
+    for rank, (L, key) in enumerate(zip(sa, en)):
+        if L not in ALL_SOUNDS:
+            continue
+        key_table[ord(L)] = six.text_type(key)
+        packed_table[ord(L)] = six.unichr(rank + 1)
+    key_table[ord('L')] = key_table[ord('l')]
+    packed_table[ord('L')] = packed_table[ord('l')]
+    return key_table, packed_table
+
+
+_KEY_TABLE, _PACKED_KEY_TABLE = _make_sort_tables()
+del _make_sort_tables
+
+
+def key_fn(s):
+    """Sorting function for Sanskrit words in SLP1. Characters that aren't
+    Sanskrit sounds are ignored.
+
+    :param s: the string to convert
+    """
+    # On Python 2, only `unicode` accepts a dict table.
+    return six.text_type(s).translate(_KEY_TABLE)
+
+
+def packed_key(s):
+    """Like :func:`key_fn`, but return a compact :class:`bytes` key with
+    one byte per sound. Packed keys compare in the same order as the
+    strings returned by :func:`key_fn`, which makes them suitable for
+    storage in a database column with binary collation.
+
+    :param s: the string to convert
+    """
+    return six.text_type(s).translate(_PACKED_KEY_TABLE).encode('latin-1')
+
+
+def sort_slp1(words, reverse=False):
+    """Return a new list containing `words` in Sanskrit alphabetical
+    order. Sort keys are computed just once per word.
+
+    :param words: an iterable of SLP1 strings
+    :param reverse: if true, sort in descending order
+    """
+    return sorted(words, key=key_fn, reverse=reverse)
 
 
 # Letter transformations
 # ----------------------
 
+#: Data for the letter transformations below. Each transformation maps a
+#: letter to its transformed value.
+LETTER_TRANSFORMS = {
+    'shorten': dict(zip('AIUFX', 'aiufx')),
+    'lengthen': dict(zip('aiufx', 'AIUFX')),
+    'semivowel': dict(zip('iIuUfFxXeEoO',
+                          'y y v v r r l l ay Ay av Av'.split())),
+    'aspirate': dict(zip('kgcjwqtdpb',
+                         'KGCJWQTDPB')),
+    'deaspirate': dict(zip('KGCJWQTDPB',
+                           'kgcjwqtdpb')),
+    'voice': dict(zip('kKcCwWtTpP',
+                      'gGjJqQdDbB')),
+    'devoice': dict(zip('gGjJqQdDbB',
+                        'kKcCwWtTpP')),
+    'nasalize': dict(zip('kKgGhcCjJwWqQtTdDpPbB',
+                         'NNNNNYYYYRRRRnnnnmmmm')),
+    'dentalize': dict(zip('wWqQRz',
+                          'tTdDns')),
+    'retroflex': dict(zip('tTdDns',
+                          'wWqQRz')),
+    'simplify': dict(zip('kgGNhjtTdDpPbBnmsrH',
+                         'kkkkkwttttppppnmHHH')),
+    'guna': dict(zip('i I u U  f  F  x  X'.split(),
+                     'e e o o ar ar al al'.split())),
+    'vrddhi': dict(zip('a i I u U  f  F  x  X e o'.split(),
+                       'A E E O O Ar Ar Al Al E O'.split())),
+    'samprasarana': dict(zip('yrlv', 'ifxu'))
+}
+
+
 def letter_transform(name, docstring=None):
-    data = {
-        'shorten': dict(zip('AIUFX', 'aiufx')),
-        'lengthen': dict(zip('aiufx', 'AIUFX')),
-        'semivowel': dict(zip('iIuUfFxXeEoO',
-                              'y y v v r r l l ay Ay av Av'.split())),
-        'aspirate': dict(zip('kgcjwqtdpb',
-                             'KGCJWQTDPB')),
-        'deaspirate': dict(zip('KGCJWQTDPB',
-                               'kgcjwqtdpb')),
-        'voice': dict(zip('kKcCwWtTpP',
-                          'gGjJqQdDbB')),
-        'devoice': dict(zip('gGjJqQdDbB',
-                            'kKcCwWtTpP')),
-        'nasalize': dict(zip('kKgGhcCjJwWqQtTdDpPbB',
-                             'NNNNNYYYYRRRRnnnnmmmm')),
-        'dentalize': dict(zip('wWqQRz',
-                              'tTdDns')),
-        'retroflex': dict(zip('tTdDns',
-                              'wWqQRz')),
-        'simplify': dict(zip('kgGNhjtTdDpPbBnmsrH',
-                             'kkkkkwttttppppnmHHH')),
-        'guna': dict(zip('i I u U  f  F  x  X'.split(),
-                         'e e o o ar ar al al'.split())),
-        'vrddhi': dict(zip('a i I u U  f  F  x  X e o'.split(),
-                           'A E E O O Ar Ar Al Al E O'.split())),
-        'samprasarana': dict(zip('yrlv', 'ifxu'))
-    }
-
-    get = data[name].get
+    get = LETTER_TRANSFORMS[name].get
 
     def func(L):
         return get(L, L)
@@ -163,6 +288,42 @@ samprasarana = letter_transform('samprasarana',
 del letter_transform
 
 
+# String transformations
+# ----------------------
+# The letter transformations above, compiled for use with `str.translate`.
+# Input is converted to text first, since on Python 2 only `unicode` accepts
+# a dict table.
+
+_TRANSFORM_TABLES = dict(
+    (name, dict((ord(k), six.text_type(v)) for k, v in data.items()))
+    for name, data in LETTER_TRANSFORMS.items())
+
+
+def apply(name, text):
+    """Apply a letter transformation to every letter in `text`::
+
+        assert apply('devoice', 'vAg') == 'vAk'
+        assert apply('guna', 'kfzi') == 'karze'
+
+    :param name: the name of a transformation in
+                 :data:`LETTER_TRANSFORMS`, such as `'guna'` or `'devoice'`
+    :param text: the string to transform
+    """
+    return six.text_type(text).translate(_TRANSFORM_TABLES[name])
+
+
+def apply_many(name, texts):
+    """Apply a letter transformation to every letter of every string in
+    `texts`. This is a batch version of :func:`apply`.
+
+    :param name: the name of a transformation in :data:`LETTER_TRANSFORMS`
+    :param texts: an iterable of strings
+    :return: a list of transformed strings
+    """
+    table = _TRANSFORM_TABLES[name]
+    return [six.text_type(text).translate(table) for text in texts]
+
+
 # Term transformations
 # --------------------
 
@@ -209,22 +370,160 @@ def meter(phrase, heavy='_', light='.'):
     # True iff we've seen an anusvara, a visarga, or some conjunct consonants
     saw_cluster = False
     append = scan.append
+    get = _SOUND_CLASS_MAP.get
+    vowel = CLASS_VOWEL
+    short_vowel = CLASS_SHORT_VOWEL
+    consonant = CLASS_CONSONANT
+    mh = CLASS_MH
 
     # Search for heavy syllable and call all other syllables light. Since
     # syllable weight can depend on later consonants, we have to look ahead
     # to determine the proper weight. An easy way to do that is to reverse
     # the string:
-    for L in clean(phrase, ALL_SOUNDS)[::-1]:
-        if L in VOWELS:
-            if saw_cluster or L not in SHORT_VOWELS:
+    for L in reversed(phrase):
+        mask = get(L)
+        if mask is None:
+            continue
+
+        if mask & vowel:
+            if saw_cluster or not mask & short_vowel:
                 append(heavy)
             else:
                 append(light)
 
             saw_cluster = False
 
-        elif L in 'MH' or had_consonant:
+        elif mask & mh or had_consonant:
             saw_cluster = True
-        had_consonant = L in CONSONANTS
+        had_consonant = mask & consonant
+
+    scan.reverse()
+    return scan
+
+
+# Batch metrical functions
+# ------------------------
+# These functions scan many lines at once with NumPy, which is an optional
+# dependency. Each line is encoded as bytes, and the per-character loop
+# in `meter` is replaced by array operations over the whole batch.
+
+def _class_array(np):
+    """Return :data:`CLASS_TABLE` as an array indexed by byte value. Bytes
+    outside of ASCII have no classes."""
+    table = np.zeros(256, dtype=np.uint16)
+    table[:len(CLASS_TABLE)] = CLASS_TABLE
+    return table
+
 
-    return scan[::-1]
+def _encode_lines(np, lines):
+    """Encode `lines` as one array of character codes.
+
+    :return: a 2-tuple of the codes and the line index of each code.
+             Non-ASCII characters are encoded as ``'?'``.
+    """
+    lengths = [len(line) for line in lines]
+    text = ''.join(lines).encode('ascii', 'replace')
+    codes = np.frombuffer(text, dtype=np.uint8)
+    line_ids = np.repeat(np.arange(len(lines)), lengths)
+    return codes, line_ids
+
+
+def num_syllables_many(lines):
+    """Find the number of syllables in each of `lines`. This is a batch
+    version of :func:`num_syllables` and requires NumPy.
+
+    :param lines: a list of phrases
+    :return: an integer array with one count per line
+    """
+    np = import_numpy()
+    lines = list(lines)
+    codes, line_ids = _encode_lines(np, lines)
+    is_vowel = (_class_array(np)[codes] & CLASS_VOWEL).astype(bool)
+    return np.bincount(line_ids[is_vowel], minlength=len(lines))
+
+
+def class_masks(text):
+    """Return the sound class bitmask of each character in `text` as an
+    array. Characters that aren't Sanskrit tokens have mask 0. This is a
+    vectorized version of :func:`sound_class` and requires NumPy::
+
+        masks = class_masks('rAmaH')
+        vowels = (masks & CLASS_VOWEL) != 0
+
+    :param text: the string to classify
+    :return: an array of :data:`CLASS_TABLE` values
+    """
+    np = import_numpy()
+    codes, line_ids = _encode_lines(np, [text])
+    return _class_array(np)[codes]
+
+
+def class_masks_many(lines):
+    """Apply :func:`class_masks` to each of `lines`. The lines are
+    classified in a single batch.
+
+    :param lines: a list of strings
+    :return: a list with one mask array per line
+    """
+    np = import_numpy()
+    lines = list(lines)
+    codes, line_ids = _encode_lines(np, lines)
+    masks = _class_array(np)[codes]
+    stops = np.cumsum([len(line) for line in lines]).tolist()
+    starts = [0] + stops[:-1]
+    return [masks[i:j] for i, j in zip(starts, stops)]
+
+
+def meter_many(lines):
+    """Find the meter of each of `lines`. This is a batch version of
+    :func:`meter` and requires NumPy.
+
+    :param lines: a list of phrases
+    :return: a list with one boolean array per line. Each array has one
+             element per syllable, which is ``True`` if the syllable is
+             heavy and ``False`` if it is light.
+    """
+    np = import_numpy()
+    lines = list(lines)
+    if not lines:
+        return []
+
+    codes, line_ids = _encode_lines(np, lines)
+    masks = _class_array(np)[codes]
+    keep = (masks & CLASS_SOUND).astype(bool)
+    masks = masks[keep]
+    line_ids = line_ids[keep]
+    size = len(masks)
+    if not size:
+        return [np.zeros(0, dtype=bool) for line in lines]
+
+    vowel = (masks & CLASS_VOWEL).astype(bool)
+    long_vowel = vowel & ~(masks & CLASS_SHORT_VOWEL).astype(bool)
+    consonant = (masks & CLASS_CONSONANT).astype(bool)
+    same_line = line_ids[:-1] == line_ids[1:]
+
+    # A syllable is heavy if its vowel is long or if, before the next
+    # vowel, we find an anusvara, a visarga, or a non-vowel followed by a
+    # consonant. `cluster` marks the positions that satisfy the last two
+    # conditions.
+    cluster = (masks & CLASS_MH).astype(bool)
+    cluster[:-1] |= ~vowel[:-1] & consonant[1:] & same_line
+    cluster_sums = np.concatenate(([0], np.cumsum(cluster)))
+
+    # Each syllable runs from its vowel up to the next vowel or the end
+    # of the line, whichever comes first. Since `bounds` is sorted, the
+    # end of the syllable at `bounds[i]` is `bounds[i + 1]`.
+    line_start = np.concatenate(([True], ~same_line))
+    bounds = np.flatnonzero(vowel | line_start)
+    is_vowel_bound = vowel[bounds]
+    vowel_pos = bounds[is_vowel_bound]
+    ends = np.concatenate((bounds[1:], [size]))[is_vowel_bound]
+
+    heavy = long_vowel[vowel_pos] | \
+        (cluster_sums[ends] > cluster_sums[vowel_pos + 1])
+
+    # Slicing is much faster than `np.split` for many short lines.
+    counts = np.bincount(line_ids[vowel_pos], minlength=len(lines))
+    stops = np.cumsum(counts).tolist()
+    starts = [0] + stops[:-1]
+    return [heavy[i:j] for i, j in zip(starts, stops)]
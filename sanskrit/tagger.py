@@ -14,7 +14,10 @@
     :license: MIT
 """
 
+import time
+
 from sanskrit import analyze, models, sandhi, schema, util
+from sanskrit.util import metrics
 
 
 class NonForm(object):
@@ -93,25 +96,64 @@ class TaggedItem(object):
             return (form.name, 'perfect-indeclinable', form.root.name, '')
 
 
+class TagResult(list):
+
+    """The result of :meth:`Tagger.tag`: a list of :class:`TaggedItem`
+    objects that also records whether the search finished.
+    """
+
+    def __init__(self, items=(), exact=True):
+        list.__init__(self, items)
+        #: ``True`` if this is the best tagging the tagger could find, or
+        #: ``False`` if the search ran out of budget and the result was
+        #: completed with :class:`NonForm` items.
+        self.exact = exact
+
+    def __repr__(self):
+        return 'TagResult({0}, exact={1})'.format(list.__repr__(self),
+                                                  self.exact)
+
+
 class Tagger(object):
 
-    """The part-of-speech tagger."""
+    """The part-of-speech tagger.
+
+    :param ctx: the :class:`~sanskrit.context.Context` to use
+    :param model: the model that scores each step of the search. This is
+                  either a :class:`~sanskrit.models.FeatureModel` or a
+                  model over tag sequences, such as
+                  :class:`~sanskrit.models.SequenceModel`,
+                  :class:`~sanskrit.models.DenseSequenceModel`, or
+                  :class:`~sanskrit.models.NGramModel`. By default, use a
+                  :class:`~sanskrit.models.FeatureModel`.
+    """
 
-    def __init__(self, ctx):
-        rules = [(x.first, x.second, x.result)
-                 for x in ctx.session.query(schema.SandhiRule).all()]
+    def __init__(self, ctx, model=None):
+        with ctx.private_session() as session:
+            rules = [(x.first, x.second, x.result)
+                     for x in session.query(schema.SandhiRule).all()]
 
         self.ctx = ctx
         self.splitter = sandhi.Splitter(rules)
         self.analyzer = analyze.SimpleAnalyzer(ctx)
-        self.model = models.FeatureModel()
+        if model is None:
+            model = models.FeatureModel()
+        self.model = model
 
     def _score(self, before, cur, remainder):
         """Compute a score over the given tagger state."""
-        # xs = [before[-1].tag(self.ctx)] if before else []
-        # y = cur.tag(self.ctx)
-        # return self.model.log_cond_prob(xs, y)
-        return self.model.score(cur, remainder)
+        model = self.model
+        if isinstance(model, models.FeatureModel):
+            return model.score(cur, remainder)
+
+        # Sequence models see the tags of the previous ``order - 1`` items
+        # after a sequence boundary. Bigram models have no `order`.
+        ctx = self.ctx
+        n = getattr(model, 'order', 2) - 1
+        xs = [models.SEQUENCE_BOUNDARY]
+        if n:
+            xs.extend(x.tag(ctx) for x in before[-n:])
+        return model.log_cond_prob(xs, cur.tag(ctx))
 
     def iter_chunks(self, segment):
         """Iterate over the chunks in `segment`.
@@ -122,34 +164,111 @@ class Tagger(object):
             for chunk in line.split():
                 yield chunk
 
-    def tag(self, segment, segment_id=None):
+    def tag(self, segment, segment_id=None, max_expansions=None,
+            deadline=None):
         """Return the linguistic forms that compose `segment`. If a form
         can't be parsed, it's wrapped in :class:`NonForm`.
 
+        The search can be given a budget. If it runs out, the tagger stops
+        and returns the furthest-reaching hypothesis it has seen, with the
+        rest of the segment wrapped in :class:`NonForm` items. The result's
+        `exact` attribute is then ``False``.
+
         :param segment: an arbitrary string
-        :return: a list of :class:`TaggedItem` objects.
+        :param segment_id: the ID to store on each :class:`TaggedItem`
+        :param max_expansions: the maximum number of search states to
+                               expand, or ``None`` for no limit
+        :param deadline: the time, as returned by :func:`time.time`, after
+                         which to stop searching, or ``None`` for no limit
+        :return: a :class:`TagResult`
         """
         chunks = list(self.iter_chunks(segment))
         if not chunks:
-            return
+            return TagResult()
+
+        registry = metrics.get_registry()
+        with registry.timer('tagger.tag'):
+            done, exact, stats = self._search(chunks, segment_id,
+                                              max_expansions, deadline)
+
+        registry.incr('tagger.segments')
+        if not exact:
+            registry.incr('tagger.truncated')
+        for key, value in stats.items():
+            registry.incr('tagger.' + key, value)
+        return TagResult(done, exact=exact)
+
+    @staticmethod
+    def _complete(state, chunks, segment_id):
+        """Complete a partial search state by wrapping whatever is left of
+        the segment in :class:`NonForm` items.
+        """
+        done, chunk_index, remainder = state
+        done = list(done)
+        if remainder:
+            item = TaggedItem(segment_id, chunk_index, NonForm(remainder))
+            done.append(item)
+        for i in range(chunk_index + 1, len(chunks)):
+            done.append(TaggedItem(segment_id, i, NonForm(chunks[i])))
+        return done
+
+    def _search(self, chunks, segment_id, max_expansions=None,
+                deadline=None):
+        """Run a best-first search over the splits of `chunks`.
 
+        :return: a 3-tuple of the best list of :class:`TaggedItem` objects,
+                 whether the search finished within its budget, and a
+                 :class:`dict` of search statistics
+        """
         q = util.PriorityQueue()
         q.push(([], 0, chunks[0]), 0)
+        pushes = 1
+        pops = 0
+        expansions = 0
+        splits = 0
+        clock = time.time
+
+        # The furthest-reaching state seen so far. States are popped in
+        # order of priority, so on ties the earlier state is better.
+        best = None
+        best_progress = None
+        exact = True
 
         done = []
         while q:
-            (done, chunk_index, remainder), priority = q.pop_with_priority()
+            state, priority = q.pop_with_priority()
+            done, chunk_index, remainder = state
+            pops += 1
+
+            progress = (chunk_index, -len(remainder or ''))
+            if best is None or progress > best_progress:
+                best = state
+                best_progress = progress
+
             # Chunk is done
             if not remainder:
                 if chunk_index + 1 < len(chunks):
                     new_state = (done, chunk_index + 1, chunks[chunk_index + 1])
                     q.push(new_state, priority)
+                    pushes += 1
                     continue
                 else:
                     # Segment is done!
                     break
 
+            if ((max_expansions is not None and expansions >= max_expansions)
+                    or (deadline is not None and clock() >= deadline)):
+                exact = False
+                break
+
+            expansions += 1
             for before, after in self.splitter.iter_splits(remainder):
+                # A single expansion can run many queries, so check the
+                # deadline between them too.
+                if deadline is not None and clock() >= deadline:
+                    exact = False
+                    break
+                splits += 1
                 # Without this line, the tagger could loop forever. This
                 # looping occurs if a sandhi rule has the form "X -> Y X",
                 # which yields Y while leaving the term with X unchanged.
@@ -160,6 +279,7 @@ class Tagger(object):
                     item = TaggedItem(segment_id, chunk_index, result)
                     q.push((done + [item], chunk_index, after),
                             priority + self._score(done, item, after))
+                    pushes += 1
 
             # Add "default" state in case nothing could be found.
             if remainder == chunks[chunk_index]:
@@ -167,5 +287,18 @@ class Tagger(object):
                 item = TaggedItem(segment_id, chunk_index, result)
                 new_state = (done + [item], chunk_index, None)
                 q.push(new_state, priority + self._score(done, item, remainder))
+                pushes += 1
 
-        return done
+            if not exact:
+                break
+
+        if not exact:
+            done = self._complete(best, chunks, segment_id)
+
+        stats = {
+            'pushes': pushes,
+            'pops': pops,
+            'expansions': expansions,
+            'splits': splits,
+        }
+        return done, exact, stats
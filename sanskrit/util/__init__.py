@@ -1,3 +1,23 @@
-from .trie import HashTrie
-from .queue import PriorityQueue
-from .functions import *
+from . import lazy
+
+__all__ = [
+    'HashTrie', 'PriorityQueue', 'read_csv', 'count_rows', 'import_numpy',
+    'LRUCache', 'SQLiteCache', 'Progress', 'NullSink', 'LoggingSink',
+    'JSONLinesSink', 'metrics',
+]
+
+lazy.install(__name__, {
+    'HashTrie': ('.trie', 'HashTrie'),
+    'PriorityQueue': ('.queue', 'PriorityQueue'),
+    'read_csv': ('.functions', 'read_csv'),
+    'count_rows': ('.functions', 'count_rows'),
+    'import_numpy': ('.functions', 'import_numpy'),
+    'LRUCache': ('.cache', 'LRUCache'),
+    'SQLiteCache': ('.cache', 'SQLiteCache'),
+    'Progress': ('.progress', 'Progress'),
+    'NullSink': ('.progress', 'NullSink'),
+    'LoggingSink': ('.progress', 'LoggingSink'),
+    'JSONLinesSink': ('.progress', 'JSONLinesSink'),
+    'metrics': ('.metrics', None),
+}, submodules=['cache', 'functions', 'lazy', 'metrics', 'progress', 'queue',
+               'trie'])
@@ -0,0 +1,175 @@
+"""
+sanskrit.util.cache
+~~~~~~~~~~~~~~~~~~~
+
+Bounded caches for data derived from the database. Since the database
+doesn't change between builds, cached values never expire. Instead, each
+cache is tied to a *build ID* (see :attr:`~sanskrit.context.Context.build_id`)
+and is emptied whenever that ID changes.
+
+:license: MIT
+"""
+
+import collections
+import json
+import pickle
+import sqlite3
+import threading
+
+
+class LRUCache(object):
+
+    """An in-memory cache that discards the least recently used item
+    once it holds more than `maxsize` items.
+
+    :param maxsize: the maximum number of items to store
+    :param build_id: the build ID of the data being cached
+    """
+
+    def __init__(self, maxsize=1024, build_id=None):
+        self.maxsize = maxsize
+        self.build_id = build_id
+        self.data = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.data)
+
+    def bind(self, build_id):
+        """Tie the cache to `build_id`, and empty it if its data comes
+        from some other build.
+
+        :param build_id: the build ID of the data being cached
+        """
+        with self.lock:
+            if build_id != self.build_id:
+                self.data.clear()
+                self.build_id = build_id
+
+    def get(self, key, default=None):
+        """Return the value for `key`, or `default` if there is none.
+
+        :param key: a hashable key
+        :param default: the value to return on a cache miss
+        """
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                return default
+            self.data[key] = value
+            return value
+
+    def set(self, key, value):
+        """Store `value` under `key`.
+
+        :param key: a hashable key
+        :param value: the value to store
+        """
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        """Remove all items from the cache."""
+        with self.lock:
+            self.data.clear()
+
+
+class SQLiteCache(object):
+
+    """An on-disk cache stored in a separate SQLite file, so that cached
+    values survive restarts. Keys must be JSON-serializable and values
+    must be picklable.
+
+    The cache holds at most `maxsize` items. The oldest items are evicted
+    first.
+
+    :param path: the path to the cache file
+    :param maxsize: the maximum number of items to store
+    :param build_id: the build ID of the data being cached. If this
+                     doesn't match the build ID stored in the file, the
+                     file is emptied. If it's ``None``, the file is always
+                     emptied, since there is no way to tell whether its
+                     data is stale.
+    """
+
+    def __init__(self, path, maxsize=100000, build_id=None):
+        self.path = path
+        self.maxsize = maxsize
+        self.build_id = None
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS info '
+                              '(key TEXT PRIMARY KEY, value TEXT)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                              '(id INTEGER PRIMARY KEY, key TEXT UNIQUE, '
+                              'value BLOB)')
+        row = self.conn.execute("SELECT value FROM info "
+                                "WHERE key = 'build_id'").fetchone()
+        self.build_id = row[0] if row else None
+        self._bind(build_id, force=build_id is None)
+
+    def __len__(self):
+        with self.lock:
+            row = self.conn.execute('SELECT COUNT(*) FROM cache').fetchone()
+        return row[0]
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key)
+
+    def _bind(self, build_id, force=False):
+        with self.lock, self.conn:
+            if force or build_id != self.build_id:
+                self.conn.execute('DELETE FROM cache')
+                self.conn.execute("INSERT OR REPLACE INTO info "
+                                  "VALUES ('build_id', ?)", (build_id,))
+                self.build_id = build_id
+
+    def bind(self, build_id):
+        """Tie the cache to `build_id`, and empty it if its data comes
+        from some other build.
+
+        :param build_id: the build ID of the data being cached
+        """
+        self._bind(build_id)
+
+    def get(self, key, default=None):
+        """Return the value for `key`, or `default` if there is none.
+
+        :param key: a JSON-serializable key
+        :param default: the value to return on a cache miss
+        """
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM cache WHERE key = ?',
+                                    (self._key(key),)).fetchone()
+        if row is None:
+            return default
+        return pickle.loads(bytes(row[0]))
+
+    def set(self, key, value):
+        """Store `value` under `key`.
+
+        :param key: a JSON-serializable key
+        :param value: a picklable value
+        """
+        blob = sqlite3.Binary(pickle.dumps(value, 2))
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO cache (key, value) '
+                              'VALUES (?, ?)', (self._key(key), blob))
+            self.conn.execute('DELETE FROM cache WHERE id <= '
+                              '(SELECT MAX(id) FROM cache) - ?',
+                              (self.maxsize,))
+
+    def clear(self):
+        """Remove all items from the cache."""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM cache')
+
+    def close(self):
+        """Close the underlying file."""
+        self.conn.close()
@@ -7,7 +7,6 @@ Various helper functions.
 :license: MIT and BSD
 """
 
-from __future__ import print_function
 import csv
 
 
@@ -22,25 +21,25 @@ def read_csv(filename):
             yield row
 
 
-def heading(s, char='-'):
-    """Print `s` as a heading. This is used to update the user during a
-    long-running function."""
-    print()
-    print(s)
-    print(char * len(s))
+def count_rows(filename):
+    """Return the number of rows in a CSV file, not counting the header.
+    This counts lines, so it's fast but assumes that no value contains a
+    line break.
 
-
-def tick(s):
-    """Print `s` as a list item. This is used to update the user during a
-    long-running function.
+    :param filename: the name of the file
     """
-    print(' -', s)
+    with open(filename, 'rb') as f:
+        num_lines = sum(1 for line in f)
+    return max(num_lines - 1, 0)
 
 
-def tick_every(n):
-    def func(x):
-        func.i += 1
-        if func.i % n == 0:
-            print(func.i, ':', x)
-    func.i = 0
-    return func
+def import_numpy():
+    """Import NumPy, which is an optional dependency. If it's missing,
+    raise an :class:`ImportError` that explains how to install it.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('This function requires NumPy. Install it with '
+                          "`pip install sanskrit[numpy]`.")
+    return numpy
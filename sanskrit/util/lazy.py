@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+sanskrit.util.lazy
+~~~~~~~~~~~~~~~~~~
+
+Helpers for packages that load their contents on first use, so that
+importing a package doesn't import every module it exports.
+
+:license: MIT and BSD
+"""
+
+import importlib
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+
+    """A module that loads missing attributes with its ``__getattr__``
+    function. Before Python 3.7, this is how a module gets the behavior of
+    :pep:`562`.
+    """
+
+    def __getattr__(self, name):
+        return self.__dict__['__getattr__'](name)
+
+    def __dir__(self):
+        return self.__dict__['__dir__']()
+
+
+def install(module_name, names, submodules=()):
+    """Make the module `module_name` load `names` and `submodules` on
+    first use.
+
+    On Python 2, the names are imported immediately and submodules must be
+    imported explicitly, as usual.
+
+    :param module_name: the name of the module, usually ``__name__``
+    :param names: maps a public name to a ``(module, attribute)`` tuple,
+                  where `module` is relative to `module_name`. If
+                  `attribute` is ``None``, the name refers to the module
+                  itself.
+    :param submodules: the names of submodules that can be loaded as
+                       attributes
+    """
+    module = sys.modules[module_name]
+    namespace = module.__dict__
+    submodules = frozenset(submodules)
+
+    def __getattr__(name):
+        if name in names:
+            source, attr = names[name]
+            value = importlib.import_module(source, module_name)
+            if attr is not None:
+                value = getattr(value, attr)
+        elif name in submodules:
+            value = importlib.import_module('.' + name, module_name)
+        else:
+            raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+                module_name, name))
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(names) | submodules)
+
+    if sys.version_info < (3, 5):
+        for name in names:
+            __getattr__(name)
+        return
+
+    namespace['__getattr__'] = __getattr__
+    namespace['__dir__'] = __dir__
+    if sys.version_info < (3, 7):
+        module.__class__ = _LazyModule
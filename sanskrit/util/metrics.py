@@ -0,0 +1,266 @@
+"""
+sanskrit.util.metrics
+~~~~~~~~~~~~~~~~~~~~~
+
+Lightweight instrumentation. The tagger, analyzer, splitter, query code,
+and database loaders report counters and timings to a global registry.
+By default, that registry discards everything, so instrumentation costs
+almost nothing. To collect metrics, enable a real registry::
+
+    from sanskrit.util import metrics
+
+    registry = metrics.enable()
+    tagger.tag(segment)
+    print(registry.snapshot())
+
+or attach a callback that receives each event as it happens::
+
+    registry.add_callback(lambda kind, name, value: print(kind, name, value))
+
+Metric names are dotted strings, such as ``'tagger.pushes'`` or
+``'analyzer.stem_sql'``. Timers are histograms of durations in seconds.
+
+:license: MIT
+"""
+
+from __future__ import division
+import bisect
+import functools
+import threading
+import time
+
+#: Default histogram bucket bounds. Each bucket counts the values that are
+#: less than or equal to its bound and greater than the previous bound.
+DEFAULT_BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1, 10, 100, 1000, 1e4,
+                  1e5, 1e6)
+
+#: Event kinds passed to callbacks.
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+
+
+class Histogram(object):
+
+    """Summarizes a stream of values.
+
+    :param bounds: the upper bounds of the buckets, in increasing order.
+                   Values above the last bound are counted in an overflow
+                   bucket.
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        """Record `value`."""
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        """Return the histogram's state as a :class:`dict`."""
+        bounds = [str(x) for x in self.bounds] + ['inf']
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'buckets': dict(zip(bounds, self.buckets)),
+        }
+
+
+class _Timer(object):
+
+    """Times a block of code and records the duration in a histogram."""
+
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self.registry.observe(self.name, time.time() - self.start)
+
+
+class _NullTimer(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullRegistry(object):
+
+    """A registry that discards everything. This is the default."""
+
+    #: Whether this registry records anything. Code that does extra work
+    #: to compute a metric can check this first.
+    enabled = False
+
+    def incr(self, name, value=1):
+        """Add `value` to the counter `name`."""
+
+    def observe(self, name, value):
+        """Record `value` in the histogram `name`."""
+
+    def timer(self, name):
+        """Return a context manager that records the duration of its block
+        in the histogram `name`."""
+        return _NULL_TIMER
+
+    def snapshot(self):
+        """Return all metrics as a :class:`dict`."""
+        return {'counters': {}, 'histograms': {}}
+
+
+class Registry(NullRegistry):
+
+    """A thread-safe registry of counters and histograms.
+
+    :param bounds: the bucket bounds to use for new histograms
+    """
+
+    enabled = True
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.counters = {}
+        self.histograms = {}
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def add_callback(self, callback):
+        """Call `callback(kind, name, value)` on every event. `kind` is
+        :data:`COUNTER` or :data:`HISTOGRAM`.
+        """
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Stop calling `callback`."""
+        self.callbacks.remove(callback)
+
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        for callback in self.callbacks:
+            callback(COUNTER, name, value)
+
+    def observe(self, name, value):
+        with self.lock:
+            try:
+                histogram = self.histograms[name]
+            except KeyError:
+                histogram = self.histograms[name] = Histogram(self.bounds)
+            histogram.observe(value)
+        for callback in self.callbacks:
+            callback(HISTOGRAM, name, value)
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': dict((name, h.snapshot())
+                                   for name, h in self.histograms.items()),
+            }
+
+    def reset(self):
+        """Remove all metrics. Callbacks are kept."""
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+_registry = NullRegistry()
+
+
+def get_registry():
+    """Return the global registry."""
+    return _registry
+
+
+def set_registry(registry):
+    """Replace the global registry.
+
+    :param registry: a :class:`Registry` or :class:`NullRegistry`
+    :return: the previous registry
+    """
+    global _registry
+    previous = _registry
+    _registry = registry
+    return previous
+
+
+def enable(registry=None):
+    """Start recording metrics.
+
+    :param registry: the registry to use. If ``None``, use a new
+                     :class:`Registry`.
+    :return: the registry in use
+    """
+    registry = registry or Registry()
+    set_registry(registry)
+    return registry
+
+
+def disable():
+    """Stop recording metrics."""
+    set_registry(NullRegistry())
+
+
+def incr(name, value=1):
+    """Add `value` to the counter `name` in the global registry."""
+    _registry.incr(name, value)
+
+
+def observe(name, value):
+    """Record `value` in the histogram `name` in the global registry."""
+    _registry.observe(name, value)
+
+
+def timer(name):
+    """Time a block of code with the global registry::
+
+        with metrics.timer('analyzer.form_sql'):
+            results = query.all()
+    """
+    return _registry.timer(name)
+
+
+def timed(name):
+    """Decorate a function so that each call is timed with
+    :func:`timer`.
+
+    :param name: the histogram name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            with _registry.timer(name):
+                return func(*args, **kw)
+        return wrapper
+    return decorator
@@ -0,0 +1,235 @@
+"""
+sanskrit.util.progress
+~~~~~~~~~~~~~~~~~~~~~~
+
+Progress reporting for long-running jobs, such as building the database.
+A :class:`Progress` object turns a job into a stream of events and passes
+each event to a *sink*, which decides what to do with it::
+
+    progress = Progress(JSONLinesSink(sys.stderr))
+    progress.section('Verbal data')
+    with progress.task('verb', total=len(rows)) as task:
+        for row in rows:
+            load(row)
+            task.update()
+    progress.close()
+
+Each event is a :class:`dict` with an ``'event'`` key, which is one of
+``'section'``, ``'start'``, ``'progress'``, ``'end'``, ``'message'``, or
+``'done'``, and a ``'time'`` key with the wall-clock time. Task events also
+have these keys:
+
+- ``'task'``: the task name
+- ``'rows'``: the number of rows processed so far
+- ``'total'``: the expected number of rows, or ``None`` if it's unknown
+- ``'elapsed'``: the seconds since the task started
+- ``'rate'``: rows per second
+- ``'eta'``: the estimated seconds left, or ``None`` if it's unknown
+
+``'progress'`` events are sent at most once per `interval` seconds for each
+task, so the output stays small no matter how many rows there are.
+
+:license: MIT
+"""
+
+from __future__ import division
+import json
+import logging
+import time
+
+import six
+
+
+class NullSink(object):
+
+    """Discards all events."""
+
+    #: Whether this sink does anything with its events. Code that does extra
+    #: work just for progress reporting can check this first.
+    enabled = False
+
+    def emit(self, event):
+        """Handle `event`."""
+
+
+class LoggingSink(NullSink):
+
+    """Formats events as readable messages and sends them to a logger.
+    ``'start'`` events are skipped, since the task's first ``'progress'``
+    or ``'end'`` event follows soon after.
+
+    :param logger: the logger to use. If ``None``, use this module's logger.
+    :param level: the level to log at
+    """
+
+    enabled = True
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    @staticmethod
+    def format(event):
+        """Return a readable message for `event`, or ``None`` if the event
+        shouldn't be logged."""
+        kind = event['event']
+        if kind == 'section':
+            return '== {0}'.format(event['name'])
+        if kind == 'message':
+            if event.get('task'):
+                return '{0}: {1}'.format(event['task'], event['message'])
+            return event['message']
+        if kind == 'done':
+            return 'Done in {0:.1f}s.'.format(event['elapsed'])
+        if kind == 'start':
+            return None
+
+        rows = event['rows']
+        if event['total'] is not None:
+            rows = '{0}/{1}'.format(rows, event['total'])
+        rate = event['rate']
+        rate = '?' if rate is None else '{0:.0f}'.format(rate)
+        if kind == 'end':
+            return '{0}: {1} rows in {2:.2f}s ({3} rows/s)'.format(
+                event['task'], rows, event['elapsed'], rate)
+
+        message = '{0}: {1} rows, {2:.1f}s, {3} rows/s'.format(
+            event['task'], rows, event['elapsed'], rate)
+        if event['eta'] is not None:
+            message += ', ETA {0:.0f}s'.format(event['eta'])
+        return message
+
+    def emit(self, event):
+        message = self.format(event)
+        if message is not None:
+            self.logger.log(self.level, message)
+
+
+class JSONLinesSink(NullSink):
+
+    """Writes each event as a line of JSON.
+
+    :param stream: a file-like object opened for writing text
+    """
+
+    enabled = True
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def emit(self, event):
+        line = json.dumps(event, sort_keys=True)
+        self.stream.write(six.text_type(line) + u'\n')
+        self.stream.flush()
+
+
+class Task(object):
+
+    """Tracks the progress of a single step, such as loading one table.
+    Create tasks with :meth:`Progress.task`.
+    """
+
+    def __init__(self, progress, name, total=None):
+        #: The :class:`Progress` that owns this task.
+        self.progress = progress
+        #: The task name.
+        self.name = name
+        #: The expected number of rows, or ``None`` if it's unknown.
+        self.total = total
+        #: The number of rows processed so far.
+        self.rows = 0
+        #: Whether the task has ended.
+        self.closed = False
+
+        self.start = progress.clock()
+        self._next = self.start + progress.interval
+        progress.emit('start', task=name, total=total)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _stats(self, now):
+        elapsed = now - self.start
+        rate = self.rows / elapsed if elapsed > 0 else None
+        eta = None
+        if self.total is not None and rate:
+            eta = max(self.total - self.rows, 0) / rate
+        return {
+            'task': self.name,
+            'rows': self.rows,
+            'total': self.total,
+            'elapsed': elapsed,
+            'rate': rate,
+            'eta': eta,
+        }
+
+    def update(self, n=1):
+        """Record that `n` more rows were processed."""
+        self.rows += n
+        now = self.progress.clock()
+        if now >= self._next:
+            self._next = now + self.progress.interval
+            self.progress.emit('progress', **self._stats(now))
+
+    def message(self, message):
+        """Send a free-form message about this task."""
+        self.progress.emit('message', task=self.name, message=message)
+
+    def close(self):
+        """End the task. Calling this more than once has no effect."""
+        if not self.closed:
+            self.closed = True
+            self.progress.emit('end', **self._stats(self.progress.clock()))
+
+
+class Progress(object):
+
+    """Reports the progress of a job to a sink.
+
+    :param sink: the sink that receives events. If ``None``, use a
+                 :class:`NullSink`.
+    :param interval: the minimum number of seconds between ``'progress'``
+                     events for a task
+    :param clock: a function that returns the current time in seconds
+    """
+
+    def __init__(self, sink=None, interval=5, clock=time.time):
+        self.sink = sink or NullSink()
+        self.interval = interval
+        self.clock = clock
+        self.start = clock()
+
+    @property
+    def enabled(self):
+        """Whether events are used by the sink."""
+        return self.sink.enabled
+
+    def emit(self, kind, **data):
+        """Send an event of the given kind to the sink."""
+        data['event'] = kind
+        data['time'] = time.time()
+        self.sink.emit(data)
+
+    def section(self, name):
+        """Start a new group of tasks."""
+        self.emit('section', name=name)
+
+    def task(self, name, total=None):
+        """Start a new task.
+
+        :param name: the task name, such as the name of a table
+        :param total: the expected number of rows, if known
+        :rtype: :class:`Task`
+        """
+        return Task(self, name, total=total)
+
+    def message(self, message):
+        """Send a free-form message."""
+        self.emit('message', message=message)
+
+    def close(self):
+        """Report that the job is done."""
+        self.emit('done', elapsed=self.clock() - self.start)
@@ -1,25 +1,32 @@
 import heapq
+import itertools
 
 
 class PriorityQueue(object):
 
-    """A priority queue. Higher values are popped first."""
+    """A priority queue. Higher values are popped first. Items with the
+    same priority are popped in the order they were pushed, so items never
+    need to be comparable.
+    """
 
     def __init__(self):
         self.heap = []
+        self.counter = itertools.count()
 
     def __copy__(self):
         p = PriorityQueue()
         p.heap = list(self.heap)
+        p.counter = itertools.count(next(self.counter))
+        return p
 
     def __str__(self):
-        return str([(item, priority) for priority, item in self.heap])
+        return str([(item, -priority) for priority, i, item in self.heap])
 
     def __len__(self):
         return len(self.heap)
 
     def __iter__(self):
-        for priority, item in self.heap:
+        for priority, i, item in self.heap:
             yield (item, -priority)
 
     def push(self, item, priority=0):
@@ -28,8 +35,8 @@ class PriorityQueue(object):
         :param item: the item to add
         :param priority: the priority to use
         """
-        pair = (-priority, item)
-        heapq.heappush(self.heap, pair)
+        entry = (-priority, next(self.counter), item)
+        heapq.heappush(self.heap, entry)
 
     def pop(self):
         """Pop the highest-priority item from the queue."""
@@ -42,7 +49,7 @@ class PriorityQueue(object):
 
         ::
         """
-        (priority, item) = heapq.heappop(self.heap)
+        (priority, i, item) = heapq.heappop(self.heap)
         return (item, -priority)
 
     def peek(self):
@@ -54,5 +61,5 @@ class PriorityQueue(object):
 
         If the queue is empty, throw an :exc:`IndexError`.
         """
-        priority, item = self.heap[0]
+        priority, i, item = self.heap[0]
         return (item, -priority)
@@ -1,4 +1,20 @@
+import sys
+
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+#: Modules that use Python 3.5 syntax, such as ``async def``. Older versions
+#: can't byte-compile them, so they aren't installed there.
+PY35_MODULES = [('sanskrit', 'service')]
+
+
+class BuildPy(build_py):
+
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info >= (3, 5):
+            return modules
+        return [m for m in modules if m[:2] not in PY35_MODULES]
 
 
 setup(
@@ -25,11 +41,13 @@ setup(
     keywords='sanskrit',
 
     packages=find_packages(exclude=['docs', 'test*']),
+    cmdclass={'build_py': BuildPy},
     install_requires=['sqlalchemy >= 0.7', 
                       'future',
                       'six'],
     extras_require={
         'dev': ['pytest'],
+        'numpy': ['numpy'],
         'test': ['pytest'],
     }
 )
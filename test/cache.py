@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+test.cache
+~~~~~~~~~~
+
+Tests the caches in :mod:`sanskrit.util.cache`.
+
+:license: MIT and BSD
+"""
+
+import os
+import shutil
+import tempfile
+
+from sanskrit.util import LRUCache, SQLiteCache
+from . import TestCase
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_get_and_set(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('b', 'default'), 'default')
+
+    def test_eviction(self):
+        """Test that the least recently used item is evicted."""
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_bind(self):
+        """Test that a new build ID empties the cache."""
+        cache = LRUCache(build_id='1')
+        cache.set('a', 1)
+        cache.bind('1')
+        self.assertEqual(cache.get('a'), 1)
+        cache.bind('2')
+        self.assertEqual(cache.get('a'), None)
+
+
+class SQLiteCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_persistence(self):
+        """Test that values survive across instances."""
+        cache = SQLiteCache(self.path, build_id='1')
+        cache.set(('noun', 'deva', 'm'), {('1', 's'): 'devaH'})
+        cache.close()
+
+        cache = SQLiteCache(self.path, build_id='1')
+        self.assertEqual(cache.get(('noun', 'deva', 'm')),
+                         {('1', 's'): 'devaH'})
+        cache.close()
+
+    def test_build_id(self):
+        """Test that a new build ID empties the file."""
+        cache = SQLiteCache(self.path, build_id='1')
+        cache.set('a', 1)
+        cache.close()
+
+        cache = SQLiteCache(self.path, build_id='2')
+        self.assertEqual(cache.get('a'), None)
+        cache.set('a', 1)
+        cache.bind('3')
+        self.assertEqual(cache.get('a'), None)
+        cache.close()
+
+    def test_eviction(self):
+        """Test that the oldest items are evicted."""
+        cache = SQLiteCache(self.path, maxsize=2, build_id='1')
+        for i in range(5):
+            cache.set(str(i), i)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('4'), 4)
+        self.assertEqual(cache.get('0'), None)
+        cache.close()
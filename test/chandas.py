@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+test.chandas
+~~~~~~~~~~~~
+
+Tests metre classification.
+
+:license: MIT and BSD
+"""
+
+import os
+import shutil
+import tempfile
+
+from sanskrit import chandas
+from sanskrit.chandas import Classifier
+from . import TestCase
+
+
+MEGHADUTA = """
+kaScitkAntAvirahaguruRA svADikArapramattaH
+SApenAstaMgamitamahimA varzaBogyeRa BartuH .
+yakzaScakre janakatanayAsnAnapuRyodakezu
+snigDacCAyAtaruzu vasatiM rAmagiryASramezu .. 1 ..
+"""
+
+KUMARASAMBHAVA = [
+    ('astyuttarasyAM diSi devatAtmA', 'indravajrA'),
+    ('himAlayo nAma nagADirAjaH', 'upendravajrA'),
+]
+
+GITA = """
+Darmakzetre kurukzetre samavetA yuyutsavaH
+mAmakAH pARqavAS cEva kim akurvata saMjaya
+"""
+
+
+class PatternTestCase(TestCase):
+
+    def test_ganas_to_pattern(self):
+        self.assertEqual(chandas.ganas_to_pattern('ttjgg'), '__.__.._.__')
+        self.assertEqual(chandas.ganas_to_pattern('mBnttgg'),
+                         '____.....__.__.__')
+
+    def test_signature(self):
+        self.assertEqual(chandas.signature([]), 0)
+        self.assertEqual(chandas.signature([True, False, True]), 5)
+
+
+class ClassifierTestCase(TestCase):
+
+    def setUp(self):
+        self.classifier = Classifier()
+
+    def test_fixed_metres(self):
+        """Test metres that are classified with the index."""
+        for line in MEGHADUTA.strip().splitlines():
+            self.assertEqual(self.classifier.classify(line), 'mandAkrAntA')
+        for line, metre in KUMARASAMBHAVA:
+            self.assertEqual(self.classifier.classify(line), metre)
+
+    def test_all_metres(self):
+        """Test that every pattern, with either final syllable, maps back
+        to its metre."""
+        for name, ganas in chandas.METRES:
+            scan = [x == '_' for x in chandas.ganas_to_pattern(ganas)]
+            for last in (True, False):
+                scan[-1] = last
+                self.assertEqual(self.classifier.classify_scan(scan), name)
+
+    def test_anustubh(self):
+        """Test anuṣṭubh pādas and half-verses."""
+        for line in GITA.strip().splitlines():
+            self.assertEqual(self.classifier.classify(line), 'anuzwuB')
+        self.assertEqual(self.classifier.classify('Darmakzetre kurukzetre'),
+                         'anuzwuB')
+        # Fifth syllable is heavy
+        self.assertEqual(self.classifier.classify('kurukzetre DarmakzetrA'),
+                         None)
+
+    def test_unknown(self):
+        self.assertEqual(self.classifier.classify(''), None)
+        self.assertEqual(self.classifier.classify('rAma'), None)
+
+    def test_classify_file(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dirname, 'verse.txt')
+            with open(path, 'w') as f:
+                f.write(MEGHADUTA)
+                f.write(GITA)
+            results = self.classifier.classify_file(path)
+        finally:
+            shutil.rmtree(dirname)
+
+        metres = [metre for line, metre in results]
+        self.assertEqual(metres, ['mandAkrAntA'] * 4 + ['anuzwuB'] * 2)
+        self.assertEqual(results[0][0],
+                         'kaScitkAntAvirahaguruRA svADikArapramattaH')
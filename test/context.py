@@ -8,12 +8,39 @@ Tests the :class:`~sanskrit.context.Context` class.
 :license: MIT and BSD
 """
 
+import json
 import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import six
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
 from sanskrit import Context
+from sanskrit.context import _ping, fetch_enum_data
+from sanskrit import setup as S  # ``as S`` avoids problems with nose
+from sanskrit.analyze import SimpleAnalyzer
+from sanskrit.export import iter_nominal_paradigms
+from sanskrit.query import SimpleQuery
+from sanskrit.schema import DatabaseInfo, Indeclinable, Root
+from sanskrit.tagger import Tagger
+from sanskrit.util import Progress
 from . import TestCase, config as cfg
 
 
-class ContextTestCase(TestCase):
+class ClosingTestCase(TestCase):
+
+    def context(self, config):
+        """Create a context that is closed when the test ends."""
+        ctx = Context(config)
+        self.addCleanup(ctx.close)
+        return ctx
+
+
+class ContextTestCase(ClosingTestCase):
 
     """Constructs a context in a variety of ways."""
 
@@ -25,23 +52,290 @@ class ContextTestCase(TestCase):
     def testFile(self):
         """Test creating from a filename."""
         path = os.path.join(os.path.dirname(__file__), 'config.py')
-        ctx = Context(path)
+        ctx = self.context(path)
         self.compare_all(ctx)
 
     def testModule(self):
         """Test creating from a module."""
-        ctx = Context(cfg)
+        ctx = self.context(cfg)
         self.compare_all(ctx)
 
     def testDict(self):
         """Test creating from a :class:`dict`."""
         config = dict(DATABASE_URI=cfg.DATABASE_URI, DATA_PATH=cfg.DATA_PATH)
-        ctx = Context(config)
+        ctx = self.context(config)
         self.compare_all(ctx)
 
     def testOverride(self):
         """Test overriding a default option"""
         config = dict(DATABASE_URI=cfg.DATABASE_URI, DATA_PATH=cfg.DATA_PATH,
                       MONIER_XML_PATH='foo')
-        ctx = Context(config)
+        ctx = self.context(config)
         self.assertEqual(ctx.config['MONIER_XML_PATH'], 'foo')
+
+
+def run_threads(func, num_threads=8):
+    """Run `func` in several threads at once and return any exceptions."""
+    errors = []
+    barrier = threading.Event()
+
+    def target():
+        barrier.wait()
+        try:
+            func()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=target) for i in range(num_threads)]
+    for t in threads:
+        t.start()
+    barrier.set()
+    for t in threads:
+        t.join()
+    return errors
+
+
+class FileDatabaseTestCase(ClosingTestCase):
+
+    """Builds an SQLite file database for the test case's tests."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.config = {
+            'DATABASE_URI': 'sqlite:///' + os.path.join(cls.tmp, 'db.sqlite'),
+            'DATA_PATH': cfg.DATA_PATH,
+        }
+        ctx = Context(cls.config)
+        S.run(ctx, progress=Progress())
+        ctx.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+
+class ConcurrencyTestCase(FileDatabaseTestCase):
+
+    """Shares a context and the objects built from it across threads."""
+
+    def verify_threads(self, ctx):
+        analyzer = SimpleAnalyzer(ctx)
+        query = SimpleQuery(ctx)
+        # Always query the database.
+        query.cache = None
+        expected_analysis = sorted(x.name for x in analyzer.analyze('gacCati'))
+        expected_paradigm = query.pronoun('tad', 'm')
+        ctx.session.remove()
+
+        def func():
+            for i in range(20):
+                analysis = sorted(x.name for x in analyzer.analyze('gacCati'))
+                ctx.session.remove()
+                self.assertEqual(analysis, expected_analysis)
+                self.assertEqual(query.pronoun('tad', 'm'), expected_paradigm)
+
+        self.assertEqual(run_threads(func), [])
+
+    def test_file_database(self):
+        config = dict(self.config, DATABASE_POOL_SIZE=4)
+        ctx = self.context(config)
+        self.assertEqual(ctx.engine.pool.size(), 4)
+        self.verify_threads(ctx)
+
+    @unittest.skipIf(six.PY2, 'Python 2 shares one in-memory connection.')
+    def test_memory_database(self):
+        ctx = self.context(cfg)
+        S.run(ctx, progress=Progress())
+        self.verify_threads(ctx)
+
+    @unittest.skipIf(six.PY2, 'Python 2 shares one in-memory connection.')
+    def test_memory_connections(self):
+        """Test that threads get their own connections to one in-memory
+        database, and that each context gets its own database."""
+        ctx = self.context(cfg)
+        S.run(ctx, progress=Progress())
+        first = ctx.engine.connect()
+        second = ctx.engine.connect()
+        self.assertIsNot(first.connection.connection,
+                         second.connection.connection)
+        for conn in (first, second):
+            self.assertTrue(conn.execute(
+                'SELECT COUNT(*) FROM database_info').scalar())
+            conn.close()
+
+        other = self.context(cfg)
+        with self.assertRaises(OperationalError):
+            other.engine.execute('SELECT COUNT(*) FROM database_info')
+
+    @unittest.skipIf(six.PY2, 'Python 2 shares one in-memory connection.')
+    def test_close(self):
+        """Test that closing a context deletes its in-memory database."""
+        ctx = Context(cfg)
+        S.run(ctx, progress=Progress())
+        ctx.close()
+        self.assertIsNone(ctx._memory_connection)
+
+        ctx.connect()
+        self.addCleanup(ctx.close)
+        with self.assertRaises(OperationalError):
+            ctx.engine.execute('SELECT COUNT(*) FROM database_info')
+
+    def test_enums(self):
+        ctx = self.context(self.config)
+        seen = []
+
+        def func():
+            seen.append((ctx.enum_id['gender']['m'], id(ctx.enum_abbr),
+                         id(ctx.gender_set)))
+
+        self.assertEqual(run_threads(func), [])
+        self.assertEqual(len(set(seen)), 1)
+
+    def test_read_only(self):
+        ctx = self.context(dict(self.config, DATABASE_READ_ONLY=True))
+        self.assertTrue(ctx.session.query(Indeclinable).count())
+
+        session = ctx.session
+        session.add(Indeclinable(name='foo'))
+        with self.assertRaises(OperationalError):
+            session.commit()
+        session.rollback()
+        session.remove()
+
+    def test_read_only_unsupported(self):
+        config = dict(self.config, DATABASE_URI='oracle://user@host/db',
+                      DATABASE_READ_ONLY=True)
+        with self.assertRaises(ValueError):
+            Context(config)
+
+
+class SessionTestCase(FileDatabaseTestCase):
+
+    """Tests that library code leaves the caller's session alone."""
+
+    def test_caller_session(self):
+        ctx = self.context(self.config)
+        session = ctx.session
+        root = session.query(Root).filter(Root.name == 'gam').first()
+        session.add(Indeclinable(name='foo'))
+
+        ctx.build_id
+        ctx.enum_id
+        SimpleAnalyzer(ctx)
+        query = SimpleQuery(ctx)
+        query.pronoun('tad', 'm')
+        query.verb_summary('gam')
+        Tagger(ctx)
+        list(iter_nominal_paradigms(ctx))
+
+        self.assertEqual(len(session.new), 1)
+        self.assertIn(root, session)
+        self.assertTrue(root.paradigms)
+        session.rollback()
+        session.remove()
+
+    def test_private_session(self):
+        ctx = self.context(self.config)
+        with ctx.private_session() as session:
+            self.assertIsNot(session, ctx.session())
+            self.assertTrue(session.query(Root).count())
+
+
+class EngineOptionsTestCase(FileDatabaseTestCase):
+
+    def pragma(self, ctx, name):
+        return ctx.engine.execute('PRAGMA ' + name).scalar()
+
+    def test_pool(self):
+        ctx = self.context(dict(self.config, DATABASE_POOL_SIZE=3,
+                           DATABASE_MAX_OVERFLOW=2))
+        self.assertEqual(ctx.engine.pool.size(), 3)
+        self.assertEqual(ctx.engine.pool._max_overflow, 2)
+
+    def test_pre_ping(self):
+        ctx = self.context(self.config)
+        self.assertFalse(event.contains(ctx.engine, 'checkout', _ping))
+
+        ctx = self.context(dict(self.config, DATABASE_POOL_PRE_PING=True))
+        self.assertTrue(event.contains(ctx.engine, 'checkout', _ping))
+        self.assertTrue(ctx.session.query(Indeclinable).count())
+        ctx.session.remove()
+
+    def test_sqlite_pragmas(self):
+        ctx = self.context(dict(self.config, SQLITE_WAL=True,
+                           SQLITE_MMAP_SIZE=1 << 20, SQLITE_CACHE_SIZE=-4000,
+                           DATABASE_STATEMENT_CACHE_SIZE=200))
+        self.assertEqual(self.pragma(ctx, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(ctx, 'mmap_size'), 1 << 20)
+        self.assertEqual(self.pragma(ctx, 'cache_size'), -4000)
+
+    def test_read_only_wal(self):
+        ctx = self.context(dict(self.config, SQLITE_WAL=True,
+                           DATABASE_READ_ONLY=True))
+        self.assertEqual(self.pragma(ctx, 'journal_mode'), 'delete')
+        ctx.engine.dispose()
+
+        writer = self.context(dict(self.config, SQLITE_WAL=True))
+        self.pragma(writer, 'journal_mode')
+        writer.engine.dispose()
+        ctx = self.context(dict(self.config, SQLITE_WAL=True,
+                           DATABASE_READ_ONLY=True))
+        self.assertEqual(self.pragma(ctx, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(ctx, 'query_only'), 1)
+        with self.assertRaises(OperationalError):
+            ctx.engine.execute('CREATE TABLE foo (id INTEGER)')
+
+
+class EnumTestCase(FileDatabaseTestCase):
+
+    def plain(self, ctx):
+        """Return copies of the context's enum data as plain types."""
+        return ([dict((k, dict(v)) for k, v in ctx.enum_id.items()),
+                 dict((k, dict(v)) for k, v in ctx.enum_abbr.items()),
+                 dict((k, set(v)) for k, v in ctx.gender_set.items())])
+
+    def test_stored(self):
+        ctx = self.context(self.config)
+        session = ctx.session
+        info = session.query(DatabaseInfo).get(DatabaseInfo.ENUMS)
+        self.assertEqual(json.loads(info.value),
+                         json.loads(json.dumps(fetch_enum_data(session))))
+        session.remove()
+
+    def test_values(self):
+        ctx = self.context(self.config)
+        gender = ctx.enum_id['gender']
+        self.assertEqual(ctx.enum_abbr['gender'][gender['m']], 'm')
+        self.assertEqual(ctx.enum_abbr['gender']['masculine'], 'm')
+        mf = ctx.enum_id['gender_group']['mf']
+        self.assertEqual(ctx.gender_set[mf],
+                         frozenset([gender['m'], gender['f']]))
+
+    def test_shared(self):
+        first = self.context(self.config)
+        second = self.context(self.config)
+        self.assertIs(first.enum_id, second.enum_id)
+        self.assertIs(first.enum_abbr, second.enum_abbr)
+        self.assertIs(first.gender_set, second.gender_set)
+
+    @unittest.skipIf(six.PY2, 'Python 2 has no read-only mappings.')
+    def test_read_only(self):
+        ctx = self.context(self.config)
+        with self.assertRaises(TypeError):
+            ctx.enum_id['gender']['foo'] = 1
+        with self.assertRaises(TypeError):
+            ctx.enum_abbr['foo'] = {}
+        with self.assertRaises(AttributeError):
+            ctx.gender_set[ctx.enum_id['gender_group']['m']].add(1)
+
+    def test_without_stored_data(self):
+        """Test databases built before the enum data was stored."""
+        ctx = self.context(cfg)
+        S.run(ctx, progress=Progress())
+        session = ctx.session
+        session.query(DatabaseInfo) \
+               .filter(DatabaseInfo.key == DatabaseInfo.ENUMS).delete()
+        session.commit()
+        session.remove()
+        self.assertEqual(self.plain(ctx), self.plain(self.context(self.config)))
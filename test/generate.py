@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+test.generate
+~~~~~~~~~~~~~
+
+Tests form generation and bulk export.
+
+:license: MIT and BSD
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import six
+
+from sanskrit import Context, export
+from sanskrit import setup as S  # ``as S`` avoids problems with nose
+from sanskrit.generate import NominalGenerator
+from sanskrit.schema import *
+
+from . import TestCase, config as cfg
+
+ctx = Context(cfg)
+db_built = False
+
+
+def tearDownModule():
+    ctx.close()
+
+
+class GenerateTestCase(TestCase):
+
+    def setUp(self):
+        """Initialize the database if it doesn't exist."""
+        global db_built
+
+        if not db_built:
+            ctx.drop_all()
+            ctx.create_all()
+            S.run(ctx)
+            db_built = True
+
+    def test_paradigm(self):
+        gen = NominalGenerator(ctx)
+        paradigm = gen.paradigm('gaja', 'm')
+        self.assertEqual(len(paradigm), 24)
+        self.assertEqual(paradigm[('1', 's')], 'gajas')
+        self.assertEqual(paradigm[('6', 'p')], 'gajAnAm')
+
+    def test_paradigm_missing_gender(self):
+        """Test a gender for which the stem type has no endings."""
+        gen = NominalGenerator(ctx)
+        self.assertRaises(KeyError, gen.paradigm, 'gaja', 'f')
+
+    def test_stem_type_cache(self):
+        gen = NominalGenerator(ctx)
+        gen.paradigm('gaja', 'm')
+        self.assertEqual(gen._stem_types, {'gaja': 'a'})
+
+    def test_paradigms(self):
+        """Test that bulk paradigms match single paradigms."""
+        gen = NominalGenerator(ctx)
+        stems = ctx.session.query(NominalStem).all()
+        results = list(gen.paradigms(stems))
+
+        self.assertEqual(len(results), 1)
+        stem_name, gender, paradigm = results[0]
+        self.assertEqual((stem_name, gender), ('gaja', 'm'))
+        self.assertEqual(paradigm, gen.paradigm('gaja', 'm'))
+
+    def test_paradigms_unknown_stem_type(self):
+        gen = NominalGenerator(ctx)
+        stem = NominalStem(name='vAc',
+                           genders_id=ctx.enum_id['gender_group']['f'])
+        self.assertEqual(list(gen.paradigms([stem])), [])
+
+
+class ExportTestCase(GenerateTestCase):
+
+    def test_csv(self):
+        f = six.StringIO()
+        export.write_csv(export.iter_nominal_paradigms(ctx), f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(lines[0], 'stem,gender,case,number,form')
+        self.assertEqual(lines[1], 'gaja,m,1,d,gajO')
+        self.assertIn('gaja,m,1,s,gajaH', lines)
+        self.assertEqual(len(lines), 25)
+
+    def test_jsonl(self):
+        f = six.StringIO()
+        export.write_jsonl(export.iter_nominal_paradigms(ctx), f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+
+        datum = json.loads(lines[0])
+        self.assertEqual(datum['stem'], 'gaja')
+        self.assertEqual(datum['gender'], 'm')
+        self.assertEqual(datum['forms']['1s'], 'gajaH')
+
+    def test_output_file(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'paradigms.csv')
+            with export._open_output(path) as f:
+                export.write_csv(export.iter_nominal_paradigms(ctx), f)
+            with open(path, 'rb') as f:
+                data = f.read()
+        finally:
+            shutil.rmtree(tmp)
+        self.assertTrue(data.startswith(
+            b'stem,gender,case,number,form\r\ngaja,m,1,d,gajO\r\n'))
+        self.assertNotIn(b'\r\r', data)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+test.lazy
+~~~~~~~~~
+
+Tests that the package loads its modules on first use.
+
+:license: MIT and BSD
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+import sanskrit
+from sanskrit import util
+
+from . import TestCase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(code, modules):
+    """Run `code` in a new interpreter and return which of `modules` it
+    loaded."""
+    script = '\n'.join([
+        'import sys',
+        code,
+        'print(" ".join(m for m in {0!r} if m in sys.modules))'.format(
+            list(modules)),
+    ])
+    output = subprocess.check_output([sys.executable, '-c', script],
+                                     cwd=ROOT)
+    return output.decode('ascii').split()
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'Python 2 loads names eagerly.')
+class LazyImportTestCase(TestCase):
+
+    heavy = ['sqlalchemy', 'sanskrit.context', 'sanskrit.schema', 'sqlite3',
+             'json']
+
+    def test_import(self):
+        self.assertEqual(loaded_modules('import sanskrit', self.heavy), [])
+
+    def test_light_modules(self):
+        for name in ('sanskrit.sounds', 'sanskrit.transliterate.sanscript'):
+            self.assertEqual(loaded_modules('import ' + name, self.heavy), [])
+
+    def test_load(self):
+        self.assertEqual(
+            loaded_modules('import sanskrit; sanskrit.Context',
+                           ['sanskrit.context', 'sqlalchemy']),
+            ['sanskrit.context', 'sqlalchemy'])
+        self.assertEqual(
+            loaded_modules('from sanskrit.util import Progress',
+                           ['sanskrit.util.progress', 'sanskrit.util.cache']),
+            ['sanskrit.util.progress'])
+
+
+class AttributeTestCase(TestCase):
+
+    def test_null_handler(self):
+        handlers = logging.getLogger('sanskrit').handlers
+        self.assertTrue(any(isinstance(x, logging.NullHandler)
+                            for x in handlers))
+
+    def test_names(self):
+        from sanskrit.context import Context
+        from sanskrit.transliterate import sanscript
+        from sanskrit.util.progress import Progress
+
+        self.assertIs(sanskrit.Context, Context)
+        self.assertIs(sanskrit.sanscript, sanscript)
+        self.assertIs(util.Progress, Progress)
+
+    def test_submodules(self):
+        from sanskrit import sounds
+        self.assertIs(sanskrit.sounds, sounds)
+
+    @unittest.skipIf(sys.version_info < (3, 5),
+                     'Python 2 lists only loaded submodules.')
+    def test_dir(self):
+        for name in sanskrit.__all__ + ['sounds', 'tagger']:
+            self.assertIn(name, dir(sanskrit))
+        for name in util.__all__:
+            self.assertIn(name, dir(util))
+
+    def test_missing(self):
+        with self.assertRaises(AttributeError):
+            sanskrit.foo
+        with self.assertRaises(AttributeError):
+            util.foo
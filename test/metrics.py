@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+test.metrics
+~~~~~~~~~~~~
+
+Tests the instrumentation in :mod:`sanskrit.util.metrics`.
+
+:license: MIT and BSD
+"""
+
+from sanskrit import Context
+from sanskrit import setup as S  # ``as S`` avoids problems with nose
+from sanskrit.analyze import SimpleAnalyzer
+from sanskrit.query import SimpleQuery
+from sanskrit.sandhi import Splitter
+from sanskrit.tagger import Tagger
+from sanskrit.util import LRUCache, metrics
+
+from . import TestCase, config as cfg
+
+ctx = Context(cfg)
+db_built = False
+
+
+def tearDownModule():
+    ctx.close()
+
+
+class RegistryTestCase(TestCase):
+
+    def setUp(self):
+        self.registry = metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_counters(self):
+        metrics.incr('a')
+        metrics.incr('a', 2)
+        metrics.incr('b')
+        counters = self.registry.snapshot()['counters']
+        self.assertEqual(counters, {'a': 3, 'b': 1})
+
+    def test_histogram(self):
+        registry = metrics.Registry(bounds=(1, 10))
+        for value in (0.5, 1, 5, 20):
+            registry.observe('h', value)
+
+        h = registry.snapshot()['histograms']['h']
+        self.assertEqual(h['count'], 4)
+        self.assertEqual(h['total'], 26.5)
+        self.assertEqual(h['min'], 0.5)
+        self.assertEqual(h['max'], 20)
+        self.assertEqual(h['buckets'], {'1': 2, '10': 1, 'inf': 1})
+
+    def test_timer(self):
+        with metrics.timer('t'):
+            pass
+
+        @metrics.timed('f')
+        def f(x):
+            return x + 1
+
+        self.assertEqual(f(1), 2)
+        self.assertEqual(f(2), 3)
+        histograms = self.registry.snapshot()['histograms']
+        self.assertEqual(histograms['t']['count'], 1)
+        self.assertEqual(histograms['f']['count'], 2)
+
+    def test_callbacks(self):
+        events = []
+        callback = lambda *args: events.append(args)
+        self.registry.add_callback(callback)
+        metrics.incr('a', 2)
+        metrics.observe('h', 0.5)
+        self.registry.remove_callback(callback)
+        metrics.incr('a')
+
+        self.assertEqual(events, [(metrics.COUNTER, 'a', 2),
+                                  (metrics.HISTOGRAM, 'h', 0.5)])
+
+    def test_reset(self):
+        metrics.incr('a')
+        self.registry.reset()
+        self.assertEqual(self.registry.snapshot(),
+                         {'counters': {}, 'histograms': {}})
+
+    def test_disable(self):
+        metrics.disable()
+        metrics.incr('a')
+        with metrics.timer('t'):
+            pass
+        self.assertFalse(metrics.get_registry().enabled)
+        self.assertEqual(metrics.get_registry().snapshot(),
+                         {'counters': {}, 'histograms': {}})
+        self.assertEqual(self.registry.snapshot()['counters'], {})
+
+    def test_set_registry(self):
+        registry = metrics.Registry()
+        previous = metrics.set_registry(registry)
+        self.assertIs(previous, self.registry)
+        self.assertIs(metrics.get_registry(), registry)
+
+
+class SplitterMetricsTestCase(TestCase):
+
+    def setUp(self):
+        self.registry = metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_splits(self):
+        splitter = Splitter([('a', 'a', 'A')])
+        splits = list(splitter.iter_splits('rAmAgacCati'))
+        counters = self.registry.snapshot()['counters']
+        self.assertEqual(counters['splitter.calls'], 1)
+        self.assertEqual(counters['splitter.splits'], len(splits))
+
+    def test_disabled(self):
+        metrics.disable()
+        splitter = Splitter([('a', 'a', 'A')])
+        self.assertTrue(list(splitter.iter_splits('rAma')))
+        self.assertEqual(self.registry.snapshot()['counters'], {})
+
+
+class InstrumentationTestCase(TestCase):
+
+    def setUp(self):
+        """Initialize the database if it doesn't exist."""
+        global db_built
+
+        if not db_built:
+            ctx.drop_all()
+            ctx.create_all()
+            S.run(ctx)
+            db_built = True
+        self.registry = metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_analyzer(self):
+        SimpleAnalyzer(ctx).analyze('devasya')
+        snapshot = self.registry.snapshot()
+        for name in ('analyzer.analyze', 'analyzer.form_sql',
+                     'analyzer.stem_sql'):
+            self.assertEqual(snapshot['histograms'][name]['count'], 1)
+        self.assertIn('analyzer.form_results', snapshot['counters'])
+        self.assertIn('analyzer.stem_candidates', snapshot['counters'])
+
+    def test_tagger(self):
+        Tagger(ctx).tag('devasya')
+        snapshot = self.registry.snapshot()
+        counters = snapshot['counters']
+        self.assertEqual(snapshot['histograms']['tagger.tag']['count'], 1)
+        self.assertEqual(counters['tagger.segments'], 1)
+        self.assertGreater(counters['tagger.pushes'], 0)
+        self.assertGreater(counters['tagger.pops'], 0)
+
+    def test_query_cache(self):
+        Q = SimpleQuery(ctx, cache=LRUCache())
+        Q.pronoun('tad', 'masculine')
+        Q.pronoun('tad', 'masculine')
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['counters']['query.pronoun.misses'], 1)
+        self.assertEqual(snapshot['counters']['query.pronoun.hits'], 1)
+        self.assertEqual(snapshot['histograms']['query.pronoun']['count'], 1)
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+    test.models
+    ~~~~~~~~~~~
+
+    Tests statistical models.
+
+    :license: MIT and BSD
+"""
+
+from __future__ import division
+import math
+import tempfile
+import unittest
+
+from sanskrit import models
+from . import TestCase
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+SEQS = [
+    ['nominal', 'verb'],
+    ['nominal', 'nominal', 'verb'],
+    ['indeclinable', 'nominal', 'verb'],
+]
+
+#: The number of sequences read by `counted` so far.
+num_read = [0]
+
+#: The value of `num_read` at each merge.
+merges = []
+
+
+def counted(seqs):
+    for seq in seqs:
+        num_read[0] += 1
+        yield seq
+
+
+class RecordingModel(models.SequenceModel):
+
+    """Records how many sequences were read when each shard is merged."""
+
+    def merge(self, other):
+        merges.append(num_read[0])
+        return models.SequenceModel.merge(self, other)
+
+
+@unittest.skipIf(numpy is None, 'requires NumPy')
+class DenseSequenceModelTestCase(TestCase):
+
+    def setUp(self):
+        self.sparse = models.SequenceModel()
+        self.dense = models.DenseSequenceModel()
+        for seq in SEQS:
+            self.sparse.insert(seq)
+            self.dense.insert(seq)
+        # Boundary, 'nominal', 'verb', 'indeclinable'
+        self.sparse.num_prior_events = 4
+
+    def test_num_prior_events(self):
+        self.assertEqual(self.dense.num_prior_events, 4)
+        self.dense.insert(['gerund'])
+        self.assertEqual(self.dense.num_prior_events, 5)
+
+    def test_counts(self):
+        dense = self.dense
+        joint = dense.joint_counts
+        for (x, y), count in self.sparse.joint.items():
+            self.assertEqual(joint[dense.index[x], dense.index[y]], count)
+        for x, count in self.sparse.prior.items():
+            self.assertEqual(dense.prior_counts[dense.index[x]], count)
+        self.assertEqual(joint.sum(), sum(self.sparse.joint.values()))
+        self.assertEqual(dense.counts(), self.sparse.counts())
+
+    def test_log_cond_prob(self):
+        events = ['nominal', 'verb', 'indeclinable', 'gerund',
+                  models.SEQUENCE_BOUNDARY]
+        for x in events + [None]:
+            xs = [x] if x else []
+            for y in events:
+                self.assertAlmostEqual(self.dense.log_cond_prob(xs, y),
+                                       self.sparse.log_cond_prob(xs, y))
+
+    def test_log_cond_prob_many(self):
+        ys = ['nominal', 'verb', 'gerund', models.SEQUENCE_BOUNDARY]
+        for xs in (['nominal'], ['verb'], ['unknown'], []):
+            expected = [self.dense.log_cond_prob(xs, y, delta=0.5)
+                        for y in ys]
+            actual = self.dense.log_cond_prob_many(xs, ys, delta=0.5)
+            for a, b in zip(actual, expected):
+                self.assertAlmostEqual(a, b)
+
+    def test_growth(self):
+        model = models.DenseSequenceModel()
+        seq = [str(i) for i in range(100)]
+        model.insert(seq)
+        self.assertEqual(model.num_prior_events, 101)
+        self.assertEqual(model.joint_counts.shape, (101, 101))
+        self.assertAlmostEqual(
+            model.log_cond_prob(['41'], '42'), math.log(2 / 102))
+
+
+class TrainingTestCase(TestCase):
+
+    def assertSameCounts(self, a, b):
+        self.assertEqual(a.counts(), b.counts())
+
+    def test_merge(self):
+        whole = models.SequenceModel()
+        left = models.SequenceModel()
+        right = models.SequenceModel()
+        for seq in SEQS:
+            whole.insert(seq)
+        left.insert(SEQS[0])
+        for seq in SEQS[1:]:
+            right.insert(seq)
+        self.assertIs(left.merge(right), left)
+        self.assertSameCounts(left, whole)
+
+    def test_train(self):
+        expected = models.SequenceModel()
+        for seq in SEQS * 10:
+            expected.insert(seq)
+        for processes in (1, 2):
+            model = models.train(SEQS * 10, processes=processes,
+                                 shard_size=4)
+            self.assertSameCounts(model, expected)
+
+    def test_train_bounded(self):
+        """Test that training reads shards as the workers need them."""
+        num_read[0] = 0
+        del merges[:]
+        model = models.train(counted(SEQS * 100), RecordingModel,
+                             processes=2, shard_size=1)
+        self.assertEqual(model.counts(), models.train(SEQS * 100).counts())
+        self.assertEqual(len(merges), 300)
+        # Two shards per process are in flight, and one more is read.
+        self.assertLessEqual(merges[0], 5)
+
+    def test_save_and_load(self):
+        model = models.SequenceModel()
+        for seq in SEQS:
+            model.insert(seq)
+        with tempfile.NamedTemporaryFile(suffix='.model') as f:
+            model.save(f.name)
+            loaded = models.SequenceModel.load(f.name)
+        self.assertSameCounts(loaded, model)
+
+    def test_load_bad_file(self):
+        with tempfile.NamedTemporaryFile(suffix='.model') as f:
+            f.write(b'not a model')
+            f.flush()
+            with self.assertRaises(ValueError):
+                models.SequenceModel.load(f.name)
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_dense(self):
+        expected = models.SequenceModel()
+        for seq in SEQS * 10:
+            expected.insert(seq)
+
+        model = models.train(SEQS * 10, models.DenseSequenceModel,
+                             processes=2, shard_size=4)
+        self.assertSameCounts(model, expected)
+
+        # Dense and sparse models can be merged with each other.
+        sparse = models.SequenceModel().merge(model)
+        self.assertSameCounts(sparse, expected)
+        dense = models.DenseSequenceModel().merge(expected)
+        self.assertSameCounts(dense, expected)
+
+        with tempfile.NamedTemporaryFile(suffix='.model') as f:
+            model.save(f.name)
+            loaded = models.DenseSequenceModel.load(f.name)
+            sparse = models.SequenceModel.load(f.name)
+        self.assertSameCounts(loaded, expected)
+        self.assertSameCounts(sparse, expected)
+
+
+class InterfaceTestCase(TestCase):
+
+    """Tests that the models can replace each other."""
+
+    def score(self, model, seq):
+        """Score `seq` the way a caller of :class:`SequenceModel` would."""
+        return sum(model.log_cond_prob(seq[:i], y, delta=1)
+                   for i, y in enumerate(seq))
+
+    def check(self, model_class, **kw):
+        model = model_class(**kw)
+        for seq in SEQS:
+            model.insert(seq)
+        seen = self.score(model, ['nominal', 'verb'])
+        unseen = self.score(model, ['verb', 'gerund'])
+        self.assertLess(seen, 0)
+        self.assertLess(unseen, seen)
+        self.assertGreater(unseen, float('-inf'))
+
+    def test_sequence_model(self):
+        self.check(models.SequenceModel)
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_dense_sequence_model(self):
+        self.check(models.DenseSequenceModel)
+
+    def test_ngram_model(self):
+        self.check(models.NGramModel, order=2)
+        self.check(models.NGramModel, order=3)
+
+
+class NGramModelTestCase(TestCase):
+
+    def make_model(self, **kw):
+        model = models.NGramModel(**kw)
+        for seq in SEQS:
+            model.insert(seq)
+        return model
+
+    def test_counts(self):
+        model = self.make_model(order=3)
+        B = models.SEQUENCE_BOUNDARY
+        self.assertEqual(model.ngrams[(B, B, 'nominal')], 2)
+        self.assertEqual(model.ngrams[('nominal', 'verb')], 3)
+        self.assertEqual(model.ngrams[('verb',)], 3)
+        # Tokens plus one final boundary per sequence
+        self.assertEqual(model.contexts[()], 11)
+        self.assertEqual(model.contexts[('nominal',)], 4)
+
+    def test_log_cond_prob(self):
+        model = self.make_model(order=3)
+        log = math.log
+        # Seen trigram
+        self.assertAlmostEqual(
+            model.log_cond_prob(['indeclinable', 'nominal'], 'verb'), 0)
+        # Back off to the bigram
+        self.assertAlmostEqual(
+            model.log_cond_prob(['verb', 'nominal'], 'verb'),
+            log(0.4) + log(3 / 4))
+        # Short histories start a sequence
+        self.assertAlmostEqual(model.log_cond_prob([], 'nominal'),
+                               log(2 / 3))
+        # Unknown events back off to a smoothed unigram. There are 4 known
+        # events, plus 1 slot for unknown events.
+        self.assertAlmostEqual(model.log_cond_prob(['verb'], 'gerund'),
+                               2 * log(0.4) + log(1 / (11 + 5)))
+
+    def test_bigram_order(self):
+        model = self.make_model(order=2)
+        self.assertAlmostEqual(model.log_cond_prob(['nominal'], 'verb'),
+                               math.log(3 / 4))
+
+    def test_insert_after_scoring(self):
+        model = self.make_model(order=2)
+        before = model.log_cond_prob(['verb'], 'nominal')
+        model.insert(['verb', 'nominal'])
+        self.assertGreater(model.log_cond_prob(['verb'], 'nominal'), before)
+
+    def test_pruning(self):
+        xs = ['indeclinable', 'nominal']
+        model = self.make_model(order=3, min_count=2)
+        expected = math.log(0.4) + math.log(3 / 4)
+        self.assertAlmostEqual(model.log_cond_prob(xs, 'verb'), expected)
+
+        size = len(model.ngrams)
+        model.prune()
+        self.assertLess(len(model.ngrams), size)
+        self.assertNotIn(('indeclinable', 'nominal', 'verb'), model.ngrams)
+        self.assertAlmostEqual(model.log_cond_prob(xs, 'verb'), expected)
+
+    def test_merge(self):
+        whole = self.make_model(order=3)
+        part = models.NGramModel(order=3)
+        part.insert(SEQS[0])
+        rest = models.NGramModel(order=3)
+        for seq in SEQS[1:]:
+            rest.insert(seq)
+        part.merge(rest)
+        self.assertEqual(part.ngrams, whole.ngrams)
+        self.assertEqual(part.contexts, whole.contexts)
+        with self.assertRaises(ValueError):
+            part.merge(models.NGramModel(order=2))
+
+    def test_train(self):
+        kw = {'order': 4, 'backoff': 0.5}
+        expected = models.NGramModel(**kw)
+        for seq in SEQS * 10:
+            expected.insert(seq)
+        for processes in (1, 2):
+            model = models.train(SEQS * 10, models.NGramModel,
+                                 processes=processes, shard_size=4,
+                                 model_kwargs=kw)
+            self.assertEqual(model.order, 4)
+            self.assertEqual(model.backoff, 0.5)
+            self.assertEqual(model.ngrams, expected.ngrams)
+            self.assertEqual(model.contexts, expected.contexts)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+test.progress
+~~~~~~~~~~~~~
+
+Tests the progress reporting in :mod:`sanskrit.util.progress`.
+
+:license: MIT and BSD
+"""
+
+import io
+import json
+import logging
+
+from sanskrit import Context
+from sanskrit import setup as S  # ``as S`` avoids problems with nose
+from sanskrit.util import JSONLinesSink, LoggingSink, NullSink, Progress
+
+from . import TestCase, config as cfg
+
+
+class ListSink(NullSink):
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class ProgressTestCase(TestCase):
+
+    def setUp(self):
+        self.sink = ListSink()
+        self.clock = Clock()
+        self.progress = Progress(self.sink, interval=10, clock=self.clock)
+
+    def kinds(self):
+        return [e['event'] for e in self.sink.events]
+
+    def test_task(self):
+        with self.progress.task('verbs', total=100) as task:
+            self.clock.now = 5
+            task.update(50)
+        self.assertEqual(self.kinds(), ['start', 'end'])
+
+        end = self.sink.events[-1]
+        self.assertEqual(end['task'], 'verbs')
+        self.assertEqual(end['rows'], 50)
+        self.assertEqual(end['total'], 100)
+        self.assertEqual(end['elapsed'], 5)
+        self.assertEqual(end['rate'], 10)
+        self.assertEqual(end['eta'], 5)
+
+    def test_interval(self):
+        task = self.progress.task('verbs', total=1000)
+        for i in range(100):
+            self.clock.now = i
+            task.update()
+        task.close()
+        task.close()
+
+        kinds = self.kinds()
+        self.assertEqual(kinds.count('progress'), 9)
+        self.assertEqual(kinds.count('end'), 1)
+        progress = self.sink.events[1]
+        self.assertEqual(progress['rows'], 11)
+        self.assertEqual(progress['elapsed'], 10)
+
+    def test_unknown_total(self):
+        task = self.progress.task('stems')
+        self.clock.now = 2
+        task.update(10)
+        task.close()
+        end = self.sink.events[-1]
+        self.assertEqual(end['rate'], 5)
+        self.assertIsNone(end['eta'])
+
+    def test_messages(self):
+        self.progress.section('Verbal data')
+        self.progress.task('verbs').message('Skipped 0 roots.')
+        self.clock.now = 3
+        self.progress.close()
+
+        self.assertEqual(self.kinds(),
+                         ['section', 'start', 'message', 'done'])
+        self.assertEqual(self.sink.events[2]['task'], 'verbs')
+        self.assertEqual(self.sink.events[3]['elapsed'], 3)
+
+    def test_null_sink(self):
+        progress = Progress()
+        self.assertFalse(progress.enabled)
+        with progress.task('verbs') as task:
+            task.update()
+
+
+class SinkTestCase(TestCase):
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        progress = Progress(JSONLinesSink(stream))
+        progress.section(u'Verbal data')
+        with progress.task(u'verbs', total=1) as task:
+            task.update()
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([e['event'] for e in events],
+                         ['section', 'start', 'end'])
+        self.assertEqual(events[-1]['rows'], 1)
+
+    def test_logging(self):
+        messages = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+
+        logger = logging.getLogger('test.progress')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = Handler()
+        logger.addHandler(handler)
+        try:
+            clock = Clock()
+            progress = Progress(LoggingSink(logger), interval=1, clock=clock)
+            progress.section('Verbal data')
+            with progress.task('verbs', total=40) as task:
+                clock.now = 1
+                task.update(10)
+                clock.now = 1.5
+                task.update(5)
+        finally:
+            logger.removeHandler(handler)
+
+        self.assertEqual(messages, [
+            '== Verbal data',
+            'verbs: 10/40 rows, 1.0s, 10 rows/s, ETA 3s',
+            'verbs: 15/40 rows in 1.50s (10 rows/s)',
+        ])
+
+
+class SetupProgressTestCase(TestCase):
+
+    def test_run(self):
+        sink = ListSink()
+        ctx = Context(cfg)
+        self.addCleanup(ctx.close)
+        S.run(ctx, progress=Progress(sink))
+
+        ends = dict((e['task'], e) for e in sink.events
+                    if e['event'] == 'end')
+        for name in ('tags', 'enums', 'roots', 'verbs', 'nominal_stems',
+                     'pronouns', 'database_info'):
+            self.assertIn(name, ends)
+        self.assertEqual(ends['verbs']['rows'], ends['verbs']['total'])
+        self.assertEqual(sink.events[-1]['event'], 'done')
+
+    def test_failed_task(self):
+        """Test that a loader ends its task even if it fails."""
+        sink = ListSink()
+        ctx = Context(cfg)
+        self.addCleanup(ctx.close)
+        ctx.create_all()
+        S.add_enums(ctx)
+        with self.assertRaises(TypeError):
+            S.add_verbs(ctx, None, progress=Progress(sink))
+
+        ends = [e for e in sink.events if e['event'] == 'end']
+        self.assertEqual([e['task'] for e in ends], ['verbs'])
+        self.assertEqual(ends[0]['rows'], 1)
@@ -19,6 +19,10 @@ ctx = Context(cfg)
 db_built = False
 
 
+def tearDownModule():
+    ctx.close()
+
+
 class QueryTestCase(TestCase):
 
     def setUp(self):
@@ -82,3 +86,53 @@ class QueryTestCase(TestCase):
         abbr_actual = Q.verb('gam', 'pres', 'para')
         self.verify(name_actual, expected)
         self.verify(abbr_actual, expected)
+
+    def test_verb_summary(self):
+        Q = SimpleQuery(ctx)
+        summary = Q.verb_summary('gam')
+        root = ctx.session.query(Root).filter(Root.name == 'gam').first()
+
+        self.assertEqual(summary['root_id'], root.id)
+        self.assertEqual(summary['verbs'][('pres', 'para')], ['gacCati'])
+        self.assertEqual(summary['participles'][('past', 'active')],
+                         ['gata'])
+
+    def test_verb_summary_missing_root(self):
+        Q = SimpleQuery(ctx)
+        self.assertEqual(Q.verb_summary('nonexistent'), {})
+
+    def test_cache(self):
+        Q = SimpleQuery(ctx)
+        first = Q.noun('gaja', 'm')
+        first[('1', 's')] = 'changed'
+
+        second = Q.noun('gaja', 'm')
+        self.assertEqual(second[('1', 's')], 'gajaH')
+        self.assertIn(('noun', 'gaja', 'm'), Q.cache.data)
+
+    def test_cache_key(self):
+        """Test that equivalent calls share one cache entry."""
+        Q = SimpleQuery(ctx)
+        expected = Q.pronoun('tad', 'm')
+        self.assertEqual(Q.pronoun('tad', gender='m'), expected)
+        self.assertEqual(Q.pronoun(gender='m', stem_name='tad'), expected)
+        self.assertEqual(Q.verb_summary('gam'), Q.verb_summary('gam', None))
+        self.assertEqual(Q.verb_summary(root_name='gam', vclass=None),
+                         Q.verb_summary('gam'))
+        Q.verb('gam', 'pres', 'para')
+        Q.verb('gam', 'pres', 'para', None)
+        Q.verb(root_name='gam', mode='pres', voice='para')
+        self.assertEqual(sorted(k[0] for k in Q.cache.data),
+                         ['pronoun', 'verb', 'verb_summary'])
+
+    def test_cache_disabled(self):
+        ctx.config['QUERY_CACHE_SIZE'] = 0
+        try:
+            Q = SimpleQuery(ctx)
+        finally:
+            del ctx.config['QUERY_CACHE_SIZE']
+        self.assertIsNone(Q.cache)
+        self.assertEqual(Q.noun('gaja', 'm')[('1', 's')], 'gajaH')
+
+    def test_build_id(self):
+        self.assertIsNotNone(ctx.build_id)
@@ -40,3 +40,14 @@ class QueueTestCase(TestCase):
         self.assertNotEqual((item, priority), q.peek())
         q.pop()
         self.assertRaises(IndexError, q.pop)
+
+    def test_ties(self):
+        """Test that ties are popped in insertion order, even if the items
+        can't be compared."""
+        q = PriorityQueue()
+        items = [{'x': i} for i in range(5)]
+        for item in items:
+            q.push(item, 1)
+        q.push('first', 2)
+        self.assertEqual(q.pop(), 'first')
+        self.assertEqual([q.pop() for i in range(5)], items)
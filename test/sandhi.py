@@ -10,9 +10,10 @@
 
 from builtins import object
 import pytest
+import six
 
 from sanskrit import Context
-from sanskrit.sandhi import Splitter, Joiner
+from sanskrit.sandhi import Exempt, Splitter, Joiner
 
 
 @pytest.fixture
@@ -75,10 +76,38 @@ class TestJoiner(object):
     def test_join_internal(self, simple_joiner, terms, result):
         assert simple_joiner.join(terms, internal=True) == result
 
+    def test_join_many(self, simple_joiner):
+        chunk_lists = [x for x, y in self.EXTERNAL_JOINER_TESTS]
+        expected = [y for x, y in self.EXTERNAL_JOINER_TESTS]
+        assert simple_joiner.join_many(chunk_lists) == expected
+        assert simple_joiner.join_many([('nara', 'ina')],
+                                       internal=True) == ['nareRa']
+
+    def test_add_rules_is_incremental(self):
+        joiner = Joiner([('a', 'i', 'e')])
+        joiner.add_rules([('a', 'a', 'A')])
+        assert joiner.join(['tasya', 'icCA']) == 'tasyecCA'
+        assert joiner.join(['tasya', 'aSvaH']) == 'tasyASvaH'
+
+        # Later rules replace earlier ones.
+        joiner.add_rules([('a', 'i', 'a i')])
+        assert joiner.join(['tasya', 'icCA']) == 'tasya icCA'
+
     @pytest.mark.parametrize('before,after', RETROFLEXION_TESTS)
     def test_internal_retroflexion(self, before, after):
         assert Joiner.internal_retroflex(before) == after
 
+    def test_internal_retroflexion_many(self):
+        before = [x for x, y in self.RETROFLEXION_TESTS] + ['', 'Darma']
+        after = [y for x, y in self.RETROFLEXION_TESTS] + ['', 'Darma']
+        assert Joiner.internal_retroflex_many(before) == after
+
+    def test_internal_retroflexion_type(self):
+        for term in (Exempt('Darma'), Exempt('karman')):
+            assert type(Joiner.internal_retroflex(term)) is six.text_type
+        result = Joiner.internal_retroflex_many([Exempt('Darma')])
+        assert type(result[0]) is six.text_type
+
 
 class TestSpliter(object):
     # "splits" blows up quickly, so these tokens are artificially small:
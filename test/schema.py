@@ -24,6 +24,7 @@ class SchemaTestCase(TestCase):
     def setUp(self):
         """Create a new database."""
         self.ctx = Context(cfg)
+        self.addCleanup(self.ctx.close)
         self.ctx.create_all()
         self.session = self.ctx.session
         setup.add_enums(self.ctx)
@@ -309,3 +310,29 @@ class FormTestCase(SchemaTestCase):
         assert verb.root.basis.name == 'gam'
         assert mods == [mod]
         assert prefixes == ['upa', 'sam']
+
+
+class IndexTestCase(SchemaTestCase):
+
+    """Tests the indexes used by `sanskrit.query`."""
+
+    def test_indexes(self):
+        """Test that composite indexes are created."""
+        from sqlalchemy import inspect
+        inspector = inspect(self.ctx.engine)
+
+        def columns(table):
+            indexes = inspector.get_indexes(table)
+            return {x['name']: x['column_names'] for x in indexes}
+
+        verb = columns('verb')
+        assert verb['ix_verb_root_mode_voice'] == \
+            ['root_id', 'mode_id', 'voice_id']
+        assert verb['ix_verb_root_person_number'] == \
+            ['root_id', 'person_id', 'number_id']
+
+        nominal = columns('nominal')
+        assert nominal['ix_nominal_stem_gender'] == ['stem_id', 'gender_id']
+
+        participle_stem = columns('participlestem')
+        assert participle_stem['ix_participlestem_root_id'] == ['root_id']
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+test.service
+~~~~~~~~~~~~
+
+Tests the HTTP service in :mod:`sanskrit.service`.
+
+:license: MIT and BSD
+"""
+
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+if sys.version_info < (3, 5):
+    raise unittest.SkipTest('The service needs Python 3.5 or newer.')
+
+import asyncio
+import http.client
+
+from sanskrit import Context
+from sanskrit import setup as S  # ``as S`` avoids problems with nose
+from sanskrit.service import Service
+from sanskrit.util import Progress
+
+from . import TestCase, config as cfg
+
+
+class ServiceTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.config = {
+            'DATABASE_URI': 'sqlite:///' + os.path.join(cls.tmp, 'db.sqlite'),
+            'DATA_PATH': cfg.DATA_PATH,
+        }
+        ctx = Context(cls.config)
+        S.run(ctx, progress=Progress())
+        ctx.close()
+
+        cls.service = Service(cls.config, workers=1, max_queue=4)
+        cls.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(cls.loop)
+            server = cls.loop.run_until_complete(
+                cls.service.start('127.0.0.1', 0))
+            cls.port = server.sockets[0].getsockname()[1]
+            started.set()
+            cls.loop.run_forever()
+            cls.loop.run_until_complete(cls.service.close())
+            cls.loop.close()
+
+        cls.thread = threading.Thread(target=serve)
+        cls.thread.start()
+        started.wait()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        shutil.rmtree(cls.tmp)
+
+    def request(self, method, path, data=None):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        body = None if data is None else json.dumps(data)
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        result = json.loads(response.read().decode('utf-8'))
+        conn.close()
+        return response.status, result
+
+    def test_in_memory(self):
+        with self.assertRaises(ValueError):
+            Service(cfg)
+
+    def test_health(self):
+        status, data = self.request('GET', '/health')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['status'], 'ok')
+        self.assertEqual(data['workers'], 1)
+
+    def test_tag(self):
+        status, data = self.request('POST', '/tag',
+                                    {'segment': 'gacCati gajo'})
+        self.assertEqual(status, 200)
+        result = data['result']
+        self.assertTrue(result['exact'])
+        self.assertEqual(result['items'][0]['name'], 'gacCati')
+        self.assertEqual(result['items'][0]['pos'], 'verb')
+
+        status, data = self.request('POST', '/tag', {'segment': 'gacCati',
+                                                     'max_expansions': 0})
+        self.assertFalse(data['result']['exact'])
+
+    def test_analyze(self):
+        status, data = self.request('POST', '/analyze', {'word': 'gacCati'})
+        self.assertEqual(status, 200)
+        self.assertIn('verb', [x['pos'] for x in data['result']])
+
+    def test_transliterate(self):
+        status, data = self.request('POST', '/transliterate',
+                                    {'text': 'rAma', 'from': 'hk',
+                                     'to': 'iast'})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['result'], u'rāma')
+
+    def test_paradigm(self):
+        status, data = self.request('POST', '/paradigm',
+                                    {'kind': 'pronoun', 'stem_name': 'tad',
+                                     'gender': 'm'})
+        self.assertEqual(status, 200)
+        forms = dict((tuple(x['parse']), x['form']) for x in data['result'])
+        self.assertEqual(forms[('1', 's')], 'saH')
+
+    def test_batch(self):
+        status, data = self.request('POST', '/analyze', {'batch': [
+            {'word': 'gacCati'}, {'word': 'gacCanti'}, {'wrong': 'x'}]})
+        self.assertEqual(status, 200)
+        results = data['results']
+        self.assertEqual(len(results), 3)
+        self.assertIn('result', results[0])
+        self.assertIn('result', results[1])
+        self.assertIn('error', results[2])
+
+    def test_queue_limit(self):
+        status, data = self.request('POST', '/analyze', {'batch': [
+            {'word': 'gacCati'}] * 5})
+        self.assertEqual(status, 503)
+        self.assertIn('error', data)
+
+    def test_broken_pool(self):
+        executor = self.service.executor
+        for pid in list(executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        # Before Python 3.7, submitting a task to a pool that hasn't yet
+        # noticed the dead process can block on a lock that it held.
+        deadline = time.time() + 10
+        while not executor._broken and time.time() < deadline:
+            time.sleep(0.01)
+
+        status, data = self.request('POST', '/analyze', {'word': 'gacCati'})
+        self.assertEqual(status, 503)
+        self.assertIn('error', data)
+
+        status, data = self.request('POST', '/analyze', {'word': 'gacCati'})
+        self.assertEqual(status, 200)
+        self.assertIsNot(self.service.executor, executor)
+        self.assertEqual(self.request('GET', '/health')[1]['pending'], 0)
+
+    def test_errors(self):
+        self.assertEqual(self.request('GET', '/foo')[0], 404)
+        self.assertEqual(self.request('GET', '/tag')[0], 405)
+        self.assertEqual(self.request('POST', '/tag', [])[0], 400)
+        status, data = self.request('POST', '/paradigm', {'kind': 'foo'})
+        self.assertEqual(status, 400)
+        self.assertIn('foo', data['error'])
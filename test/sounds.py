@@ -9,9 +9,16 @@
 """
 
 from builtins import zip
+import unittest
+
 from sanskrit import sounds
 from . import TestCase
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class CleanTestCase(TestCase):
     def test(self):
@@ -21,6 +28,76 @@ class CleanTestCase(TestCase):
         self.assertEqual('kTmdm', func('ka!!!Tamida23m//', sounds.CONSONANTS))
 
 
+class SoundClassTestCase(TestCase):
+
+    CLASSES = [
+        (sounds.CLASS_VOWEL, sounds.VOWELS),
+        (sounds.CLASS_SHORT_VOWEL, sounds.SHORT_VOWELS),
+        (sounds.CLASS_CONSONANT, sounds.CONSONANTS),
+        (sounds.CLASS_STOP, sounds.STOPS),
+        (sounds.CLASS_NASAL, sounds.NASALS),
+        (sounds.CLASS_SEMIVOWEL, sounds.SEMIVOWELS),
+        (sounds.CLASS_SAVARGA, sounds.SAVARGA),
+        (sounds.CLASS_VALID_FINAL, sounds.VALID_FINALS),
+        (sounds.CLASS_SOUND, sounds.ALL_SOUNDS),
+        (sounds.CLASS_TOKEN, sounds.ALL_TOKENS),
+        (sounds.CLASS_MH, 'MH'),
+    ]
+
+    def test_table_matches_sets(self):
+        for i in range(128):
+            L = chr(i)
+            for bit, letters in self.CLASSES:
+                self.assertEqual(bool(sounds.CLASS_TABLE[i] & bit),
+                                 L in letters)
+            self.assertEqual(sounds.sound_class(L), sounds.CLASS_TABLE[i])
+
+    def test_sound_class_non_ascii(self):
+        self.assertEqual(sounds.sound_class(u'\u0905'), 0)
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_class_masks(self):
+        text = u"rAmaH gacCati |\u0905"
+        masks = sounds.class_masks(text)
+        self.assertEqual(masks.tolist(), [sounds.sound_class(L) for L in text])
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_class_masks_many(self):
+        lines = ['rAmaH', '', 'vanam']
+        masks = sounds.class_masks_many(lines)
+        self.assertEqual([x.tolist() for x in masks],
+                         [sounds.class_masks(x).tolist() for x in lines])
+
+
+class SortTestCase(TestCase):
+
+    def test_key_fn(self):
+        func = sounds.key_fn
+        self.assertEqual(func('aA'), '12')
+        self.assertEqual(func('ka-Ta!'), func('kaTa'))
+        self.assertEqual(func('iLA'), func('ilA'))
+
+    def test_sort_slp1(self):
+        words = ['kA', 'ka', 'Ka', 'aMSa', 'aSva', 'agni', 'ahi', 'Ikz']
+        expected = ['aMSa', 'agni', 'aSva', 'ahi', 'Ikz', 'ka', 'kA', 'Ka']
+        self.assertEqual(sounds.sort_slp1(words), expected)
+        self.assertEqual(sounds.sort_slp1(words, reverse=True),
+                         expected[::-1])
+
+    def test_packed_key(self):
+        words = ['kA', 'ka', 'Ka', 'aMSa', 'aSva', 'agni', 'ahi', 'Ikz']
+        self.assertEqual(sorted(words, key=sounds.packed_key),
+                         sounds.sort_slp1(words))
+        self.assertEqual(sounds.packed_key('aA'), b'\x01\x02')
+
+    def test_string_types(self):
+        """Test native strings, which are bytes on Python 2, and text."""
+        for s in (str('ka-Ta!'), u'ka-Ta!'):
+            self.assertEqual(sounds.key_fn(s), 'N1g1')
+            self.assertEqual(sounds.packed_key(s), sounds.packed_key('kaTa'))
+        self.assertEqual(sounds.sort_slp1([str('kA'), u'ka']), ['ka', 'kA'])
+
+
 class TransformTestCase(TestCase):
     def test_aspirate(self):
         func = sounds.aspirate
@@ -81,6 +158,35 @@ class TransformTestCase(TestCase):
             self.assertEqual(output, func(data))
 
 
+class StringTransformTestCase(TestCase):
+
+    def test_apply(self):
+        self.assertEqual(sounds.apply('devoice', 'vAg'), 'vAk')
+        self.assertEqual(sounds.apply('guna', 'kfzi'), 'karze')
+        self.assertEqual(sounds.apply('vrddhi', 'kfzi'), 'kArzE')
+        self.assertEqual(sounds.apply('retroflex', 'nisanna'), 'RizaRRa')
+        self.assertEqual(sounds.apply('shorten', ''), '')
+
+    def test_apply_matches_letters(self):
+        """Test that string transforms match letter transforms."""
+        text = ''.join(sorted(sounds.ALL_SOUNDS))
+        for name in sounds.LETTER_TRANSFORMS:
+            func = getattr(sounds, name)
+            expected = ''.join(func(L) for L in text)
+            self.assertEqual(sounds.apply(name, text), expected)
+
+    def test_apply_many(self):
+        self.assertEqual(sounds.apply_many('aspirate', ['gam', 'budD']),
+                         ['Gam', 'BuDD'])
+        self.assertRaises(KeyError, sounds.apply_many, 'unknown', ['a'])
+
+    def test_string_types(self):
+        """Test native strings, which are bytes on Python 2, and text."""
+        for s in (str('vAg'), u'vAg'):
+            self.assertEqual(sounds.apply('devoice', s), 'vAk')
+            self.assertEqual(sounds.apply_many('devoice', [s]), ['vAk'])
+
+
 class NumSyllablesTestCase(TestCase):
 
     def test_simple(self):
@@ -122,3 +228,36 @@ class MeterTestCase(TestCase):
             scan = sounds.meter(line)
             scan[-1] = '_'
             self.assertEqual(mandakranta, ''.join(scan))
+
+
+MEGHADUTA = """
+kaScitkAntAvirahaguruRA svADikArapramattaH
+SApenAstaMgamitamahimA varzaBogyeRa BartuH .
+yakzaScakre janakatanayAsnAnapuRyodakezu
+snigDacCAyAtaruzu vasatiM rAmagiryASramezu .. 1 ..
+"""
+
+
+@unittest.skipIf(numpy is None, 'requires NumPy')
+class BatchMeterTestCase(TestCase):
+
+    def test_meter_many(self):
+        """Test that batch results match :func:`sounds.meter`."""
+        lines = MEGHADUTA.strip().splitlines()
+        lines += ['', 'a', 'aM naH yuG', 'kfzRaH', 'tvam', "so 'pi"]
+        actual = sounds.meter_many(lines)
+
+        self.assertEqual(len(actual), len(lines))
+        for line, scan in zip(lines, actual):
+            expected = sounds.meter(line)
+            self.assertEqual(expected, ['_' if x else '.' for x in scan])
+
+    def test_meter_many_empty(self):
+        self.assertEqual(sounds.meter_many([]), [])
+        actual = sounds.meter_many(['', '| 1 |'])
+        self.assertEqual([len(x) for x in actual], [0, 0])
+
+    def test_num_syllables_many(self):
+        lines = ['a', 'zwre', 'Darmakzetre kurukzetre', '']
+        self.assertEqual(list(sounds.num_syllables_many(lines)),
+                         [1, 1, 8, 0])
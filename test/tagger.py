@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+test.tagger
+~~~~~~~~~~~
+
+Tests the search budget and models of :class:`~sanskrit.tagger.Tagger`.
+
+:license: MIT and BSD
+"""
+
+import time
+import unittest
+
+from sanskrit import Context, models
+from sanskrit import setup as S  # ``as S`` avoids problems with nose
+from sanskrit.tagger import NonForm, TagResult, Tagger
+from sanskrit.util import Progress
+
+from . import TestCase, config as cfg
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ctx = Context(cfg)
+db_built = False
+
+
+def tearDownModule():
+    ctx.close()
+
+
+class TaggerTestCase(TestCase):
+
+    def setUp(self):
+        """Initialize the database if it doesn't exist."""
+        global db_built
+
+        if not db_built:
+            S.run(ctx, progress=Progress())
+            db_built = True
+        self.tagger = Tagger(ctx)
+
+    def verify_nonforms(self, result, names):
+        self.assertEqual([x.form.name for x in result], names)
+        self.assertEqual([x.chunk_index for x in result],
+                         list(range(len(names))))
+        for x in result:
+            self.assertIsInstance(x.form, NonForm)
+
+    def test_exact(self):
+        result = self.tagger.tag('gajo gacCati')
+        self.assertIsInstance(result, TagResult)
+        self.assertTrue(result.exact)
+        self.assertEqual([x.chunk_index for x in result], [0, 1])
+        self.assertFalse(isinstance(result[1].form, NonForm))
+
+    def test_empty(self):
+        for segment in ('', '   '):
+            result = self.tagger.tag(segment)
+            self.assertIsInstance(result, TagResult)
+            self.assertEqual(result, [])
+            self.assertTrue(result.exact)
+
+    def test_max_expansions(self):
+        result = self.tagger.tag('gajo gacCati', max_expansions=0)
+        self.assertFalse(result.exact)
+        self.verify_nonforms(result, ['gajo', 'gacCati'])
+
+        result = self.tagger.tag('gajo gacCati', max_expansions=1000)
+        self.assertTrue(result.exact)
+
+    def test_deadline(self):
+        result = self.tagger.tag('gajo gacCati', deadline=time.time())
+        self.assertFalse(result.exact)
+        self.verify_nonforms(result, ['gajo', 'gacCati'])
+
+    def test_partial(self):
+        """Test that a truncated search keeps the forms it found."""
+        result = self.tagger.tag('gacCati gajo', max_expansions=1)
+        self.assertFalse(result.exact)
+        self.assertEqual([x.chunk_index for x in result], [0, 1])
+        self.assertEqual(result[0].form.name, 'gacCati')
+        self.assertFalse(isinstance(result[0].form, NonForm))
+        self.assertIsInstance(result[1].form, NonForm)
+
+    def check_model(self, model):
+        """Train `model` on the default tagging of a segment, and test that
+        a tagger that uses it finds the same tagging."""
+        segment = 'gajo gacCati'
+        expected = self.tagger.tag(segment)
+        for i in range(5):
+            model.insert([x.tag(ctx) for x in expected])
+
+        result = Tagger(ctx, model=model).tag(segment)
+        self.assertTrue(result.exact)
+        self.assertEqual([x.form.name for x in result],
+                         [x.form.name for x in expected])
+        self.assertEqual([x.tag(ctx) for x in result],
+                         [x.tag(ctx) for x in expected])
+
+    def test_sequence_model(self):
+        self.check_model(models.SequenceModel())
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_dense_sequence_model(self):
+        self.check_model(models.DenseSequenceModel())
+
+    def test_ngram_model(self):
+        self.check_model(models.NGramModel(order=2))
+        self.check_model(models.NGramModel(order=3))